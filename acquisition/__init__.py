@@ -0,0 +1,62 @@
+from .capture import CaptureWriter, iter_capture, read_capture_header
+from .clock import ClockOffsetTracker
+from .delivery import BatchPublisher
+from .dataserver_client import DeviceConfig, DataServerClient
+from .jitter_buffer import JitterBuffer
+from .packets import PACKET_DTYPE, EegDataPacket, EegChannelChunk, EegBatch, expand_sample_times
+from .simulator import SimulatorConfig, V2DeviceSimulator, encode_v2_frames
+from .tap import PacketTap
+from .udp_v2 import (
+    TimeRegulatingResult,
+    ActualTimeRegulator,
+    UdpEegReceiver,
+    decode_int24_samples,
+    decode_int24_frames,
+    acquire_receiver,
+    release_receiver,
+)
+from .dataserver_receiver import DataServerReceiver, acquire_dataserver_receiver, release_dataserver_receiver
+from .backend import (
+    BACKENDS,
+    BACKEND_DEFAULT_HOST,
+    BACKEND_DEFAULT_PORT,
+    AcquisitionBackend,
+    acquire_backend,
+    release_backend,
+)
+
+__all__ = [
+    "CaptureWriter",
+    "iter_capture",
+    "read_capture_header",
+    "ClockOffsetTracker",
+    "BatchPublisher",
+    "DeviceConfig",
+    "DataServerClient",
+    "JitterBuffer",
+    "PACKET_DTYPE",
+    "EegDataPacket",
+    "EegChannelChunk",
+    "EegBatch",
+    "expand_sample_times",
+    "PacketTap",
+    "SimulatorConfig",
+    "V2DeviceSimulator",
+    "encode_v2_frames",
+    "TimeRegulatingResult",
+    "ActualTimeRegulator",
+    "UdpEegReceiver",
+    "decode_int24_samples",
+    "decode_int24_frames",
+    "acquire_receiver",
+    "release_receiver",
+    "DataServerReceiver",
+    "acquire_dataserver_receiver",
+    "release_dataserver_receiver",
+    "BACKENDS",
+    "BACKEND_DEFAULT_HOST",
+    "BACKEND_DEFAULT_PORT",
+    "AcquisitionBackend",
+    "acquire_backend",
+    "release_backend",
+]
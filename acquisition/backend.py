@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict, Optional, Protocol, Union
+
+from .dataserver_receiver import DataServerReceiver, acquire_dataserver_receiver, release_dataserver_receiver
+from .packets import EegBatch
+from .udp_v2 import UdpEegReceiver, acquire_receiver, release_receiver
+
+# 可选的采集后端：键为 acquire_backend 的 kind，值为界面上显示的名称
+BACKENDS: Dict[str, str] = {
+    "udp": "UDP（V2 设备）",
+    "Neuracle": "Neuracle 数据服务器",
+    "HEEG": "HEEG 数据服务器",
+    "DSI": "DSI 数据服务器",
+}
+
+# 各后端的默认地址与端口：UDP 为本机监听地址，数据服务器为记录软件所在电脑
+BACKEND_DEFAULT_HOST: Dict[str, str] = {"udp": "0.0.0.0", "Neuracle": "127.0.0.1", "HEEG": "127.0.0.1", "DSI": "127.0.0.1"}
+BACKEND_DEFAULT_PORT: Dict[str, int] = {"udp": 30300, "Neuracle": 8712, "HEEG": 8712, "DSI": 8844}
+
+
+class AcquisitionBackend(Protocol):
+    """
+    采集后端的公共接口（UdpEegReceiver / DataServerReceiver 都满足，批次投递与停止时的收尾共用 BatchPublisher），页面只依赖这些成员：
+    - batch_received(EegBatch) / error_occurred(str) 两个 Qt 信号；
+    - subscribe / unsubscribe：在接收线程中直接回调的非 Qt 订阅者；
+    - host_to_eeg_time：把 time.monotonic() 时刻映射到 EegBatch 的校正时间轴，供 trigger 落点；
+    - is_running、get_last_hw_timestamp、get_last_regulated_timestamp、get_drop_stats：状态查询。
+    """
+
+    batch_received: Any
+    error_occurred: Any
+
+    def subscribe(self, callback: Callable[[EegBatch], None]): ...
+
+    def unsubscribe(self, callback: Callable[[EegBatch], None]): ...
+
+    def host_to_eeg_time(self, t_monotonic: float, ch: int = 0) -> Optional[float]: ...
+
+    def is_running(self) -> bool: ...
+
+    def get_last_hw_timestamp(self) -> Optional[float]: ...
+
+    def get_last_regulated_timestamp(self) -> Optional[float]: ...
+
+    def get_drop_stats(self) -> dict: ...
+
+
+def acquire_backend(
+    kind: str, host: str, port: int, sample_rate: float, n_chan: Optional[int] = None,
+) -> Union[UdpEegReceiver, DataServerReceiver]:
+    """
+    获取 kind 后端的共享接收器（引用计数 +1），用完后交给 release_backend。
+    - "udp"：监听 host:port 的 UdpEegReceiver，通道数由数据包决定，n_chan 忽略；
+    - "Neuracle" / "HEEG" / "DSI"：连接 host:port 数据服务器的 DataServerReceiver，
+      n_chan 与 DataServerThread 相同（Neuracle / HEEG 含 trigger 通道），必须给出。
+    """
+    if kind == "udp":
+        return acquire_receiver(host=host, port=port, buffer_size=8192)
+    if kind not in BACKENDS:
+        raise ValueError(f"不支持的采集后端 {kind}，可选 {tuple(BACKENDS)}")
+    if n_chan is None:
+        raise ValueError(f"{kind} 数据服务器需要给出通道数")
+    return acquire_dataserver_receiver(kind, host, port, n_chan=n_chan, sample_rate=sample_rate)
+
+
+def release_backend(backend: Union[UdpEegReceiver, DataServerReceiver]):
+    """释放一次 acquire_backend 得到的接收器；最后一个使用者释放时停止接收"""
+    if isinstance(backend, DataServerReceiver):
+        release_dataserver_receiver(backend)
+    else:
+        release_receiver(backend)
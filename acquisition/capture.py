@@ -0,0 +1,84 @@
+import struct
+import threading
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# ------------------------------------------------------------
+# 原始 datagram 抓包文件格式（小端，追加写）
+#
+#   文件头: magic(8s) version(H) wall_time(d)   wall_time 为开始抓包时的 time.time()，仅供参考
+#   记录:   recv_elapsed(d) length(I)，后跟 length 字节的原始 datagram
+#
+# recv_elapsed 与接收线程交给 ActualTimeRegulator 的 received_at 完全相同（会话起点以来的 monotonic 秒），
+# 回放时原样送回 _process_datagrams，解析、时间校正、排序与投递批次都可逐位复现。
+# ------------------------------------------------------------
+
+CAPTURE_MAGIC = b"EEGCAP\x00\x01"
+CAPTURE_VERSION = 1
+
+CAPTURE_HEADER = struct.Struct("<8sHd")
+CAPTURE_RECORD = struct.Struct("<dI")
+
+
+class CaptureWriter:
+    """
+    在接收线程中逐个追加 datagram：只做一次 struct.pack 和两次带缓冲的 write，
+    真正的系统调用由 1 MB 的文件缓冲合并，开销可以忽略。
+    close() 可在其他线程调用，用锁与正在进行的 write() 互斥。
+    """
+
+    BUFFER_SIZE = 1 << 20
+
+    def __init__(self, path: str, wall_time: float = 0.0):
+        self.path = path
+        self._f: Optional[BinaryIO] = open(path, "wb", buffering=self.BUFFER_SIZE)
+        self._f.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, wall_time))
+        self._lock = threading.Lock()
+        self.datagrams = 0
+        self.bytes = 0
+
+    def write(self, recv_elapsed: float, data: bytes):
+        with self._lock:
+            f = self._f
+            if f is None:
+                return
+            f.write(CAPTURE_RECORD.pack(recv_elapsed, len(data)))
+            f.write(data)
+            self.datagrams += 1
+            self.bytes += len(data)
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+def read_capture_header(path: str) -> float:
+    """校验文件头并返回抓包开始时的 wall_time"""
+    with open(path, "rb") as f:
+        return _read_header(f, path)
+
+
+def iter_capture(path: str) -> Iterator[Tuple[float, bytes]]:
+    """按写入顺序逐个返回 (recv_elapsed, datagram)；末尾不完整的记录（例如异常退出）会被忽略"""
+    with open(path, "rb") as f:
+        _read_header(f, path)
+        while True:
+            head = f.read(CAPTURE_RECORD.size)
+            if len(head) < CAPTURE_RECORD.size:
+                return
+            recv_elapsed, length = CAPTURE_RECORD.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield recv_elapsed, data
+
+
+def _read_header(f: BinaryIO, path: str) -> float:
+    head = f.read(CAPTURE_HEADER.size)
+    if len(head) < CAPTURE_HEADER.size:
+        raise ValueError(f"{path} 不是有效的抓包文件")
+    magic, version, wall_time = CAPTURE_HEADER.unpack(head)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError(f"{path} 不是有效的抓包文件")
+    return wall_time
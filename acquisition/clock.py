@@ -0,0 +1,47 @@
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+
+class ClockOffsetTracker:
+    """
+    电脑时间 → 校正时间轴（ActualTimeRegulator 输出）的映射估计。
+
+    校正时间 = 片上时间 - 第一包片上时间 + 第一包到达时间，相当于“采集时刻 + 第一包的网络延迟”。
+    对每个有效包记录 lag = 到达时间 - 校正时间 = 本包延迟 - 第一包延迟，
+    取 window_sec 窗口内的最小值作为偏移估计：延迟最小的包最接近“采集即到达”，
+    于是某个电脑时刻 t 对应的校正时间 ≈ t - min(lag)。
+    取滑动窗口而不是全程最小值，是为了跟随片上晶振与电脑时钟之间的缓慢漂移。
+
+    update() 只由接收线程调用；offset 为单个 float 属性，其他线程可直接读取。
+    """
+
+    def __init__(self, window_sec: float = 10.0):
+        self.window_sec = max(float(window_sec), 0.0)
+        # 单调递增的 (到达时间, lag) 队列，队首即窗口内最小 lag
+        self._window: Deque[Tuple[float, float]] = deque()
+        self.offset: Optional[float] = None
+        self.samples = 0
+
+    def reset(self):
+        self._window.clear()
+        self.offset = None
+        self.samples = 0
+
+    def update(self, received_at: float, regulated_time: float):
+        lag = received_at - regulated_time
+        window = self._window
+        while window and window[-1][1] >= lag:
+            window.pop()
+        window.append((received_at, lag))
+        deadline = received_at - self.window_sec
+        while len(window) > 1 and window[0][0] < deadline:
+            window.popleft()
+        self.samples += 1
+        self.offset = window[0][1]
+
+    def to_regulated(self, elapsed: float) -> Optional[float]:
+        """把会话起点以来的电脑时间（秒）映射到校正时间轴；还没有估计时返回 None"""
+        offset = self.offset
+        if offset is None:
+            return None
+        return elapsed - offset
@@ -0,0 +1,423 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from neuracle_lib.dataServer import FrameParser, RingBuffer
+
+DATASERVER_DEVICES = ("Neuracle", "HEEG", "DSI")
+
+
+@dataclass
+class DeviceConfig:
+    """
+    一台设备的数据服务器（Neuracle / HEEG / DSI 记录软件的 TCP 转发端口）。
+    n_chan 与 DataServerThread 相同：Neuracle / HEEG 含最后一个 trigger 通道，DSI 为全部通道。
+    """
+    name: str
+    device: str = "Neuracle"
+    host: str = "127.0.0.1"
+    port: int = 8712
+    n_chan: int = 9
+    srate: float = 1000.0
+    t_buffer: float = 3.0  # 每台设备环形缓冲的长度（秒）
+
+    def __post_init__(self):
+        if self.device not in DATASERVER_DEVICES:
+            raise ValueError(f"不支持的设备类型 {self.device}，可选 {DATASERVER_DEVICES}")
+
+
+class _DeviceConnection:
+    """单台设备的连接状态；除 ring_buffer（自带锁）外只在事件循环线程中读写"""
+
+    def __init__(self, config: DeviceConfig):
+        self.config = config
+        self.parser = FrameParser(config.device, config.n_chan)
+        self.ring_buffer = RingBuffer(config.n_chan, int(round(config.t_buffer * config.srate)))
+        # 未解析完的尾部字节；解析后只删除已消费的前缀
+        self._acc = bytearray()
+        # 本投递节拍内新解析的数据块
+        self.pending: List[np.ndarray] = []
+        self.task: Optional[asyncio.Task] = None
+        self.transport: Optional[asyncio.Transport] = None
+        self.connected = False
+        self.idle_closed = False
+        self.last_data = 0.0
+
+        self.connects = 0
+        self.failures = 0
+        self.bytes = 0
+        self.samples = 0
+        self.events = 0
+
+    def reset_stream(self):
+        self._acc.clear()
+        self.last_data = time.monotonic()
+        self.idle_closed = False
+
+    def feed(self, data: bytes) -> Optional[np.ndarray]:
+        """解析新到的字节，返回本次解析出的 (n_chan, n) 数据块，没有完整的帧时返回 None"""
+        self._acc += data
+        block, events, used = self.parser.scanFrames(self._acc)
+        del self._acc[:used]
+        self.bytes += len(data)
+        self.events += len(events)
+        self.last_data = time.monotonic()
+        if block.shape[1]:
+            self.ring_buffer.appendBuffer(block)
+            self.pending.append(block)
+            self.samples += block.shape[1]
+            return block
+        return None
+
+    def take_pending(self) -> Optional[np.ndarray]:
+        if not self.pending:
+            return None
+        blocks, self.pending = self.pending, []
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks, axis=1)
+
+
+class _DeviceProtocol(asyncio.Protocol):
+    def __init__(self, conn: _DeviceConnection, logger: logging.Logger,
+                 on_block: Callable[[_DeviceConnection, np.ndarray], None]):
+        self.conn = conn
+        self.logger = logger
+        self.on_block = on_block
+        self.transport: Optional[asyncio.Transport] = None
+        self.closed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        try:
+            block = self.conn.feed(data)
+        except Exception as e:
+            self.logger.error(f"[{self.conn.config.name}] 解析数据失败: {e}")
+            self.transport.abort()
+            return
+        if block is not None:
+            self.on_block(self.conn, block)
+
+    def connection_lost(self, exc):
+        if not self.closed.done():
+            self.closed.set_result(exc)
+
+
+class DataServerClient(QObject):
+    """
+    多设备数据服务器客户端：所有设备的 TCP 连接都在同一个后台线程的 asyncio 事件循环中，
+    不再像 DataServerThread 那样每台设备一个阻塞线程（阻塞 connect 每次重试 sleep 1 s、select 超时 9 s）。
+
+    - 连接失败或断开后按指数退避（reconnect_initial 起每次翻倍，最多 reconnect_max 秒，±20% 抖动）重连，不阻塞其他设备；
+      只有连接上并收到过数据才把退避重置为 reconnect_initial，服务器接受连接后立即关闭时退避继续增长；
+      已连接但超过 idle_timeout 秒没有数据时主动断开重连；
+    - 每台设备一个 RingBuffer（float32，带锁），任意线程可用 read_since(name, cursor) 增量读取；
+    - 每 delivery_interval_ms 把各设备新解析的数据拼成 {设备名: (n_chan, n) float32} 投递一次：
+      Qt 页面连接 data_received 信号（跨线程排队，在 GUI 线程中回调）；
+      非 Qt 消费者 subscribe(callback)，在事件循环线程中直接回调，回调应尽量轻量；
+    - 需要每块数据到达时刻的消费者（如 DataServerReceiver 的时钟映射）用 subscribe_blocks(callback)，
+      每解析出一块数据就在事件循环线程中回调 callback(设备名, (n_chan, n) 数据块, 连接序号)，
+      连接序号为该设备成功连接的次数，变化说明中间断开重连过；
+    - 连接失败时发出 error_occurred，连接断开时发出 device_disconnected，然后按退避重连；
+    - start() 最多等待 start_timeout 秒让事件循环启动，启动失败或超时抛出 RuntimeError（cause 为原始异常）。
+    """
+
+    data_received = pyqtSignal(object)          # {设备名: (n_chan, n) float32 新数据}
+    device_connected = pyqtSignal(str)          # 设备名
+    device_disconnected = pyqtSignal(str, str)  # 设备名, 原因
+    error_occurred = pyqtSignal(str)
+
+    def __init__(
+        self, devices: Iterable[DeviceConfig] = (), delivery_interval_ms: float = 40.0,
+        connect_timeout: float = 3.0, reconnect_initial: float = 0.5, reconnect_max: float = 10.0,
+        idle_timeout: float = 5.0, start_timeout: float = 5.0, parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+        self.delivery_interval_ms = delivery_interval_ms
+        self.connect_timeout = connect_timeout
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.idle_timeout = idle_timeout
+        self.start_timeout = start_timeout
+        self.logger = logging.getLogger("DataServerClient")
+
+        # 设备表 copy-on-write：add / remove 在调用线程替换整个 dict，事件循环遍历的总是一个完整快照
+        self._connections: Dict[str, _DeviceConnection] = {}
+        self._subscribers: Tuple[Callable[[Dict[str, np.ndarray]], None], ...] = ()
+        self._block_subscribers: Tuple[Callable[[str, np.ndarray, int], None], ...] = ()
+        self._lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        # 事件循环线程启动阶段的异常，由 start() 在调用线程中重新抛出
+        self._startup_error: Optional[BaseException] = None
+        # start() 等待超时后置位，迟到的事件循环不再启动设备
+        self._start_abandoned = False
+        self.running = False
+
+        for config in devices:
+            self.add_device(config)
+
+    # -------- 设备 --------
+
+    def add_device(self, config: DeviceConfig):
+        """添加一台设备；运行中添加会立即开始连接"""
+        with self._lock:
+            if config.name in self._connections:
+                raise ValueError(f"设备 {config.name} 已存在")
+            conn = _DeviceConnection(config)
+            self._connections = {**self._connections, config.name: conn}
+        if self.running:
+            self._loop.call_soon_threadsafe(self._start_device, conn)
+
+    def remove_device(self, name: str):
+        with self._lock:
+            conn = self._connections.get(name)
+            if conn is None:
+                return
+            self._connections = {k: v for k, v in self._connections.items() if k != name}
+        if self.running:
+            self._loop.call_soon_threadsafe(self._stop_device, conn)
+
+    def device_names(self) -> List[str]:
+        return list(self._connections)
+
+    def get_ring_buffer(self, name: str) -> RingBuffer:
+        return self._connections[name].ring_buffer
+
+    def read_since(self, name: str, cursor: int) -> Tuple[np.ndarray, int]:
+        """name 设备在游标之后的新数据，返回 (data, new_cursor)，见 RingBuffer.read_since"""
+        return self._connections[name].ring_buffer.read_since(cursor)
+
+    def is_connected(self, name: str) -> bool:
+        conn = self._connections.get(name)
+        return conn is not None and conn.connected
+
+    def get_stats(self) -> Dict[str, dict]:
+        """每台设备：是否已连接、成功连接次数、连接失败次数、接收字节数、解析采样点数、事件数"""
+        return {
+            name: {
+                "connected": conn.connected,
+                "connects": conn.connects,
+                "failures": conn.failures,
+                "bytes": conn.bytes,
+                "samples": conn.samples,
+                "events": conn.events,
+            }
+            for name, conn in self._connections.items()
+        }
+
+    # -------- 订阅者 --------
+
+    def subscribe(self, callback: Callable[[Dict[str, np.ndarray]], None]):
+        """注册一个在事件循环线程中回调的订阅者（每个投递节拍收到一个 {设备名: 数据块}）。"""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers = self._subscribers + (callback,)
+
+    def unsubscribe(self, callback: Callable[[Dict[str, np.ndarray]], None]):
+        with self._lock:
+            self._subscribers = tuple(cb for cb in self._subscribers if cb != callback)
+
+    def subscribe_blocks(self, callback: Callable[[str, np.ndarray, int], None]):
+        """注册一个逐块回调的订阅者：事件循环线程中每解析出一块数据回调一次 (设备名, 数据块, 连接序号)。"""
+        with self._lock:
+            if callback not in self._block_subscribers:
+                self._block_subscribers = self._block_subscribers + (callback,)
+
+    def unsubscribe_blocks(self, callback: Callable[[str, np.ndarray, int], None]):
+        with self._lock:
+            self._block_subscribers = tuple(cb for cb in self._block_subscribers if cb != callback)
+
+    # -------- 启动 / 停止 --------
+
+    def start(self):
+        if self.running:
+            self.logger.warning("客户端已经在运行中")
+            return
+        ready = threading.Event()
+        self._startup_error = None
+        self._start_abandoned = False
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True, name="DataServer-Client-Thread")
+        self._thread.start()
+        if not ready.wait(timeout=self.start_timeout):
+            self._start_abandoned = True
+            if self._loop is not None and self._stop_event is not None:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            self._thread = None
+            message = f"数据服务器客户端事件循环未在 {self.start_timeout:g} s 内启动"
+            self.logger.error(message)
+            raise RuntimeError(message)
+        if self._startup_error is not None:
+            error = self._startup_error
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            raise RuntimeError(f"数据服务器客户端启动失败: {error}") from error
+        self.running = True
+        self.logger.info(f"数据服务器客户端已启动，设备: {self.device_names()}")
+
+    def stop(self) -> bool:
+        """
+        断开所有设备并投递最后一批数据后返回；
+        返回事件循环线程是否已经退出（False 表示 5 s 内没有退出，此后仍可能有回调）。
+        """
+        if not self.running:
+            return True
+        self.running = False
+        self._loop.call_soon_threadsafe(self._stop_event.set)
+        thread, self._thread = self._thread, None
+        thread.join(timeout=5.0)
+        if thread.is_alive():
+            self.logger.warning("数据服务器客户端事件循环未在 5 s 内退出")
+            return False
+        self.logger.info(f"数据服务器客户端已停止: {self.get_stats()}")
+        return True
+
+    def is_running(self) -> bool:
+        return self.running
+
+    # -------- 事件循环线程 --------
+
+    def _run(self, ready: threading.Event):
+        loop = None
+        try:
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            loop.run_until_complete(self._main(ready))
+        except Exception as e:
+            if not ready.is_set():
+                # 启动阶段失败：交给 start() 在调用线程中抛出
+                self._startup_error = e
+            else:
+                self.running = False
+                self.logger.error(f"数据服务器客户端事件循环异常退出: {e}")
+                self.error_occurred.emit(f"数据服务器客户端异常退出: {e}")
+        finally:
+            if loop is not None:
+                loop.close()
+            # 无论成功与否都唤醒 start()，避免调用线程无限等待
+            ready.set()
+
+    async def _main(self, ready: threading.Event):
+        self._stop_event = asyncio.Event()
+        if self._start_abandoned:
+            return
+        for conn in self._connections.values():
+            self._start_device(conn)
+        ready.set()
+
+        interval = self.delivery_interval_ms / 1000.0
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._check_idle()
+            self._deliver()
+
+        for conn in self._connections.values():
+            self._stop_device(conn)
+        tasks = [conn.task for conn in self._connections.values() if conn.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._deliver()
+
+    def _start_device(self, conn: _DeviceConnection):
+        conn.task = asyncio.get_running_loop().create_task(self._device_loop(conn))
+
+    def _stop_device(self, conn: _DeviceConnection):
+        if conn.task is not None:
+            conn.task.cancel()
+        if conn.transport is not None:
+            conn.transport.close()
+
+    async def _device_loop(self, conn: _DeviceConnection):
+        """连接 → 等待断开 → 退避 → 重连，直到被取消"""
+        loop = asyncio.get_running_loop()
+        config = conn.config
+        delay = self.reconnect_initial
+        while True:
+            try:
+                transport, protocol = await asyncio.wait_for(
+                    loop.create_connection(lambda: _DeviceProtocol(conn, self.logger, self._on_block),
+                                           config.host, config.port),
+                    timeout=self.connect_timeout,
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                conn.failures += 1
+                message = f"[{config.name}] 连接 {config.host}:{config.port} 失败（{e or '超时'}），{delay:.1f} s 后重试"
+                self.logger.warning(message)
+                self.error_occurred.emit(message)
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, self.reconnect_max)
+                continue
+
+            conn.reset_stream()
+            conn.transport = transport
+            conn.connected = True
+            conn.connects += 1
+            samples_at_connect = conn.samples
+            self.logger.info(f"[{config.name}] 已连接 {config.host}:{config.port}")
+            self.device_connected.emit(config.name)
+            try:
+                exc = await protocol.closed
+            finally:
+                conn.connected = False
+                conn.transport = None
+                transport.close()
+
+            if conn.idle_closed:
+                reason = f"超过 {self.idle_timeout:g} s 没有数据"
+            else:
+                reason = str(exc) if exc else "服务器关闭连接"
+            # 这次连接收到过数据才重置退避；接受连接后立即关闭（或一直没有数据）的服务器继续翻倍，不会紧密重连
+            if conn.samples > samples_at_connect:
+                delay = self.reconnect_initial
+            self.logger.warning(f"[{config.name}] 连接断开: {reason}，{delay:.1f} s 后重连")
+            self.device_disconnected.emit(config.name, reason)
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.reconnect_max)
+
+    def _on_block(self, conn: _DeviceConnection, block: np.ndarray):
+        for callback in self._block_subscribers:
+            try:
+                callback(conn.config.name, block, conn.connects)
+            except Exception as e:
+                self.logger.error(f"逐块订阅者处理数据失败: {e}")
+
+    def _check_idle(self):
+        if self.idle_timeout <= 0:
+            return
+        now = time.monotonic()
+        for conn in self._connections.values():
+            if conn.connected and now - conn.last_data > self.idle_timeout:
+                conn.idle_closed = True
+                conn.transport.abort()
+
+    def _deliver(self):
+        """把本节拍各设备新解析的数据拼成一个 dict，分发给订阅者并通过信号发给 Qt 页面"""
+        if not self._subscribers and self.receivers(self.data_received) == 0:
+            # 只有逐块订阅者（或没有消费者）时不拼接节拍批次
+            for conn in self._connections.values():
+                conn.pending.clear()
+            return
+        batch = {}
+        for name, conn in self._connections.items():
+            block = conn.take_pending()
+            if block is not None:
+                batch[name] = block
+        if not batch:
+            return
+        for callback in self._subscribers:
+            try:
+                callback(batch)
+            except Exception as e:
+                self.logger.error(f"订阅者处理数据失败: {e}")
+        self.data_received.emit(batch)
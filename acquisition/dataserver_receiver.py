@@ -0,0 +1,244 @@
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PyQt6.QtCore import QObject
+
+from .clock import ClockOffsetTracker
+from .dataserver_client import DATASERVER_DEVICES, DataServerClient, DeviceConfig
+from .delivery import BatchPublisher
+from .packets import EegBatch
+
+
+class DataServerReceiver(BatchPublisher):
+    """
+    Neuracle / HEEG / DSI 数据服务器（记录软件的 TCP 转发端口）接收器，对上层提供与 UdpEegReceiver 相同的接口，
+    Page2 等页面的绘图、录制与 set_trigger 可以不加区分地使用两者。
+
+    - 连接、重连与解析由一台设备的 DataServerClient 完成（asyncio 事件循环线程，非阻塞连接 + 指数退避重连），
+      start() 只启动事件循环，不在调用线程（GUI 线程）里等待网络；连接失败 / 断开经 error_occurred 报告；
+    - DataServerClient 每解析出一块 (n_chan, n) 数据就在事件循环线程中逐块回调，
+      本类用 EegBatch.from_block 把这一块包装成批次（samples / 各通道 data 都是该块的视图，不拷贝）；
+    - 通道 0..n_eeg-1 为 EEG；Neuracle / HEEG 的最后一行是带内 trigger 通道，放在 EegBatch.triggers 中，不作为 EEG 通道；
+    - 数据服务器不带片上时间戳：片上时间 = 会话内采样点序号 / 采样率，
+      校正时间 = 本次连接第一块数据按采样率倒推出的首点到达时间 + 本次连接内的采样点序号 / 采样率，与 UDP 的校正时间轴含义相同；
+      重连后重新取锚点（录制时形成新的时间段），每块数据都用最后一个采样点更新 ClockOffsetTracker，
+      host_to_eeg_time 据此把电脑时间映射到采样轴；
+    - 批次经 BatchPublisher 投递（subscribe 的订阅者在事件循环线程中回调，batch_received 由本接收器所在线程发出）。
+    """
+
+    # batch_received / error_occurred（含连接失败与断开）继承自 BatchPublisher
+
+    def __init__(
+        self, device: str = "Neuracle", host: str = "127.0.0.1", port: int = 8712,
+        n_chan: int = 9, sample_rate: float = 1000.0, t_buffer: float = 3.0,
+        clock_window_sec: float = 10.0, parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+        if device not in DATASERVER_DEVICES:
+            raise ValueError(f"不支持的设备类型 {device}，可选 {DATASERVER_DEVICES}")
+        self.device = device
+        self.host = host
+        self.port = port
+        # 与 DataServerThread 相同：Neuracle / HEEG 含最后一个 trigger 通道，DSI 为全部通道
+        self.n_chan = n_chan
+        self.sample_rate = float(sample_rate)
+        self.t_buffer = t_buffer
+        self.has_trigger_channel = device != "DSI"
+        self.n_eeg = n_chan - 1 if self.has_trigger_channel else n_chan
+        self.running = False
+        self.logger = logging.getLogger("DataServerReceiver")
+
+        self.device_name = f"{host}:{port}"
+        self._client = DataServerClient(
+            [DeviceConfig(self.device_name, device, host, port, n_chan=n_chan, srate=self.sample_rate,
+                          t_buffer=t_buffer)],
+            parent=self,
+        )
+        self._client.subscribe_blocks(self._on_block)
+        self._client.error_occurred.connect(self.error_occurred)
+        self._client.device_disconnected.connect(self._on_disconnected)
+
+        self._start_monotonic: Optional[float] = None
+        # 当前连接序号、本次连接第一个采样点在会话电脑时间轴上的时刻（秒）与本次连接已收到的采样点数
+        self._connection = 0
+        self._connection_t0: Optional[float] = None
+        self._connection_samples = 0
+        self._total_samples = 0
+        self._blocks = 0
+        self._events = 0
+        self._last_hw_timestamp: Optional[float] = None
+        self._last_regulated_ts: Optional[float] = None
+        self._clock_tracker = ClockOffsetTracker(clock_window_sec)
+
+    def get_last_hw_timestamp(self) -> Optional[float]:
+        """最近一个采样点的片上时间（秒，会话内采样点序号 / 采样率）；还没有收到数据时返回 None。"""
+        return self._last_hw_timestamp
+
+    def get_last_regulated_timestamp(self) -> Optional[float]:
+        """最近一个采样点的校正时间（秒）。"""
+        return self._last_regulated_ts
+
+    def host_to_eeg_time(self, t_monotonic: float, ch: int = 0) -> Optional[float]:
+        """
+        把电脑时间（time.monotonic() 的返回值）映射到校正时间轴。所有通道同步采样，共用一个映射，ch 只为与 UDP 接口一致；
+        接收器未启动或还没有收到数据时返回 None。
+        """
+        start = self._start_monotonic
+        if start is None or not 0 <= ch < self.n_eeg:
+            return None
+        return self._clock_tracker.to_regulated(t_monotonic - start)
+
+    def is_running(self) -> bool:
+        """当前是否连接着数据服务器并在接收（连接失败或断开后正在重连时为 False）。"""
+        return self.running and self._client.is_connected(self.device_name)
+
+    def get_drop_stats(self) -> dict:
+        """
+        TCP 不会丢包，返回接收统计：
+        - blocks: 已解析的数据块数
+        - samples: 每通道已接收的采样点数
+        - events: 带内 trigger 通道上的非零事件数
+        - connects / failures: 成功连接次数与连接失败次数
+        """
+        stats = self._client.get_stats()[self.device_name]
+        return {"blocks": self._blocks, "samples": self._total_samples, "events": self._events,
+                "connects": stats["connects"], "failures": stats["failures"]}
+
+    # -------- 启动 / 停止 --------
+
+    def start(self):
+        """启动事件循环并开始（在事件循环线程中）连接数据服务器；事件循环启动失败时抛出 RuntimeError"""
+        if self.running:
+            self.logger.warning("接收器已经在运行中")
+            return
+        self._reset_session()
+        self._client.start()
+        self.running = True
+        self.logger.info(f"开始连接 {self.device} 数据服务器 {self.host}:{self.port}，"
+                         f"{self.n_eeg} 个 EEG 通道 × {self.sample_rate:g} Hz")
+
+    def _reset_session(self):
+        self._connection = 0
+        self._connection_t0 = None
+        self._connection_samples = 0
+        self._total_samples = 0
+        self._blocks = 0
+        self._events = 0
+        self._last_hw_timestamp = None
+        self._last_regulated_ts = None
+        self._clock_tracker.reset()
+        self._start_monotonic = time.monotonic()
+
+    def stop(self):
+        """断开连接并停止事件循环；确认事件循环线程退出后送出发件箱中剩余的批次"""
+        if not self.running:
+            return
+        self.running = False
+        if self._client.stop():
+            # 事件循环已退出，所有数据块都已由逐块回调放进发件箱；在本线程按顺序送出剩余的批次，
+            # 保证 stop() 返回前最后几块数据已送达 GUI 线程的订阅者
+            self._finish_delivery(None)
+        self.logger.info(f"数据服务器接收器已停止: {self.get_drop_stats()}")
+
+    # -------- 事件循环线程回调 --------
+
+    def _on_block(self, name: str, block: np.ndarray, connection: int):
+        """DataServerClient 每解析出一块数据在事件循环线程中回调一次"""
+        now = time.monotonic() - self._start_monotonic
+        n = block.shape[1]
+        dt_s = 1.0 / self.sample_rate
+        if connection != self._connection:
+            # 新的连接（首次连接或重连）：按这一块倒推首点到达时间作为新的锚点，时钟映射重新估计
+            self._connection = connection
+            self._connection_t0 = max(now - (n - 1) * dt_s, 0.0)
+            self._connection_samples = 0
+            self._clock_tracker.reset()
+
+        self._total_samples += n
+        self._connection_samples += n
+        self._blocks += 1
+        hw_last = (self._total_samples - 1) * dt_s
+        regulated_last = self._connection_t0 + (self._connection_samples - 1) * dt_s
+        self._clock_tracker.update(now, regulated_last)
+        self._last_hw_timestamp = hw_last
+        self._last_regulated_ts = regulated_last
+
+        if self.has_trigger_channel:
+            triggers = block[-1]
+            self._events += int(np.count_nonzero(triggers))
+            batch = EegBatch.from_block(block[:-1], hw_last, regulated_last, triggers=triggers)
+        else:
+            batch = EegBatch.from_block(block, hw_last, regulated_last)
+
+        self._publish(batch)
+
+    def _on_disconnected(self, name: str, reason: str):
+        if not self.running:
+            return
+        message = f"数据服务器 {self.host}:{self.port} 连接断开（{reason}），正在重连"
+        self.logger.warning(message)
+        self.error_occurred.emit(message)
+
+
+# ====================== 按地址共享的接收器 ======================
+
+_receivers: Dict[Tuple[str, int], DataServerReceiver] = {}
+_receiver_refs: Dict[Tuple[str, int], int] = {}
+_receivers_lock = threading.Lock()
+
+
+def acquire_dataserver_receiver(
+    device: str = "Neuracle", host: str = "127.0.0.1", port: int = 8712,
+    n_chan: int = 9, sample_rate: float = 1000.0, t_buffer: float = 3.0,
+) -> DataServerReceiver:
+    """
+    获取（必要时创建并启动）host:port 数据服务器的共享接收器，引用计数 +1。
+    同一服务器只建立一条连接；已有的连接设备类型、通道数或采样率与请求不同时抛出 ValueError。
+    连接在接收器的事件循环线程中进行，本函数不等待网络；连接失败 / 断开经 error_occurred 报告并自动重连。
+    事件循环启动失败时抛出异常且不登记。
+    """
+    key = (host, port)
+    with _receivers_lock:
+        receiver = _receivers.get(key)
+        if receiver is not None:
+            if (receiver.device, receiver.n_chan, receiver.sample_rate) != (device, n_chan, float(sample_rate)):
+                raise ValueError(
+                    f"{host}:{port} 已按 {receiver.device} / {receiver.n_chan} 通道 / {receiver.sample_rate:g} Hz 连接，"
+                    f"与请求的 {device} / {n_chan} 通道 / {sample_rate:g} Hz 不一致"
+                )
+            _receiver_refs[key] += 1
+            return receiver
+        receiver = DataServerReceiver(device, host, port, n_chan=n_chan, sample_rate=sample_rate, t_buffer=t_buffer)
+        _receivers[key] = receiver
+        _receiver_refs[key] = 1
+
+    # 启动事件循环时不持有全局锁，其他地址的 acquire / release 不受影响
+    try:
+        receiver.start()
+    except Exception:
+        with _receivers_lock:
+            if _receivers.get(key) is receiver:
+                del _receivers[key]
+                del _receiver_refs[key]
+        receiver.deleteLater()
+        raise
+    return receiver
+
+
+def release_dataserver_receiver(receiver: DataServerReceiver):
+    """释放一次共享接收器的引用；最后一个使用者释放时断开连接并停止事件循环。"""
+    key = (receiver.host, receiver.port)
+    with _receivers_lock:
+        if _receivers.get(key) is not receiver:
+            return
+        _receiver_refs[key] -= 1
+        if _receiver_refs[key] > 0:
+            return
+        del _receivers[key]
+        del _receiver_refs[key]
+
+    receiver.stop()
+    receiver.deleteLater()
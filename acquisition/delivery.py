@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QThread, Qt, pyqtSignal
+
+from .packets import EegBatch
+
+
+class BatchPublisher(QObject):
+    """
+    接收器向上层投递 EegBatch 的公共部分（UdpEegReceiver / DataServerReceiver 的基类）：
+    - 非 Qt 订阅者（subscribe）在接收线程中直接回调，回调应尽量轻量；
+    - Qt 页面连接 batch_received：接收线程把批次放进本接收器自己的发件箱，发件箱由空变非空时排队一次 _outbox_ready，
+      由接收器所在线程（通常是 GUI 线程）按顺序取出并发出 batch_received；
+    - 子类的 stop() 在确认接收线程已经退出（尾包已由接收线程放进发件箱）后调用 _drain_outbox()，
+      同步送出本接收器剩余的批次，而不是用 QCoreApplication.sendPostedEvents 执行整个应用排队的槽函数。
+    子类需要在使用前设置 self.logger。
+    """
+
+    batch_received = pyqtSignal(object)  # 发出 EegBatch 实例
+    error_occurred = pyqtSignal(str)     # 错误发生
+    _outbox_ready = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        # 接收线程内回调的订阅者（copy-on-write，避免遍历时加锁）
+        self._subscribers: Tuple[Callable[[EegBatch], None], ...] = ()
+        self._subscribers_lock = threading.Lock()
+        # 等待在接收器所在线程发出 batch_received 的批次
+        self._outbox: Deque[EegBatch] = deque()
+        self._outbox_lock = threading.Lock()
+        self._outbox_ready.connect(self._drain_outbox, Qt.ConnectionType.QueuedConnection)
+
+    # -------- 订阅者 --------
+
+    def subscribe(self, callback: Callable[[EegBatch], None]):
+        """注册一个在接收线程中回调的订阅者（每次投递收到一个 EegBatch）。"""
+        with self._subscribers_lock:
+            if callback not in self._subscribers:
+                self._subscribers = self._subscribers + (callback,)
+
+    def unsubscribe(self, callback: Callable[[EegBatch], None]):
+        with self._subscribers_lock:
+            self._subscribers = tuple(cb for cb in self._subscribers if cb != callback)
+
+    # -------- 投递 --------
+
+    def _publish(self, batch: EegBatch):
+        """在接收线程中调用：先回调订阅者，再放进发件箱等待接收器所在线程发出 batch_received"""
+        for callback in self._subscribers:
+            try:
+                callback(batch)
+            except Exception as e:
+                self.logger.error(f"订阅者处理数据批次失败: {e}")
+
+        # 没有连接 batch_received 时（只有 subscribe 的消费者、可能没有事件循环）不进发件箱，避免无人取出而持续累积
+        if self.receivers(self.batch_received) == 0:
+            return
+        with self._outbox_lock:
+            notify = not self._outbox
+            self._outbox.append(batch)
+        if notify:
+            self._outbox_ready.emit()
+
+    def _drain_outbox(self):
+        """在接收器所在线程中按顺序发出发件箱里的所有批次；槽函数中再次调用（如 stop）也只是继续取剩余批次"""
+        while True:
+            with self._outbox_lock:
+                if not self._outbox:
+                    return
+                batch = self._outbox.popleft()
+            self.batch_received.emit(batch)
+
+    def _finish_delivery(self, thread: Optional[threading.Thread], timeout: float = 2.0) -> bool:
+        """
+        stop() 中调用：等待接收线程退出，确认退出后在调用线程（须为接收器所在线程）同步送出发件箱中剩余的批次；
+        线程仍未退出时不碰发件箱，返回 False。
+        """
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        if thread is not None and thread.is_alive():
+            self.logger.warning(f"接收线程未在 {timeout:g} s 内退出，未送出的批次留在发件箱中")
+            return False
+        if QThread.currentThread() is self.thread():
+            self._drain_outbox()
+        return True
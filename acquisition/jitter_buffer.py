@@ -0,0 +1,51 @@
+import heapq
+import itertools
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class JitterBuffer(Generic[T]):
+    """
+    单通道重排（抖动）缓冲，按片上时间排序输出。
+
+    - 以最小堆保存 (片上时间, 入队序号, 包)，插入 / 弹出均为 O(log n)，不再每包整体排序；
+    - 深度以时间计：只有当已收到的最新片上时间 - 某包片上时间 >= depth_sec 时，该包才会被输出，
+      因此延迟与包长、采样率无关；
+    - flush() 按时间顺序取出全部剩余包，用于停止时不丢尾巴。
+    """
+
+    def __init__(self, depth_sec: float = 0.1):
+        self.depth_sec = max(float(depth_sec), 0.0)
+        self._heap: List[Tuple[float, int, T]] = []
+        self._seq = itertools.count()
+        self._newest_ts: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, timestamp: float, item: T):
+        heapq.heappush(self._heap, (timestamp, next(self._seq), item))
+        if self._newest_ts is None or timestamp > self._newest_ts:
+            self._newest_ts = timestamp
+
+    def pop_ready(self) -> List[T]:
+        """弹出所有已超过缓冲深度的包（按片上时间升序）"""
+        ready: List[T] = []
+        if self._newest_ts is None:
+            return ready
+        deadline = self._newest_ts - self.depth_sec
+        heap = self._heap
+        while heap and heap[0][0] <= deadline:
+            ready.append(heapq.heappop(heap)[2])
+        return ready
+
+    def flush(self) -> List[T]:
+        """按片上时间升序取出全部剩余包并清空缓冲"""
+        items = [entry[2] for entry in sorted(self._heap)]
+        self.clear()
+        return items
+
+    def clear(self):
+        self._heap.clear()
+        self._newest_ts = None
@@ -0,0 +1,197 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# EegBatch.packets 的结构化 dtype：每个通道包一行，offset / count 指向 EegBatch.samples 中的区间
+PACKET_DTYPE = np.dtype([
+    ("channel", np.int16),
+    ("hardware_timestamp", np.float64),
+    ("system_timestamp", np.float64),
+    ("offset", np.int64),
+    ("count", np.int64),
+])
+
+
+def expand_sample_times(system_timestamps: np.ndarray, hardware_timestamps: np.ndarray,
+                        counts: np.ndarray, sample_rate: float) -> np.ndarray:
+    """
+    把每包“最后一个采样点”的时间展开成逐采样时间（秒），长度 == sum(counts)。
+    优先使用校正时间，未校正（<= 0）的包退回片上时间；采样率无效时返回空数组。
+    """
+    ends = np.cumsum(counts)
+    n_total = int(ends[-1]) if len(ends) else 0
+    if sample_rate is None or sample_rate <= 0 or n_total == 0:
+        return np.empty(0)
+
+    dt_s = 1.0 / sample_rate
+    base_ts = np.where(system_timestamps > 0, system_timestamps, hardware_timestamps)
+    # 第 i 个采样 = 所属包最后一点时间 - (包内最后一点的全局序号 - i) * dt
+    times = np.arange(n_total, dtype=np.float64)
+    times *= dt_s
+    times += np.repeat(base_ts - (ends - 1) * dt_s, counts)
+    return times
+
+
+class _SampleTimesCache:
+    """一个批次（或单独构造的通道块）的逐采样时间缓存，按采样率缓存最近一次展开的结果"""
+
+    __slots__ = ("system_timestamps", "hardware_timestamps", "counts", "sample_rate", "times")
+
+    def __init__(self, system_timestamps: np.ndarray, hardware_timestamps: np.ndarray, counts: np.ndarray):
+        self.system_timestamps = system_timestamps
+        self.hardware_timestamps = hardware_timestamps
+        self.counts = counts
+        self.sample_rate: Optional[float] = None
+        self.times: Optional[np.ndarray] = None
+
+    def get(self, sample_rate: float) -> np.ndarray:
+        times = self.times
+        if times is None or self.sample_rate != sample_rate:
+            times = expand_sample_times(self.system_timestamps, self.hardware_timestamps, self.counts, sample_rate)
+            self.sample_rate, self.times = sample_rate, times
+        return times
+
+
+@dataclass(slots=True)
+class EegDataPacket:
+    hardware_timestamp: float
+    system_timestamp: float
+    data: np.ndarray
+    packet_id: int = 0
+    channel: int = 0
+    # 帧头第 2~4 字节的传感器序列号；解析时就取出，不再保留整帧原始字节
+    serial: int = 0
+
+
+@dataclass(slots=True)
+class EegChannelChunk:
+    """
+    一个批次内单个通道的数据（均为 EegBatch.samples / EegBatch.packets 上的视图，不额外拷贝）：
+    - data: 本批该通道所有包的采样点按时间顺序拼接成的连续 float32 数组（μV）；
+    - system_timestamps / hardware_timestamps: 每个包“最后一个采样点”的校正时间 / 片上时间（秒）；
+    - counts: 每个包的采样点数，sum(counts) == len(data)。
+    逐采样时间由 sample_times() 按需展开：整个批次一次向量化展开并缓存，
+    同一批次的所有通道、所有订阅者（绘图、录制、其他页面）共用一份。
+    """
+    channel: int
+    data: np.ndarray
+    system_timestamps: np.ndarray
+    hardware_timestamps: np.ndarray
+    counts: np.ndarray
+    # data 在批次时间缓存中的起始下标
+    offset: int = 0
+    _times: Optional[_SampleTimesCache] = field(default=None, repr=False, compare=False)
+
+    def sample_times(self, sample_rate: float) -> np.ndarray:
+        """逐采样时间（秒），长度 == len(data)；采样率无效时返回空数组。返回的是共享缓存的视图，调用方不要原地修改"""
+        cache = self._times
+        if cache is None:
+            cache = self._times = _SampleTimesCache(self.system_timestamps, self.hardware_timestamps, self.counts)
+        times = cache.get(sample_rate)
+        if times.size == 0:
+            return times
+        return times[self.offset: self.offset + len(self.data)]
+
+
+@dataclass(slots=True)
+class EegBatch:
+    """
+    接收线程按固定节拍打包发给上层的一批数据：
+    - samples: 本批全部采样点（按通道分组、组内按时间顺序）拼成的一块 float32 数组；
+    - packets: 每个通道包一行的结构化数组（PACKET_DTYPE），与 samples 同序；
+    - channels: 每个通道一个 EegChannelChunk，是上面两者的切片视图；
+    - triggers: 带内 trigger 通道（Neuracle / HEEG 数据服务器的最后一行），与每个通道的采样点逐点对齐，
+      0 为无事件；UDP 数据没有带内 trigger，为 None。
+    """
+    channels: Dict[int, EegChannelChunk] = field(default_factory=dict)
+    # 本批第一个包的传感器序列号（没有包时为 None）
+    serial: Optional[int] = None
+    packets: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=PACKET_DTYPE))
+    samples: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+    triggers: Optional[np.ndarray] = None
+    _times: Optional[_SampleTimesCache] = field(default=None, repr=False, compare=False)
+
+    def sample_times(self, sample_rate: float) -> np.ndarray:
+        """与 samples 对齐的逐采样时间（秒），采样率无效或没有数据时返回空数组"""
+        if self._times is None:
+            self._times = _SampleTimesCache(
+                self.packets["system_timestamp"], self.packets["hardware_timestamp"], self.packets["count"]
+            )
+        return self._times.get(sample_rate)
+
+    @classmethod
+    def from_packets(cls, packets: List[EegDataPacket]) -> "EegBatch":
+        n = len(packets)
+        if n == 0:
+            return cls()
+
+        index = np.empty(n, dtype=PACKET_DTYPE)
+        index["channel"] = np.fromiter((p.channel for p in packets), dtype=np.int16, count=n)
+        index["hardware_timestamp"] = np.fromiter((p.hardware_timestamp for p in packets), dtype=np.float64, count=n)
+        index["system_timestamp"] = np.fromiter((p.system_timestamp for p in packets), dtype=np.float64, count=n)
+        index["count"] = np.fromiter((len(p.data) for p in packets), dtype=np.int64, count=n)
+
+        # 按通道稳定排序，组内保持到达（即片上时间）顺序
+        order = np.argsort(index["channel"], kind="stable")
+        index = index[order]
+        samples = np.concatenate([packets[i].data for i in order.tolist()]).astype(np.float32, copy=False)
+        counts = index["count"]
+        index["offset"] = np.cumsum(counts) - counts
+
+        times_cache = _SampleTimesCache(index["system_timestamp"], index["hardware_timestamp"], counts)
+        channels: Dict[int, EegChannelChunk] = {}
+        ch_col = index["channel"]
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(ch_col)) + 1, [n])).tolist()
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            ch = int(ch_col[a])
+            start = int(index["offset"][a])
+            stop = int(index["offset"][b - 1] + counts[b - 1])
+            channels[ch] = EegChannelChunk(
+                channel=ch,
+                data=samples[start:stop],
+                system_timestamps=index["system_timestamp"][a:b],
+                hardware_timestamps=index["hardware_timestamp"][a:b],
+                counts=counts[a:b],
+                offset=start,
+                _times=times_cache,
+            )
+
+        return cls(channels=channels, serial=packets[0].serial, packets=index, samples=samples, _times=times_cache)
+
+    @classmethod
+    def from_block(cls, block: np.ndarray, hardware_timestamp: float, system_timestamp: float,
+                   serial: Optional[int] = None, triggers: Optional[np.ndarray] = None) -> "EegBatch":
+        """
+        由所有通道同步采样的 (n_ch, n) 数据块构造批次（如 DataServerThread 解析出的一块），每个通道一个“包”。
+        hardware_timestamp / system_timestamp 为最后一个采样点的片上时间 / 校正时间（秒）。
+        block 为 C 连续的 float32 时 samples 与各通道 data 都是它的视图，不做拷贝。
+        """
+        block = np.ascontiguousarray(block, dtype=np.float32)
+        n_ch, n = block.shape
+        if n_ch == 0 or n == 0:
+            return cls(serial=serial)
+
+        index = np.empty(n_ch, dtype=PACKET_DTYPE)
+        index["channel"] = np.arange(n_ch, dtype=np.int16)
+        index["hardware_timestamp"] = hardware_timestamp
+        index["system_timestamp"] = system_timestamp
+        index["offset"] = np.arange(n_ch, dtype=np.int64) * n
+        index["count"] = n
+        samples = block.reshape(-1)
+
+        times_cache = _SampleTimesCache(index["system_timestamp"], index["hardware_timestamp"], index["count"])
+        channels: Dict[int, EegChannelChunk] = {}
+        for ch in range(n_ch):
+            channels[ch] = EegChannelChunk(
+                channel=ch,
+                data=block[ch],
+                system_timestamps=index["system_timestamp"][ch:ch + 1],
+                hardware_timestamps=index["hardware_timestamp"][ch:ch + 1],
+                counts=index["count"][ch:ch + 1],
+                offset=ch * n,
+                _times=times_cache,
+            )
+
+        return cls(channels=channels, serial=serial, packets=index, samples=samples,
+                   triggers=triggers, _times=times_cache)
@@ -0,0 +1,127 @@
+"""
+原始 datagram 抓包 / 回放命令行工具，用于无头设备时复现现场问题和确定性地压测整条接收流水线。
+
+用法（在项目根目录下）：
+    # 监听端口抓包 60 秒，同时打印实时接收输出的摘要
+    python -m acquisition.replay record data/field.eegcap --port 30300 --seconds 60
+    # 按 1 倍速 / 10 倍速 / 全速回放，打印每通道采样数、吞吐与输出摘要（摘要与倍速无关）
+    python -m acquisition.replay play data/field.eegcap --speed 1
+    python -m acquisition.replay play data/field.eegcap --speed 10
+    python -m acquisition.replay play data/field.eegcap --speed 0
+"""
+
+import sys
+import time
+import hashlib
+import argparse
+import threading
+from typing import Dict
+
+from PyQt6.QtCore import QCoreApplication
+
+from .packets import EegBatch
+from .udp_v2 import UdpEegReceiver
+
+
+class ReplayDigest:
+    """
+    订阅接收器输出，统计批次 / 采样数，并对每个通道的采样值和时间戳流分别做 SHA-256，
+    用于比对两次回放（或回放与实时接收）是否逐位一致；摘要与批次如何切分无关。
+    """
+
+    def __init__(self):
+        # 每个通道三条流（采样值 / 校正时间 / 片上时间）各一个哈希
+        self._hashes: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.samples: Dict[int, int] = {}
+
+    def __call__(self, batch: EegBatch):
+        with self._lock:
+            self.batches += 1
+            for ch in sorted(batch.channels):
+                chunk = batch.channels[ch]
+                hashes = self._hashes.get(ch)
+                if hashes is None:
+                    hashes = self._hashes[ch] = (hashlib.sha256(), hashlib.sha256(), hashlib.sha256())
+                hashes[0].update(chunk.data.tobytes())
+                hashes[1].update(chunk.system_timestamps.tobytes())
+                hashes[2].update(chunk.hardware_timestamps.tobytes())
+                self.samples[ch] = self.samples.get(ch, 0) + len(chunk.data)
+
+    def hexdigest(self) -> str:
+        with self._lock:
+            total = hashlib.sha256()
+            for ch in sorted(self._hashes):
+                total.update(ch.to_bytes(2, "little"))
+                for h in self._hashes[ch]:
+                    total.update(h.digest())
+            return total.hexdigest()
+
+
+def record(path: str, host: str, port: int, seconds: float):
+    receiver = UdpEegReceiver(host=host, port=port)
+    digest = ReplayDigest()
+    receiver.subscribe(digest)
+    receiver.start()
+    receiver.start_capture(path)
+    try:
+        time.sleep(seconds)
+    except KeyboardInterrupt:
+        pass
+    capture = receiver.stop_capture()
+    receiver.stop()
+    print(f"{path}: {capture.datagrams} 个 datagram，{capture.bytes} 字节")
+    # 抓包与接收同时开始时，回放同一文件得到的摘要应与此一致
+    print(f"实时摘要: {digest.hexdigest()}")
+
+
+def play(path: str, speed: float) -> ReplayDigest:
+    receiver = UdpEegReceiver()
+    digest = ReplayDigest()
+    receiver.subscribe(digest)
+
+    t0 = time.perf_counter()
+    receiver.start_replay(path, speed=speed)
+    try:
+        receiver.receiver_thread.join()
+    except KeyboardInterrupt:
+        receiver.stop()
+    elapsed = time.perf_counter() - t0
+
+    total = sum(digest.samples.values())
+    stats = receiver.get_drop_stats()
+    print(f"{path}: {stats['datagrams']} 个 datagram，{digest.batches} 个批次，用时 {elapsed:.3f} s")
+    for ch in sorted(digest.samples):
+        print(f"  通道 {ch}: {digest.samples[ch]} 个采样，时间戳缺口 {stats['gap_lost'].get(ch, 0)} 包")
+    if elapsed > 0:
+        print(f"吞吐: {stats['datagrams'] / elapsed:.0f} datagram/s，{total / elapsed:.0f} 采样/s")
+    print(f"摘要: {digest.hexdigest()}")
+    return digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="原始 datagram 抓包 / 回放")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="监听 UDP 端口并抓包")
+    p_record.add_argument("path")
+    p_record.add_argument("--host", default="0.0.0.0")
+    p_record.add_argument("--port", type=int, default=30300)
+    p_record.add_argument("--seconds", type=float, default=60.0)
+
+    p_play = sub.add_parser("play", help="回放抓包文件")
+    p_play.add_argument("path")
+    p_play.add_argument("--speed", type=float, default=1.0, help="回放倍速，0 为全速")
+
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv)  # noqa: F841  接收器是 QObject，需要一个应用实例
+
+    if args.command == "record":
+        record(args.path, args.host, args.port, args.seconds)
+    else:
+        play(args.path, args.speed)
+
+
+if __name__ == "__main__":
+    main()
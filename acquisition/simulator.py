@@ -0,0 +1,292 @@
+"""
+本机 V2 UDP 设备模拟器 / 压力发生器：按 V2 帧格式持续发送多通道数据，无需真实硬件即可测试
+UdpEegReceiver、Page2、Page10，并可叠加网络抖动、乱序和丢包。
+
+帧格式（与 UdpEegReceiver 解包一致）：
+    SensorType, SensorType, Serial(3B), Channel, DataLength(2B 大端),
+    Data(每点 3 字节 24bit 大端有符号，单位 nV), OnBoardTime(8B 大端 uint64，微秒), CRC8
+
+用法（在项目根目录下）：
+    python -m acquisition.simulator --channels 8 --fs 1000
+    python -m acquisition.simulator --channels 32 --fs 4000 --samples 40 --jitter-ms 5 --reorder 0.01 --loss 0.001
+    python -m acquisition.simulator --channels 64 --fs 4000 --seconds 30 --crc crc8
+"""
+
+import json
+import time
+import heapq
+import socket
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+FRAME_OVERHEAD = 17  # header(8) + timestamp(8) + CRC(1)
+
+_CRC8_TABLE = []
+for _byte in range(256):
+    _crc = _byte
+    for _ in range(8):
+        _crc = ((_crc << 1) ^ 0x07) & 0xFF if _crc & 0x80 else (_crc << 1) & 0xFF
+    _CRC8_TABLE.append(_crc)
+
+
+def crc8(data: bytes) -> int:
+    """CRC-8（多项式 0x07，初值 0）。接收端目前不校验，只在 --crc crc8 时计算"""
+    crc = 0
+    table = _CRC8_TABLE
+    for b in data:
+        crc = table[crc ^ b]
+    return crc
+
+
+def encode_v2_frames(samples_nv: np.ndarray, channels: np.ndarray, timestamp_us: int,
+                     serial: int = 3, sensor_type: int = 1, with_crc: bool = False) -> np.ndarray:
+    """
+    把一个节拍内所有通道的数据一次性编码成 V2 帧。
+    samples_nv: (n_channels, n_samples) 的整数采样（nV，须在 24bit 范围内）；
+    返回 (n_channels, FRAME_OVERHEAD + 3 * n_samples) 的 uint8 数组，每行一帧。
+    """
+    n_ch, n = samples_nv.shape
+    data_length = 3 * n
+    frames = np.empty((n_ch, FRAME_OVERHEAD + data_length), dtype=np.uint8)
+    frames[:, 0] = sensor_type
+    frames[:, 1] = sensor_type
+    frames[:, 2:5] = np.frombuffer(int(serial & 0xFFFFFF).to_bytes(3, "big"), dtype=np.uint8)
+    frames[:, 5] = channels
+    frames[:, 6:8] = np.frombuffer(data_length.to_bytes(2, "big"), dtype=np.uint8)
+    be = np.ascontiguousarray(samples_nv, dtype=">i4").view(np.uint8).reshape(n_ch, n, 4)
+    frames[:, 8:8 + data_length] = be[:, :, 1:].reshape(n_ch, data_length)
+    frames[:, 8 + data_length:16 + data_length] = np.frombuffer(
+        int(timestamp_us).to_bytes(8, "big"), dtype=np.uint8
+    )
+    frames[:, -1] = 0
+    if with_crc:
+        for row in frames:
+            row[-1] = crc8(row[:-1].tobytes())
+    return frames
+
+
+@dataclass
+class SimulatorConfig:
+    host: str = "127.0.0.1"
+    port: int = 30300
+    channels: int = 8
+    sample_rate: float = 1000.0
+    samples_per_packet: int = 40
+    serial: int = 3
+    sensor_type: int = 1
+    # 单个 datagram 的最大字节数，通道帧按此上限拼包（接收端默认 buffer_size 为 8192）
+    max_datagram: int = 8192
+    # 每个 datagram 额外延迟 U(0, jitter_ms) 毫秒发送
+    jitter_ms: float = 0.0
+    # 以此概率把一个 datagram 推迟到下一个节拍之后发送（造成乱序）
+    reorder_rate: float = 0.0
+    # 以此概率丢弃一个 datagram
+    loss_rate: float = 0.0
+    amplitude_uv: float = 50.0
+    noise_uv: float = 5.0
+    with_crc: bool = False
+    seed: Optional[int] = None
+
+
+class V2DeviceSimulator:
+    """
+    在独立线程中按采样率节拍发送 V2 帧：
+    - 每个节拍为全部通道生成 samples_per_packet 个采样（不同频率的正弦 + 噪声），一次向量化编码；
+    - 通道帧按 max_datagram 拼成若干 datagram；
+    - 抖动 / 乱序通过给每个 datagram 分配发送时刻、再按时刻从堆中取出实现，丢包直接跳过；
+    - 发送跟不上节拍时不丢数据、不跳时间戳，只累计 max_lag_ms，用于判断模拟器本身是否成为瓶颈。
+    """
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self._rng = np.random.default_rng(config.seed)
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        n_ch = config.channels
+        self._channels = np.arange(n_ch, dtype=np.uint8)
+        self._freqs = 5.0 + np.arange(n_ch, dtype=np.float64) % 40
+        self._packet_period = config.samples_per_packet / config.sample_rate
+
+        self.ticks = 0
+        self.datagrams_sent = 0
+        self.datagrams_dropped = 0
+        self.datagrams_reordered = 0
+        self.bytes_sent = 0
+        self.max_lag_ms = 0.0
+        self.started_at: Optional[float] = None
+
+    # ---------------- 控制 ----------------
+
+    def start(self):
+        if self._running:
+            return
+        if self.config.channels > 255:
+            raise ValueError("V2 帧的通道号只有 1 字节，通道数不能超过 255")
+        frame_len = FRAME_OVERHEAD + 3 * self.config.samples_per_packet
+        if frame_len > self.config.max_datagram:
+            raise ValueError(f"单通道帧 {frame_len} 字节超过 max_datagram={self.config.max_datagram}")
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+        except OSError:
+            pass
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="V2-Simulator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        cfg = self.config
+        return {
+            "elapsed_s": elapsed,
+            "ticks": self.ticks,
+            "samples_per_channel": self.ticks * cfg.samples_per_packet,
+            "datagrams_sent": self.datagrams_sent,
+            "datagrams_dropped": self.datagrams_dropped,
+            "datagrams_reordered": self.datagrams_reordered,
+            "bytes_sent": self.bytes_sent,
+            "mbit_per_s": self.bytes_sent * 8 / elapsed / 1e6 if elapsed > 0 else 0.0,
+            "max_lag_ms": self.max_lag_ms,
+        }
+
+    # ---------------- 生成 ----------------
+
+    def make_datagrams(self, tick: int) -> List[bytes]:
+        """生成第 tick 个节拍的全部 datagram（不含抖动 / 丢包处理）"""
+        cfg = self.config
+        n = cfg.samples_per_packet
+        idx = tick * n + np.arange(n, dtype=np.float64)
+        t = idx / cfg.sample_rate
+        signal = cfg.amplitude_uv * np.sin(2 * np.pi * self._freqs[:, None] * t[None, :])
+        if cfg.noise_uv > 0:
+            signal += self._rng.normal(0.0, cfg.noise_uv, size=signal.shape)
+        samples_nv = np.clip(np.rint(signal * 1000.0), -(1 << 23), (1 << 23) - 1).astype(np.int32)
+
+        # 片上时间取本包最后一个采样点的时刻（微秒）
+        timestamp_us = int(round((tick + 1) * n * 1e6 / cfg.sample_rate))
+        frames = encode_v2_frames(samples_nv, self._channels, timestamp_us,
+                                  serial=cfg.serial, sensor_type=cfg.sensor_type, with_crc=cfg.with_crc)
+
+        frames_per_datagram = max(cfg.max_datagram // frames.shape[1], 1)
+        return [
+            frames[i: i + frames_per_datagram].tobytes()
+            for i in range(0, frames.shape[0], frames_per_datagram)
+        ]
+
+    def _run(self):
+        cfg = self.config
+        rng = self._rng
+        addr = (cfg.host, cfg.port)
+        sock = self._sock
+        jitter_s = max(cfg.jitter_ms, 0.0) / 1000.0
+        # (发送时刻, 序号, datagram)
+        schedule: List[Tuple[float, int, bytes]] = []
+        seq = 0
+
+        t0 = self.started_at = time.monotonic()
+        next_tick_at = t0
+        while self._running:
+            now = time.monotonic()
+
+            # 生成所有已到期节拍的数据
+            while next_tick_at <= now:
+                for datagram in self.make_datagrams(self.ticks):
+                    if cfg.loss_rate > 0 and rng.random() < cfg.loss_rate:
+                        self.datagrams_dropped += 1
+                        continue
+                    due = next_tick_at
+                    if jitter_s > 0:
+                        due += rng.uniform(0.0, jitter_s)
+                    if cfg.reorder_rate > 0 and rng.random() < cfg.reorder_rate:
+                        due += self._packet_period * 1.5
+                        self.datagrams_reordered += 1
+                    heapq.heappush(schedule, (due, seq, datagram))
+                    seq += 1
+                self.ticks += 1
+                next_tick_at = t0 + self.ticks * self._packet_period
+
+            # 发送所有已到发送时刻的 datagram
+            now = time.monotonic()
+            while schedule and schedule[0][0] <= now:
+                due, _, datagram = heapq.heappop(schedule)
+                lag_ms = (now - due) * 1000.0
+                if lag_ms > self.max_lag_ms:
+                    self.max_lag_ms = lag_ms
+                try:
+                    sock.sendto(datagram, addr)
+                except OSError:
+                    # 发送缓冲区满时视为丢包，继续保持节拍
+                    self.datagrams_dropped += 1
+                    continue
+                self.datagrams_sent += 1
+                self.bytes_sent += len(datagram)
+
+            wake_at = min(next_tick_at, schedule[0][0]) if schedule else next_tick_at
+            delay = wake_at - time.monotonic()
+            if delay > 0:
+                time.sleep(min(delay, 0.05))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="V2 UDP 设备模拟器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=30300)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--fs", type=float, default=1000.0, help="每通道采样率（Hz）")
+    parser.add_argument("--samples", type=int, default=40, help="每个通道包的采样点数")
+    parser.add_argument("--serial", type=int, default=3)
+    parser.add_argument("--max-datagram", type=int, default=8192)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--reorder", type=float, default=0.0, help="乱序概率")
+    parser.add_argument("--loss", type=float, default=0.0, help="丢包概率")
+    parser.add_argument("--crc", choices=("none", "crc8"), default="none",
+                        help="CRC 字节：none 填 0（接收端不校验，开销最小），crc8 逐帧计算")
+    parser.add_argument("--seconds", type=float, default=0.0, help="运行时长，0 为一直运行到 Ctrl+C")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--report", type=float, default=5.0, help="统计输出间隔（秒）")
+    parser.add_argument("--json", action="store_true", help="只在结束时输出一行 JSON 统计（供压测脚本解析）")
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        host=args.host, port=args.port, channels=args.channels, sample_rate=args.fs,
+        samples_per_packet=args.samples, serial=args.serial, max_datagram=args.max_datagram,
+        jitter_ms=args.jitter_ms, reorder_rate=args.reorder, loss_rate=args.loss,
+        with_crc=args.crc == "crc8", seed=args.seed,
+    )
+    sim = V2DeviceSimulator(config)
+    sim.start()
+    if not args.json:
+        print(f"发送到 {args.host}:{args.port}：{args.channels} 通道 × {args.fs:g} Hz，{args.samples} 点/包")
+    t_end = time.monotonic() + args.seconds if args.seconds > 0 else None
+    try:
+        while t_end is None or time.monotonic() < t_end:
+            time.sleep(args.report if t_end is None else min(args.report, max(t_end - time.monotonic(), 0.0)))
+            if not args.json:
+                print(sim.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+    if args.json:
+        print(json.dumps(sim.stats()))
+    else:
+        print("结束:", sim.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import threading
+from collections import deque
+from typing import List
+
+from .packets import EegDataPacket
+
+
+class PacketTap:
+    """
+    接收器的可选旁路：保留最近 max_packets 个已排序的通道包（环形，满了覆盖最旧的），
+    供调试 / 抓包检查使用。默认不启用，启用后内存占用也有上限。
+
+    append() 由接收线程调用，snapshot() / drain() 可在任意线程调用。
+    """
+
+    def __init__(self, max_packets: int = 1000):
+        self.max_packets = max(int(max_packets), 1)
+        self._packets: "deque[EegDataPacket]" = deque(maxlen=self.max_packets)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._packets)
+
+    def append(self, packet: EegDataPacket):
+        with self._lock:
+            self._packets.append(packet)
+            self.total += 1
+
+    def snapshot(self) -> List[EegDataPacket]:
+        """返回当前保留的包（按接收顺序），不清空"""
+        with self._lock:
+            return list(self._packets)
+
+    def drain(self) -> List[EegDataPacket]:
+        """取出当前保留的全部包并清空"""
+        with self._lock:
+            packets = list(self._packets)
+            self._packets.clear()
+        return packets
@@ -0,0 +1,802 @@
+import sys
+import time
+import random
+import socket
+import struct
+import logging
+import selectors
+import threading
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .capture import CaptureWriter, iter_capture, read_capture_header
+from .clock import ClockOffsetTracker
+from .delivery import BatchPublisher
+from .jitter_buffer import JitterBuffer
+from .packets import EegBatch, EegDataPacket
+from .tap import PacketTap
+
+
+# ====================== 24bit 采样点解码 ======================
+
+def _int24_to_uv(raw: np.ndarray) -> np.ndarray:
+    """(..., 3) 的 uint8 大端 24bit 采样 -> 同形状去掉最后一维的 float32 μV"""
+    widened = np.zeros(raw.shape[:-1] + (4,), dtype=np.uint8)
+    widened[..., :3] = raw
+    values = widened.view(">i4")[..., 0] >> 8
+    samples = values.astype(np.float32)
+    samples /= np.float32(1000.0)
+    return samples
+
+
+def decode_int24_samples(frame_data, offset: int, data_length: int) -> np.ndarray:
+    """
+    将数据区中的 24bit 大端有符号整数批量解码为 μV（float32）。
+    - 每 3 个字节一个采样点，拷贝到 4 字节大端整数的高 3 字节后算术右移 8 位完成符号扩展；
+    - 原始值单位为 nV，除以 1000 得到 μV。
+    """
+    n = data_length // 3
+    if n <= 0:
+        return np.empty(0, dtype=np.float32)
+    raw = np.frombuffer(frame_data, dtype=np.uint8, count=n * 3, offset=offset).reshape(n, 3)
+    return _int24_to_uv(raw)
+
+
+def decode_int24_frames(buf, offsets: List[int], counts: List[int]) -> Tuple[np.ndarray, List[int]]:
+    """
+    一次解码同一个 datagram 内多个帧的数据区（offsets[k] 为第 k 帧数据区在 buf 中的起点，counts[k] 为其采样点数）。
+    整个 datagram 只在 buf 上建一次零拷贝视图、做一次解码：
+    - 各帧采样点数相同且等间距（设备的常见拼包方式）时，数据区直接取成 (帧数, 采样点数, 3) 的跨步视图；
+    - 否则用 np.frombuffer 取整个 datagram，把各帧数据区切片拼接后再解码。
+    返回 (samples, bounds)：samples 为所有帧按顺序拼接的 float32 μV，第 k 帧为 samples[bounds[k]:bounds[k + 1]]。
+    """
+    bounds = list(accumulate(counts, initial=0))
+    k = len(offsets)
+    if k == 0:
+        return np.empty(0, dtype=np.float32), bounds
+    n = counts[0]
+    stride = offsets[1] - offsets[0] if k > 1 else 3 * n
+    if stride >= 3 * n and all(c == n for c in counts) and \
+            all(offsets[j] - offsets[j - 1] == stride for j in range(1, k)):
+        raw = np.ndarray((k, n, 3), dtype=np.uint8, buffer=buf, offset=offsets[0], strides=(stride, 3, 1))
+    else:
+        u8 = np.frombuffer(buf, dtype=np.uint8)
+        raw = np.concatenate([u8[o: o + 3 * c] for o, c in zip(offsets, counts)]).reshape(-1, 3)
+    return _int24_to_uv(raw).reshape(-1), bounds
+
+
+# ====================== 数据结构 & 时间校正 ======================
+
+@dataclass
+class TimeRegulatingResult:
+    valid: bool
+    pack_skipped: bool
+    regulated_time: float
+
+
+class ActualTimeRegulator:
+    """
+    时间校正器（对应 C# ActualTimeRegulator）：
+    - pack_time: 片上时间（秒）
+    - received_at: 会话起点以来的 elapsed 秒（monotonic）
+    """
+
+    def __init__(self, rollback_tolerance_sec: float = 0.01):
+        self._first_pack_time: float = 0.0
+        self._prev_pack_time: float = 0.0
+        self._first_pack_computer_time: float = 0.0
+        self._first_pack: bool = True
+        # 当片上时间回退超过此阈值时，认为异常并重置
+        self._rollback_tolerance = rollback_tolerance_sec
+
+    def reset(self):
+        self._first_pack = True
+        self._prev_pack_time = 0.0
+        self._first_pack_time = 0.0
+        self._first_pack_computer_time = 0.0
+
+    def get_time(self, pack_time: float, received_at: float) -> TimeRegulatingResult:
+        if (not self._first_pack) and (pack_time + self._rollback_tolerance < self._prev_pack_time):
+            # 片上时间明显回退，认为异常，重置状态并跳过该包
+            self.reset()
+            return TimeRegulatingResult(False, True, received_at)
+
+        if self._first_pack:
+            # 第一包：建立基准，只记录，不输出校正时间
+            self._first_pack_time = pack_time
+            self._first_pack_computer_time = received_at
+            self._first_pack = False
+            self._prev_pack_time = pack_time
+            return TimeRegulatingResult(False, False, received_at)
+
+        # 对齐到电脑时间轴
+        regulated = (pack_time - self._first_pack_time) + self._first_pack_computer_time
+        self._prev_pack_time = pack_time
+        return TimeRegulatingResult(True, False, regulated)
+
+
+# ====================== UDP 接收器 ======================
+
+# Linux 下 SO_RXQ_OVFL 让内核在每个 datagram 的辅助数据里附带“因接收缓冲区溢出而丢弃的累计包数”，
+# Python 的 socket 模块没有导出该常量，这里按 <asm-generic/socket.h> 写死
+_SO_RXQ_OVFL = 40 if sys.platform.startswith("linux") else None
+
+
+class UdpEegReceiver(BatchPublisher):
+    """
+    UDP EEG数据接收器 - PyQt6版本
+
+    解包逻辑与 C# 的 V2BufferParser 对齐：
+    每个包结构（从某个索引 i 开始）：
+        [0]   SensorType
+        [1]   SensorType  (与 [0] 相同)
+        [2-4] Serial Number (3字节)
+        [5]   Channel Number (0xFF = MetaInfo)
+        [6-7] DataLength (大端)
+        [8 ... 8+DataLength-1]       Data 区
+        [8+DataLength ... +7]        OnBoardTime 时间戳（8字节，大端 uint64，单位：微秒）
+        [8+DataLength+8]             CRC8 校验和（此处暂不实际校验，只预留接口）
+
+    总长度 = DataLength + PACK_INFO_LENGTH (17)
+
+    同一端口只应存在一个接收器（通过 acquire_receiver / release_receiver 共享），
+    每个 datagram 只解析一次。排序后的包先在接收线程内攒批（只由接收线程读写，无需加锁），
+    每 delivery_interval_ms 打包成一个 EegBatch 分发给所有订阅者：
+    - Qt 页面：连接 batch_received 信号（经 BatchPublisher 的发件箱在 GUI 线程中按顺序发出）；
+    - 非 Qt 消费者（如推理线程）：subscribe(callback)，在接收线程中直接回调，回调应尽量轻量。
+    停止时由接收线程在退出前把重排缓冲中的尾包投递出去，stop() 确认线程退出后只送出本接收器发件箱中的批次。
+
+    抓包与回放：start_capture(path) 把每个原始 datagram 连同接收时间追加到抓包文件；
+    start_replay(path, speed) 不打开 socket，而是把抓包文件按原接收时间送回同一条解析 / 校正 / 排序 / 投递流水线，
+    speed=1 为实时、N 为 N 倍速、0 为不等待全速回放，结果与倍速无关。
+    """
+
+    # batch_received(EegBatch) / error_occurred(str) 继承自 BatchPublisher
+    replay_finished = pyqtSignal()       # 回放到达文件末尾（尾包已投递）
+
+    PACK_INFO_LENGTH = 17  # header(8) + timestamp(8) + CRC(1)
+
+    MAX_DATAGRAMS_PER_BATCH = 256  # 一次唤醒最多取出的 datagram 数，避免长时间不检查 running
+    STAT_INTERVAL_SEC = 5.0        # 接收速率 / 丢包统计的日志间隔
+
+    def __init__(
+        self, host: str = "0.0.0.0", port: int = 30300, buffer_size: int = 8192,
+        reorder_depth_ms: float = 100.0, delivery_interval_ms: float = 20.0,
+        parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.buffer_size = buffer_size
+        # 每通道重排缓冲的深度（毫秒，按片上时间计）
+        self.reorder_depth_ms = reorder_depth_ms
+        # 向上层投递批次的节拍（毫秒）
+        self.delivery_interval_ms = delivery_interval_ms
+        self.socket: Optional[socket.socket] = None
+        self.running = False
+        # 可选的包旁路（enable_tap 启用），默认为 None，不保留任何历史包
+        self.packet_tap: Optional[PacketTap] = None
+        # 原始 datagram 抓包（start_capture 启用）
+        self._capture: Optional[CaptureWriter] = None
+        self.packet_count = 0
+        self.active_channels = set()
+        self.logger = logging.getLogger("UdpEegReceiver")
+
+        self._recv_count = 0
+        self._last_stat_time = time.time()
+        self._last_stat_count = 0
+        self.receiver_thread: Optional[threading.Thread] = None
+
+        # ====== 丢包统计 ======
+        # 内核丢包：socket 接收缓冲区溢出被内核丢弃的 datagram 数（仅 Linux 可用，其余平台为 None）
+        self._kernel_drop_supported = False
+        self._kernel_dropped: int = 0
+        # 时间戳缺口：按片上时间推断的“传感器端 / 网络中丢失”的通道包数（包含内核丢包造成的缺口）
+        self._gap_lost: Dict[int, int] = {}
+        self._last_emitted_hw_ts: Dict[int, float] = {}
+        self._nominal_interval: Dict[int, float] = {}
+        # 模拟丢包丢弃的 datagram 数
+        self._simulated_dropped: int = 0
+
+        # 最近一次接收到的片上时间戳（秒）
+        self._last_hw_timestamp: Optional[float] = None
+        # 最近一次接收到的“校正后的电脑时间”（秒）
+        self._last_regulated_ts: Optional[float] = None
+
+        # 每个通道一个时间纠正器和重排缓冲区
+        self._time_regulators: Dict[int, ActualTimeRegulator] = {}
+        self._sorted_packets: Dict[int, JitterBuffer[EegDataPacket]] = {}
+        # 每个通道一个电脑时间 → 校正时间的偏移估计，用于把 trigger 的电脑时间映射到采样轴
+        self._clock_trackers: Dict[int, ClockOffsetTracker] = {}
+
+        # 会话起点，用于生成“电脑时间轴” received_at
+        self._start_monotonic: Optional[float] = None
+
+        # 待投递的包（仅接收线程访问）与上次投递时间
+        self._pending_packets: List[EegDataPacket] = []
+        self._last_delivery: float = 0.0
+
+        # ====== 模拟网络不稳定相关参数 ======
+        self.enable_loss_simulation = False   # 是否开启模拟丢包
+        self.loss_rate = 0.6                  # 丢包比例（0~1）
+        self.enable_jitter_simulation = False  # 是否模拟随机延迟
+        self.jitter_max_delay = 0.05           # 最大延迟秒数
+
+    def get_last_hw_timestamp(self) -> Optional[float]:
+        """返回最近一次接收到的数据包的片上时间戳（秒）。如果还没有收到任何数据则返回 None。"""
+        return self._last_hw_timestamp
+
+    def get_last_regulated_timestamp(self) -> Optional[float]:
+        """
+        返回最近一次接收到的数据包的“校正后的电脑时间”（秒）。
+        """
+        return self._last_regulated_ts
+
+    def host_to_eeg_time(self, t_monotonic: float, ch: int = 0) -> Optional[float]:
+        """
+        把电脑时间（time.monotonic() 的返回值）映射到 ch 通道的校正时间轴，
+        即与 EegChannelChunk.system_timestamps / 录制文件 Time 列相同的时间轴。
+        接收器未启动或该通道还没有有效包时返回 None。
+        """
+        start = self._start_monotonic
+        tracker = self._clock_trackers.get(ch)
+        if start is None or tracker is None:
+            return None
+        return tracker.to_regulated(t_monotonic - start)
+
+    def is_running(self) -> bool:
+        """当前 UDP 接收线程是否在运行。"""
+        return self.running
+
+    def get_drop_stats(self) -> dict:
+        """
+        返回丢包统计：
+        - datagrams: 已接收的 datagram 数
+        - kernel_dropped: 内核因接收缓冲区溢出丢弃的 datagram 数（平台不支持时为 None）
+        - gap_lost: {通道: 按片上时间戳缺口推断丢失的包数}
+        - simulated_dropped: 模拟丢包丢弃的 datagram 数
+        gap_lost 中既包含传感器 / 无线链路上丢的包，也包含内核丢弃的包；
+        若 gap_lost 明显多于 kernel_dropped × 每个 datagram 的通道包数，说明丢包发生在本机之前。
+        """
+        return {
+            "datagrams": self._recv_count,
+            "kernel_dropped": self._kernel_dropped if self._kernel_drop_supported else None,
+            "gap_lost": dict(self._gap_lost),
+            "simulated_dropped": self._simulated_dropped,
+        }
+
+    def enable_tap(self, max_packets: int = 1000) -> PacketTap:
+        """启用包旁路，保留最近 max_packets 个已排序的通道包；已启用时直接返回现有的旁路"""
+        tap = self.packet_tap
+        if tap is None:
+            tap = self.packet_tap = PacketTap(max_packets)
+        return tap
+
+    def disable_tap(self):
+        self.packet_tap = None
+
+    # -------- 抓包 --------
+
+    def start_capture(self, path: str) -> CaptureWriter:
+        """开始把收到的原始 datagram 追加到抓包文件（运行中也可随时开始）；已在抓包时先结束旧文件"""
+        self.stop_capture()
+        capture = CaptureWriter(path, wall_time=time.time())
+        self._capture = capture
+        self.logger.info(f"开始抓包: {path}")
+        return capture
+
+    def stop_capture(self) -> Optional[CaptureWriter]:
+        """结束抓包并关闭文件，返回结束的 CaptureWriter（含 datagram 数 / 字节数），没有抓包时返回 None"""
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            capture.close()
+            self.logger.info(f"抓包结束: {capture.path}，{capture.datagrams} 个 datagram，{capture.bytes} 字节")
+        return capture
+
+    # -------- 启动 / 停止 --------
+
+    def start(self):
+        """启动UDP接收器"""
+        if self.running:
+            self.logger.warning("接收器已经在运行中")
+            return
+
+        try:
+            self.running = True
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+            # 尝试增大接收缓冲区
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
+                actual_buffer = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+                self.logger.info(f"Socket接收缓冲区大小: {actual_buffer} 字节")
+            except Exception as e:
+                self.logger.warning(f"设置socket缓冲区失败: {e}")
+
+            # 尝试开启内核丢包计数
+            self._kernel_drop_supported = False
+            if _SO_RXQ_OVFL is not None:
+                try:
+                    self.socket.setsockopt(socket.SOL_SOCKET, _SO_RXQ_OVFL, 1)
+                    self._kernel_drop_supported = True
+                except OSError as e:
+                    self.logger.warning(f"开启内核丢包计数失败: {e}")
+
+            self.socket.bind((self.host, self.port))
+            # 非阻塞 + selector 等待：每次唤醒把内核缓冲区里的 datagram 一次性取完
+            self.socket.setblocking(False)
+
+            self._reset_session()
+
+            self.receiver_thread = threading.Thread(
+                target=self._receive_loop,
+                daemon=True,
+                name="UDP-Receiver-Thread",
+            )
+            self.receiver_thread.start()
+
+            self.logger.info(f"UDP接收器已启动，监听 {self.host}:{self.port}")
+
+        except Exception as e:
+            self.running = False
+            if self.socket is not None:
+                self.socket.close()
+                self.socket = None
+            self.logger.error(f"启动UDP接收器失败: {e}")
+            self.error_occurred.emit(f"启动UDP接收器失败: {e}")
+            raise
+
+    def start_replay(self, path: str, speed: float = 1.0):
+        """
+        从抓包文件回放（不打开 socket）：每个 datagram 以抓包时记录的接收时间送入时间校正，
+        投递节拍也按记录的时间划分，因此输出的批次与倍速无关、可逐位复现。
+        speed > 0 时按 speed 倍速等待，speed <= 0 时全速回放。到达文件末尾后自动投递尾包、
+        发出 replay_finished 并结束运行；中途可用 stop() 停止。
+        """
+        if self.running:
+            self.logger.warning("接收器已经在运行中")
+            return
+
+        read_capture_header(path)  # 文件无效时直接抛给调用方
+        self.running = True
+        self._kernel_drop_supported = False
+        self._reset_session()
+        self.receiver_thread = threading.Thread(
+            target=self._replay_loop,
+            args=(path, float(speed)),
+            daemon=True,
+            name="UDP-Replay-Thread",
+        )
+        self.receiver_thread.start()
+        self.logger.info(f"开始回放抓包文件 {path}（{'全速' if speed <= 0 else f'{speed:g}x'}）")
+
+    def _reset_session(self):
+        """清空统计、时间校正、排序缓冲与待投递批次，并以当前时刻作为会话起点"""
+        self._recv_count = 0
+        self._last_stat_time = time.time()
+        self._last_stat_count = 0
+        self._last_hw_timestamp = None
+        self._last_regulated_ts = None
+
+        self._kernel_dropped = 0
+        self._gap_lost.clear()
+        self._last_emitted_hw_ts.clear()
+        self._nominal_interval.clear()
+        self._simulated_dropped = 0
+
+        # 重置时间纠正器、排序队列与待投递批次
+        self._time_regulators.clear()
+        self._sorted_packets.clear()
+        self._clock_trackers.clear()
+        self._pending_packets = []
+        self._last_delivery = time.monotonic()
+
+        # 会话起点
+        self._start_monotonic = time.monotonic()
+
+    def stop(self):
+        """停止UDP接收器"""
+        if not self.running:
+            return
+
+        self.running = False
+        # 接收线程最多在 selector 超时（100ms）后退出，退出前自己投递重排缓冲中的尾包；
+        # 确认已退出时在本线程按顺序送出发件箱中剩余的批次，保证 stop() 返回前送达 GUI 线程的订阅者
+        self._finish_delivery(self.receiver_thread)
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        self.stop_capture()
+
+        self.logger.info(f"UDP接收器已停止，丢包统计: {self.get_drop_stats()}")
+
+    # -------- 接收循环：selector 唤醒后批量取出所有待处理 datagram --------
+
+    def _receive_loop(self):
+        """接收循环，在单独线程中运行"""
+        selector = selectors.DefaultSelector()
+        selector.register(self.socket, selectors.EVENT_READ)
+        interval = self.delivery_interval_ms / 1000.0
+        try:
+            while self.running:
+                try:
+                    if selector.select(timeout=min(interval, 0.1)):
+                        datagrams = self._drain_socket()
+                        if datagrams:
+                            self._process_datagrams(datagrams)
+                        self._log_stats()
+
+                    now = time.monotonic()
+                    if now - self._last_delivery >= interval:
+                        self._last_delivery = now
+                        self._deliver_pending()
+                except Exception as e:
+                    if self.running:
+                        self.logger.error(f"接收数据时出错: {e}")
+                        self.error_occurred.emit(f"接收数据时出错: {e}")
+        finally:
+            selector.close()
+            # 把重排缓冲中剩余的包按时间顺序发出去，避免停止时丢掉每个通道最后一段数据
+            try:
+                self._flush_reorder_buffers()
+                self._deliver_pending()
+            except Exception as e:
+                self.logger.error(f"投递尾包时出错: {e}")
+
+    def _replay_loop(self, path: str, speed: float):
+        """回放线程：按记录的接收时间喂给 _process_datagrams，投递节拍同样按记录的时间划分"""
+        interval = self.delivery_interval_ms / 1000.0
+        t_rec0: Optional[float] = None
+        t_wall0 = 0.0
+        last_delivery = 0.0
+        stopped = False
+        try:
+            for recv_elapsed, data in iter_capture(path):
+                if not self.running:
+                    stopped = True
+                    break
+                if t_rec0 is None:
+                    t_rec0 = last_delivery = recv_elapsed
+                    t_wall0 = time.monotonic()
+                elif speed > 0:
+                    delay = t_wall0 + (recv_elapsed - t_rec0) / speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                # 相当于实时接收时 selector 超时先触发投递，再处理这个 datagram
+                if recv_elapsed - last_delivery >= interval:
+                    last_delivery = recv_elapsed
+                    self._deliver_pending()
+
+                self._recv_count += 1
+                self._process_datagrams([(data, recv_elapsed)])
+
+            # 到达文件末尾或被 stop() 打断，尾包都在回放线程中投递
+            self._flush_reorder_buffers()
+            self._deliver_pending()
+        except Exception as e:
+            self.logger.error(f"回放抓包文件出错: {e}")
+            self.error_occurred.emit(f"回放抓包文件出错: {e}")
+            return
+        finally:
+            if self.running:
+                self.running = False
+                self.logger.info(f"回放结束，共 {self._recv_count} 个 datagram，丢包统计: {self.get_drop_stats()}")
+        if not stopped:
+            self.replay_finished.emit()
+
+    def _drain_socket(self) -> List[Tuple[bytes, float]]:
+        """
+        非阻塞地取出内核缓冲区中所有待处理的 datagram（最多 MAX_DATAGRAMS_PER_BATCH 个），
+        返回 [(datagram, 会话起点以来的接收时间秒), ...]。
+        """
+        datagrams: List[Tuple[bytes, float]] = []
+        sock = self.socket
+        use_recvmsg = self._kernel_drop_supported
+        start = self._start_monotonic if self._start_monotonic is not None else time.monotonic()
+        capture = self._capture
+
+        while len(datagrams) < self.MAX_DATAGRAMS_PER_BATCH:
+            try:
+                if use_recvmsg:
+                    data, ancdata, _, _ = sock.recvmsg(self.buffer_size, socket.CMSG_SPACE(4))
+                    for level, ctype, cdata in ancdata:
+                        if level == socket.SOL_SOCKET and ctype == _SO_RXQ_OVFL and len(cdata) >= 4:
+                            # 内核给的是累计值
+                            self._kernel_dropped = struct.unpack("=I", cdata[:4])[0]
+                else:
+                    data = sock.recv(self.buffer_size)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            recv_elapsed = time.monotonic() - start
+            self._recv_count += 1
+            if capture is not None:
+                capture.write(recv_elapsed, data)
+
+            # ---- (可选) 模拟网络抖动：随机延迟一小段时间 ----
+            if self.enable_jitter_simulation and self.jitter_max_delay > 0:
+                time.sleep(random.uniform(0, self.jitter_max_delay))
+
+            # ---- (可选) 模拟 UDP 丢包：随机丢弃整个 datagram ----
+            if self.enable_loss_simulation and random.random() < self.loss_rate:
+                self._simulated_dropped += 1
+                continue
+
+            datagrams.append((data, recv_elapsed))
+
+        return datagrams
+
+    def _log_stats(self):
+        """按时间间隔输出接收速率和丢包统计（仅日志用）"""
+        now = time.time()
+        elapsed = now - self._last_stat_time
+        if elapsed < self.STAT_INTERVAL_SEC:
+            return
+        rate = (self._recv_count - self._last_stat_count) / elapsed
+        stats = self.get_drop_stats()
+        self.logger.info(
+            f"UDP接收速率: {rate:.1f} packet/s (已接收{self._recv_count}个)，"
+            f"内核丢弃: {stats['kernel_dropped']}，时间戳缺口: {sum(stats['gap_lost'].values())}"
+        )
+        self._last_stat_time = now
+        self._last_stat_count = self._recv_count
+
+    # -------- 解析 + 时间校正 + 排序 --------
+
+    def _process_datagrams(self, datagrams: List[Tuple[bytes, float]]):
+        """逐个解析一批 datagram，并按通道做时间校正和排序缓冲"""
+        for data, recv_elapsed in datagrams:
+            # 解析一个 datagram 中可能包含的多个包
+            packets = self._parse_eeg_packet(data)
+
+            # 如果解析不到合法数据，直接跳过
+            if not packets:
+                continue
+
+            # 使用与 C# 类似的逻辑：按通道使用 ActualTimeRegulator + 排序缓冲
+            for packet in packets:
+                ch = packet.channel
+
+                # 维护“最大片上时间”，用于上层查询
+                if self._last_hw_timestamp is None or packet.hardware_timestamp > self._last_hw_timestamp:
+                    self._last_hw_timestamp = packet.hardware_timestamp
+
+                # 获取 / 创建通道对应的时间调节器
+                regulator = self._time_regulators.get(ch)
+                if regulator is None:
+                    # 校正在重排之前进行，重排缓冲深度以内的乱序都是正常到达顺序，不能当作片上时间倒退
+                    regulator = ActualTimeRegulator(
+                        rollback_tolerance_sec=max(0.01, self.reorder_depth_ms / 1000.0)
+                    )
+                    self._time_regulators[ch] = regulator
+
+                # 获取 / 创建通道对应的重排缓冲区
+                channel_buf = self._sorted_packets.get(ch)
+                if channel_buf is None:
+                    channel_buf = JitterBuffer(self.reorder_depth_ms / 1000.0)
+                    self._sorted_packets[ch] = channel_buf
+
+                # 对应 C# regulator.GetTime(packNumber, session.Stopwatch.Elapsed.TotalSeconds)
+                reg_result = regulator.get_time(
+                    pack_time=packet.hardware_timestamp,  # 秒
+                    received_at=recv_elapsed,             # 秒
+                )
+
+                if reg_result.pack_skipped:
+                    # 如果出现“片上时间倒退”，C# 会 Reset，并跳过该包
+                    self.logger.warning(
+                        f"通道 {ch} 监测到片上时间倒退超过阈值，本包被跳过并重置时间调节器"
+                    )
+                    channel_buf.clear()
+                    self._last_emitted_hw_ts.pop(ch, None)
+                    self._clock_trackers.pop(ch, None)
+                    continue
+
+                if not reg_result.valid:
+                    # 第一包仅建立基准，不输出
+                    continue
+
+                # 写入“校正后的电脑时间”
+                packet.system_timestamp = reg_result.regulated_time
+
+                tracker = self._clock_trackers.get(ch)
+                if tracker is None:
+                    tracker = ClockOffsetTracker()
+                    self._clock_trackers[ch] = tracker
+                tracker.update(recv_elapsed, reg_result.regulated_time)
+
+                # 按片上时间入堆，输出已超过缓冲深度的包
+                channel_buf.push(packet.hardware_timestamp, packet)
+                for out_packet in channel_buf.pop_ready():
+                    self._emit_packet(out_packet)
+
+    def _flush_reorder_buffers(self):
+        for ch in sorted(self._sorted_packets):
+            for packet in self._sorted_packets[ch].flush():
+                self._emit_packet(packet)
+
+    def _update_gap_stats(self, packet: EegDataPacket):
+        """
+        在排序之后按片上时间检测缺口：
+        以该通道观测到的最小正包间隔作为标称间隔，间隔超过 1.5 倍即认为中间丢了包。
+        """
+        ch = packet.channel
+        hw_ts = packet.hardware_timestamp
+        prev = self._last_emitted_hw_ts.get(ch)
+        self._last_emitted_hw_ts[ch] = hw_ts
+        if prev is None:
+            return
+
+        delta = hw_ts - prev
+        if delta <= 0:
+            return
+
+        nominal = self._nominal_interval.get(ch)
+        if nominal is None or delta < nominal:
+            self._nominal_interval[ch] = delta
+            return
+
+        if delta > 1.5 * nominal:
+            lost = int(round(delta / nominal)) - 1
+            if lost > 0:
+                self._gap_lost[ch] = self._gap_lost.get(ch, 0) + lost
+
+    def _emit_packet(self, packet: EegDataPacket):
+        """排序好的包进入待投递批次，由 _deliver_pending 按节拍统一发出"""
+        self.packet_count += 1
+        self.active_channels.add(packet.channel)
+        self._update_gap_stats(packet)
+
+        # 记录最近一个“校正后的电脑时间”
+        if packet.system_timestamp > 0:
+            self._last_regulated_ts = packet.system_timestamp
+
+        tap = self.packet_tap
+        if tap is not None:
+            tap.append(packet)
+
+        self._pending_packets.append(packet)
+
+    def _deliver_pending(self):
+        """把本节拍攒下的包拼成一个 EegBatch，分发给订阅者并通过信号发给 Qt 页面"""
+        if not self._pending_packets:
+            return
+        packets, self._pending_packets = self._pending_packets, []
+        self._publish(EegBatch.from_packets(packets))
+
+    # -------- C# 风格 UDP 解包 --------
+
+    def _parse_eeg_packet(self, data: bytes) -> List[EegDataPacket]:
+        """
+        解包逻辑改成 C# V2BufferParser 的形式：
+        - 包格式：
+            SensorType,
+            SensorType,
+            Serial(3B),
+            Channel,
+            DataLen(2B),
+            Data(DataLenB),
+            Timestamp(8B, big-endian, µs),
+            CRC(1B)
+        - 总长度 = DataLen + PACK_INFO_LENGTH (17)
+        - 假设一个 UDP datagram 内不会截断单个包（UDP 不会拆包），但可能包含多个包
+        先逐帧扫描帧头（通道号 / 序列号 / 时间戳），再由 decode_int24_frames 一次解码整个 datagram 的全部数据区，
+        各通道的 data 是解码结果上的切片。
+        """
+        buf = data
+        n = len(buf)
+        i = 0
+        offsets: List[int] = []
+        counts: List[int] = []
+        headers: List[Tuple[float, int, int]] = []
+
+        while i + self.PACK_INFO_LENGTH <= n:
+            sensor_type = buf[i]
+            sensor_type_dup = buf[i + 1]
+
+            # 对应 C# MatchPackInfo：两个字节相同
+            if sensor_type != sensor_type_dup:
+                i += 1
+                continue
+
+            # DataLength（大端）
+            data_len = (buf[i + 6] << 8) | buf[i + 7]
+            if data_len <= 0:
+                i += 1
+                continue
+
+            total_len = data_len + self.PACK_INFO_LENGTH
+            pack_end = i + total_len - 1
+            if pack_end >= n:
+                # 剩余数据不足一个完整包
+                break
+
+            # CRC 校验暂不实现；meta 信息（Channel == 0xFF）与不足一个采样点的帧忽略
+            channel = buf[i + 5]
+            if channel != 0xFF and data_len >= 3:
+                # 时间戳：8 + DataLen 开始的 8 字节，big-endian 微秒
+                hardware_ts = struct.unpack_from(">Q", buf, i + 8 + data_len)[0] / 1_000_000.0
+                serial = (buf[i + 2] << 16) | (buf[i + 3] << 8) | buf[i + 4]
+                offsets.append(i + 8)
+                counts.append(data_len // 3)
+                headers.append((hardware_ts, channel, serial))
+
+            i = pack_end + 1  # 跳到下一个候选包起点
+
+        if not offsets:
+            return []
+
+        try:
+            samples, bounds = decode_int24_frames(buf, offsets, counts)
+        except Exception as e:
+            self.logger.error(f"解析数据帧失败: {e}")
+            return []
+
+        return [
+            EegDataPacket(
+                hardware_timestamp=hardware_ts,
+                system_timestamp=0.0,  # 占位，后续由 ActualTimeRegulator 覆盖
+                data=samples[bounds[k]: bounds[k + 1]],
+                channel=channel,
+                serial=serial,
+            )
+            for k, (hardware_ts, channel, serial) in enumerate(headers)
+        ]
+
+
+# ====================== 按端口共享的接收器 ======================
+
+_receivers: Dict[int, UdpEegReceiver] = {}
+_receiver_refs: Dict[int, int] = {}
+_receivers_lock = threading.Lock()
+
+
+def acquire_receiver(
+    host: str = "0.0.0.0", port: int = 30300, buffer_size: int = 8192,
+    reorder_depth_ms: float = 100.0, delivery_interval_ms: float = 20.0,
+) -> UdpEegReceiver:
+    """
+    获取（必要时创建并启动）监听 port 的共享接收器，引用计数 +1。
+    同一端口只绑定一个 socket、只起一个接收线程；启动失败时抛出异常且不登记。
+    """
+    with _receivers_lock:
+        receiver = _receivers.get(port)
+        if receiver is None:
+            receiver = UdpEegReceiver(
+                host=host, port=port, buffer_size=buffer_size,
+                reorder_depth_ms=reorder_depth_ms, delivery_interval_ms=delivery_interval_ms,
+            )
+            try:
+                receiver.start()
+            except Exception:
+                receiver.deleteLater()
+                raise
+            _receivers[port] = receiver
+            _receiver_refs[port] = 0
+        elif receiver.host != host:
+            receiver.logger.warning(
+                f"端口 {port} 已由 {receiver.host} 上的接收器监听，忽略新的监听IP {host}"
+            )
+        _receiver_refs[port] += 1
+        return receiver
+
+
+def release_receiver(receiver: UdpEegReceiver):
+    """释放一次共享接收器的引用；最后一个使用者释放时停止接收线程并关闭 socket。"""
+    with _receivers_lock:
+        port = receiver.port
+        if _receivers.get(port) is not receiver:
+            return
+        _receiver_refs[port] -= 1
+        if _receiver_refs[port] > 0:
+            return
+        del _receivers[port]
+        del _receiver_refs[port]
+
+    receiver.stop()
+    receiver.deleteLater()
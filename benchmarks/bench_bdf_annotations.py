@@ -0,0 +1,115 @@
+"""
+evt.bdf 注释通道解析基准：旧 read_annotations_bdf（逐个采样 tals.extend 还原字节流、每次调用现编译正则）
+vs NumPy 视图整块还原（int32 取低 3 字节 / 16 位按低字节在前）+ 模块级预编译正则一次扫描整个缓冲。
+
+合成一段 --hours 小时的注释通道：每 1 s 一个数据记录，记录开头是计时 TAL（+t\\x14\\x14\\x00），
+按 --event-rate 每秒若干个事件 TAL（+onset\\x15duration\\x14code\\x14\\x00），其余补 0，
+分别按 BDF（int32，每采样 3 字节）和 EDF（float，每采样 2 字节）编码，比对两种实现的耗时与解析结果。
+
+用法（在项目根目录下，需要 mne，与 neuracle_lib.readbdfdata 相同）：
+    python benchmarks/bench_bdf_annotations.py --hours 1 --record-samples 256 --event-rate 2
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neuracle_lib.readbdfdata import read_annotations_bdf  # noqa: E402
+
+
+def legacy_read_annotations_bdf(annotations):
+    """原 read_annotations_bdf（不含读文件分支）"""
+    pat = '([+-]\\d+\\.?\\d*)(\x15(\\d+\\.?\\d*))?(\x14.*?)\x14\x00'
+    tals = bytearray()
+    for chan in annotations:
+        this_chan = chan.ravel()
+        if this_chan.dtype == np.int32:  # BDF
+            this_chan = this_chan.view(np.uint8)  # 原为 this_chan.dtype = np.uint8（NumPy 2.5 起弃用），效果相同
+            this_chan = this_chan.reshape(-1, 4)
+            this_chan = this_chan[:, :3].ravel()
+            for s in this_chan:
+                tals.extend(s)
+        else:
+            for s in this_chan:
+                i = int(s)
+                tals.extend(np.uint8([i % 256, i // 256]))
+    triggers = re.findall(pat, tals.decode('latin-1'))
+
+    events = []
+    for ev in triggers:
+        onset = float(ev[0])
+        duration = float(ev[2]) if ev[2] else 0
+        for description in ev[3].split('\x14')[1:]:
+            if description:
+                events.append([onset, duration, description])
+    return zip(*events) if events else (list(), list(), list())
+
+
+def make_tal_stream(seconds: int, record_bytes: int, event_rate: int, seed: int = 0) -> bytes:
+    """每秒一个定长数据记录：计时 TAL + event_rate 个事件 TAL，不足部分补 0"""
+    rng = np.random.default_rng(seed)
+    records = []
+    for t in range(seconds):
+        record = b'+%d\x14\x14\x00' % t
+        for k in range(event_rate):
+            onset = t + (k + rng.random()) / event_rate
+            record += b'+%.4f\x150\x14%d\x14\x00' % (onset, rng.integers(1, 256))
+        if len(record) > record_bytes:
+            raise ValueError(f"记录长度 {record_bytes} 字节放不下 {len(record)} 字节的 TAL，请增大 --record-samples")
+        records.append(record.ljust(record_bytes, b'\x00'))
+    return b''.join(records)
+
+
+def encode_bdf(stream: bytes) -> np.ndarray:
+    """每 3 字节一个 24 位采样，存成 int32（与 mne 读取 BDF 注释通道得到的 dtype 相同）"""
+    b = np.frombuffer(stream, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+    return b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+
+
+def encode_edf(stream: bytes) -> np.ndarray:
+    """每 2 字节一个 16 位采样，存成 float64"""
+    return np.frombuffer(stream, dtype='<u2').astype(np.float64)
+
+
+def timed(func, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=1.0, help="注释通道时长（小时），每秒一个数据记录")
+    parser.add_argument("--record-samples", type=int, default=256, help="每个数据记录的注释通道采样数")
+    parser.add_argument("--event-rate", type=int, default=2, help="每秒事件数")
+    parser.add_argument("--repeat", type=int, default=3, help="取最短耗时的重复次数（旧实现只跑一次）")
+    args = parser.parse_args()
+
+    seconds = int(args.hours * 3600)
+    print(f"{args.hours:g} h 注释通道，每记录 {args.record_samples} 个采样，每秒 {args.event_rate} 个事件")
+    print(f"{'格式':>6} {'采样数':>10} {'字节数':>10} {'事件数':>8} {'旧实现(s)':>10} {'新实现(ms)':>11} {'加速比':>8} {'结果一致':>8}")
+    for name, bytes_per_sample, encode in (("BDF", 3, encode_bdf), ("EDF", 2, encode_edf)):
+        stream = make_tal_stream(seconds, args.record_samples * bytes_per_sample, args.event_rate)
+        chan = encode(stream)
+        annotations = [chan]
+
+        t_legacy, ref = timed(lambda: [list(v) for v in legacy_read_annotations_bdf(annotations)], 1)
+        t_new, new = timed(lambda: [list(v) for v in read_annotations_bdf(annotations)], args.repeat)
+        # readbdfdata() 传入的是单个通道的 1 维数组，结果应与按通道列表传入相同
+        _, new_1d = timed(lambda: [list(v) for v in read_annotations_bdf(chan)], 1)
+        same = ref == new == new_1d
+        print(f"{name:>6} {chan.size:>10d} {len(stream):>10d} {len(ref[0]) if ref else 0:>8d} {t_legacy:>10.2f} "
+              f"{t_new * 1e3:>11.1f} {t_legacy / t_new:>7.0f}x {'是' if same else '否':>8}")
+
+
+if __name__ == "__main__":
+    main()
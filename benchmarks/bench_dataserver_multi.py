@@ -0,0 +1,145 @@
+"""
+多设备接收对比：N 个 DataServerThread（每台设备一个阻塞线程） vs 一个 DataServerClient（单线程 asyncio 事件循环）。
+每台设备的数据服务器替身各在一个子进程中运行；本进程主线程模拟 GUI 线程，每 1 ms 醒来一次并记录实际唤醒延迟，
+用唤醒延迟的 p99 / 最大值衡量接收线程对 GIL 的争用，同时统计接收进程 CPU 占用与各设备的收到比例。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_dataserver_multi.py --devices 1 4 8 --channels 65 --srate 1000
+    python benchmarks/bench_dataserver_multi.py --device HEEG --devices 8 16 --channels 33 --srate 2000 --seconds 10
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import subprocess
+
+import numpy as np
+from PyQt6.QtCore import QCoreApplication
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from acquisition import DeviceConfig, DataServerClient  # noqa: E402
+from neuracle_lib.dataServer import DataServerThread  # noqa: E402
+
+
+def start_servers(args, n_devices: int, base_port: int) -> list:
+    servers = []
+    for k in range(n_devices):
+        cmd = [
+            sys.executable, "-m", "neuracle_lib.dataServerSimulator",
+            "--device", args.device, "--channels", str(args.channels), "--srate", str(args.srate),
+            "--port", str(base_port + k), "--seconds", str(args.seconds), "--seed", str(k), "--json",
+        ]
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if proc.stdout.readline().strip() != "ready":
+            raise RuntimeError(f"服务器启动失败: {proc.stderr.read().strip()}")
+        servers.append(proc)
+    return servers
+
+
+def wait_servers(servers: list) -> list:
+    sent = []
+    for proc in servers:
+        out, err = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"服务器异常退出: {err.strip()}")
+        sent.append(int(json.loads(out.strip().splitlines()[-1])["samples_sent"]))
+    return sent
+
+
+def measure_main_thread(servers: list) -> np.ndarray:
+    """
+    所有服务器都在推送期间主线程每 1 ms 睡一次，返回每次的多睡时间（ms）。
+    第一个服务器结束即停止测量：之后各连接陆续关闭（DataServerThread 退出、DataServerClient 开始重连），负载不再可比。
+    """
+    lateness = []
+    while all(proc.poll() is None for proc in servers):
+        t0 = time.perf_counter()
+        time.sleep(0.001)
+        lateness.append((time.perf_counter() - t0) * 1000.0 - 1.0)
+    return np.asarray(lateness)
+
+
+def run_threads(args, n_devices: int, base_port: int) -> dict:
+    servers = start_servers(args, n_devices, base_port)
+    clients = []
+    for k in range(n_devices):
+        client = DataServerThread(args.device, args.channels, srate=args.srate)
+        client.connect(hostname="127.0.0.1", port=base_port + k)
+        client.daemon = True
+        clients.append(client)
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    for client in clients:
+        client.start()
+    lateness = measure_main_thread(servers)
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    sent = wait_servers(servers)
+    time.sleep(0.5)
+    received = [client.GetDataLenCount() for client in clients]
+    for client in clients:
+        client.stop()
+        client.join(timeout=10.0)
+        client.sock.close()
+    return summarize(sent, received, lateness, cpu, wall)
+
+
+def run_asyncio(args, n_devices: int, base_port: int) -> dict:
+    servers = start_servers(args, n_devices, base_port)
+    client = DataServerClient(
+        [DeviceConfig(f"dev{k}", args.device, port=base_port + k, n_chan=args.channels, srate=args.srate)
+         for k in range(n_devices)],
+        idle_timeout=0,
+    )
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    client.start()
+    lateness = measure_main_thread(servers)
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    sent = wait_servers(servers)
+    time.sleep(0.5)
+    client.stop()
+    stats = client.get_stats()
+    received = [stats[f"dev{k}"]["samples"] for k in range(n_devices)]
+    return summarize(sent, received, lateness, cpu, wall)
+
+
+def summarize(sent: list, received: list, lateness: np.ndarray, cpu: float, wall: float) -> dict:
+    ratios = [r / s * 100.0 if s else 0.0 for r, s in zip(received, sent)]
+    return {
+        "min_ratio": min(ratios),
+        "cpu_pct": cpu / wall * 100.0 if wall > 0 else 0.0,
+        "late_p99": float(np.percentile(lateness, 99)) if lateness.size else 0.0,
+        "late_max": float(lateness.max()) if lateness.size else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--device", choices=("Neuracle", "HEEG", "DSI"), default="Neuracle")
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 4, 8], help="设备数量，可给多个")
+    parser.add_argument("--channels", type=int, default=65, help="每台设备的 n_chan（Neuracle / HEEG 含 trigger 通道）")
+    parser.add_argument("--srate", type=float, default=1000.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8820)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)  # noqa: F841  DataServerClient 是 QObject
+    # 服务器结束后客户端会不断重连，压测时不打印这些告警
+    logging.getLogger("DataServerClient").setLevel(logging.ERROR)
+
+    print(f"{args.device}，每台 {args.channels} 通道 × {args.srate:g} Hz，每组 {args.seconds:g} s")
+    print(f"{'设备数':>6} {'方式':>8} {'最低收到比例':>12} {'接收CPU':>8} {'主线程延迟p99(ms)':>18} {'主线程延迟max(ms)':>18}")
+    port = args.port
+    for n_devices in args.devices:
+        for name, run in (("线程", run_threads), ("asyncio", run_asyncio)):
+            r = run(args, n_devices, port)
+            port += n_devices
+            print(f"{n_devices:>6d} {name:>8} {r['min_ratio']:>11.1f}% {r['cpu_pct']:>7.1f}% "
+                  f"{r['late_p99']:>18.2f} {r['late_max']:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+HEEG / DSI 帧解析基准：旧 parseData（逐字节 unpack / decode 找包头、bytes 拼接、Python 列表）
+vs bytearray 累加器 + find() 找同步字 + NumPy 解码（FrameParser.scanFrames）。
+
+用数据服务器替身的编码函数生成一段数据流（含事件），按以下几种 recv 切分“回放”给两个解析器，统计每秒数据的解析耗时并逐位比对输出：
+- 对齐：每次 recv 恰好是一次 40 ms 推送；
+- 垃圾前缀：每次 recv 前插入 --junk 字节不含同步字的 ASCII 垃圾，模拟重新同步；
+- 小块：每个推送按 --recv-size 字节切成多次 recv（包头总在块首，旧解析器也能处理），大包时旧实现反复拼接并重扫，代价随包长平方增长；
+- 任意切分（仅新实现）：按随机长度切分，旧实现遇到被截断的包头会抛异常，故只与对齐结果比对。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_heeg_dsi_parse.py --device HEEG --configs 33x1000 65x4000 257x16000
+    python benchmarks/bench_heeg_dsi_parse.py --device DSI --configs 24x300 64x1000 --junk 4096
+"""
+
+import os
+import sys
+import time
+import argparse
+from struct import unpack
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neuracle_lib.dataServer import FrameParser  # noqa: E402
+from neuracle_lib.dataServerSimulator import encode_heeg, encode_dsi_eeg, encode_dsi_event  # noqa: E402
+
+UPDATE_INTERVAL = 0.04
+
+
+def legacy_heeg(raw):
+    """原 parseData 的 HEEG 分支，返回 (按行展平的数据, 剩余字节)"""
+    pkglen = len(raw)
+    parse_data = []
+    i = 0
+    while i < pkglen:
+        HeadToken = unpack('2B', raw[i:i + 2])
+        if HeadToken[0] == 90 and HeadToken[1] == 165:
+            HeaderLen = unpack('I', raw[i + 2:i + 6])
+            Headerbytelen = int((HeaderLen[0] - 6) / 4)
+            Headercontent = unpack(str(Headerbytelen) + 'I', raw[i + 6:i + HeaderLen[0]])
+            ChannelCount = Headercontent[2]
+            DataCountPerChannel = Headercontent[4]
+            bodylen = int(DataCountPerChannel * ChannelCount)
+            try:
+                body = unpack(str(bodylen) + 'f', raw[i + HeaderLen[0]:i + HeaderLen[0] + bodylen * 4])
+                body = np.array(body).reshape(ChannelCount, DataCountPerChannel)
+                tmp = unpack('30c', raw[i + HeaderLen[0] + bodylen * 4: i + HeaderLen[0] + bodylen * 4 + 30])
+                trigger = ''.join([x.decode('utf8') for x in tmp])
+                rebuildBody = np.vstack((body, np.zeros((1, DataCountPerChannel))))
+                if ord(trigger[0]) != 0:
+                    str_trigger = ''.join([c for c in trigger if '\x00' not in c])
+                    rebuildBody[-1, 0] = int(str_trigger)
+                parse_data.extend(rebuildBody.T.flatten())
+                unpack('2B', raw[i + HeaderLen[0] + bodylen * 4 + 30: i + HeaderLen[0] + bodylen * 4 + 32])
+                i = i + HeaderLen[0] + bodylen * 4 + 32
+            except Exception:
+                break
+        else:
+            i = i + 1
+    return np.asarray(parse_data), raw[i:]
+
+
+def legacy_dsi(raw):
+    """原 parseData 的 DSI 分支，返回 (按行展平的数据, 剩余字节)"""
+    token = '@ABCD'
+    n = len(raw)
+    i = 0
+    parse_data = []
+    while i + 12 < n:
+        if token == raw[i:i + 5].decode('ascii'):
+            packetType = raw[i + 5]
+            bytenum = raw[i + 6:i + 8]
+            packetLength = 256 * bytenum[0] + bytenum[1]
+            if i + 12 + packetLength > n:
+                break
+            if packetType == 1:
+                data_num = int((packetLength - 11) / 4)
+                parse_data.extend(unpack('>' + str(data_num) + 'f', raw[i + 23:i + 12 + packetLength]))
+            i = i + 12 + packetLength
+        else:
+            i += 1
+    return np.asarray(parse_data), raw[i:]
+
+
+def make_pushes(device: str, n_chan: int, srate: int, seconds: float, seed: int = 0) -> list:
+    """按 40 ms 推送生成字节块，每秒打一个事件"""
+    rng = np.random.default_rng(seed)
+    per_push = int(UPDATE_INTERVAL * srate)
+    n_eeg = n_chan - 1 if device == "HEEG" else n_chan
+    pushes = []
+    for k in range(int(seconds / UPDATE_INTERVAL)):
+        eeg = rng.normal(0.0, 50.0, size=(n_eeg, per_push)).astype(np.float32)
+        has_event = k % int(1 / UPDATE_INTERVAL) == 0
+        if device == "HEEG":
+            pushes.append(encode_heeg(eeg, k, srate, trigger=(k % 255) + 1 if has_event else 0))
+        else:
+            data = encode_dsi_eeg(eeg, k * per_push, k * UPDATE_INTERVAL, srate)
+            if has_event:
+                data += encode_dsi_event(k, (k % 255) + 1)
+            pushes.append(data)
+    return pushes
+
+
+def run_legacy(device: str, n_chan: int, chunks: list) -> np.ndarray:
+    parse = legacy_heeg if device == "HEEG" else legacy_dsi
+    out, buffer = [], b''
+    for raw in chunks:
+        raw = buffer + raw
+        data, buffer = parse(raw)
+        out.append(data.reshape(len(data) // n_chan, n_chan).T)
+    return np.hstack(out)
+
+
+def run_new(frame_parser: FrameParser, chunks: list) -> np.ndarray:
+    out = []
+    acc = bytearray()
+    for raw in chunks:
+        acc += raw
+        data, _, used = frame_parser.scanFrames(acc)
+        del acc[:used]
+        out.append(data)
+    return np.hstack(out)
+
+
+def split_small(pushes: list, size: int) -> list:
+    return [p[k:k + size] for p in pushes for k in range(0, len(p), size)]
+
+
+def split_random(pushes: list, seed: int = 1) -> list:
+    rng = np.random.default_rng(seed)
+    stream = b''.join(pushes)
+    mean = max(len(stream) // len(pushes), 2)
+    chunks, pos = [], 0
+    while pos < len(stream):
+        size = int(rng.integers(1, 2 * mean))
+        chunks.append(stream[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def timed(func, repeat: int):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--device", choices=("HEEG", "DSI"), default="HEEG")
+    parser.add_argument("--configs", nargs="+", default=None,
+                        help="通道数x采样率（与 DataServerThread 的 n_chan 相同，HEEG 含 trigger 通道）")
+    parser.add_argument("--seconds", type=float, default=2.0, help="回放数据时长")
+    parser.add_argument("--junk", type=int, default=1024, help="垃圾前缀场景中每次 recv 前插入的字节数")
+    parser.add_argument("--recv-size", type=int, default=16384, help="小块场景中每次 recv 的字节数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    configs = args.configs or (["33x1000", "65x4000", "257x16000"] if args.device == "HEEG"
+                               else ["24x300", "64x1000", "64x4000"])
+    junk = bytes(np.random.default_rng(2).integers(ord('a'), ord('y') + 1, size=args.junk, dtype=np.uint8))
+
+    print(f"设备: {args.device}，每组回放 {args.seconds:g} s 数据，耗时为每秒数据的解析时间")
+    print(f"{'配置':>10} {'场景':>8} {'recv次数':>8} {'旧实现(ms)':>11} {'新实现(ms)':>11} {'加速比':>8} {'逐位一致':>8}")
+    for spec in configs:
+        n_chan, srate = (int(v) for v in spec.lower().split("x"))
+        frame_parser = FrameParser(args.device, n_chan)
+        pushes = make_pushes(args.device, n_chan, srate, args.seconds)
+        reference = None
+        scenarios = [
+            ("对齐", pushes),
+            ("垃圾前缀", [junk + p for p in pushes]),
+            ("小块", split_small(pushes, args.recv_size)),
+        ]
+        for name, chunks in scenarios:
+            t_legacy, ref = timed(lambda: run_legacy(args.device, n_chan, chunks), args.repeat)
+            t_new, new = timed(lambda: run_new(frame_parser, chunks), args.repeat)
+            if reference is None:
+                reference = ref
+            same = ref.shape == new.shape and np.array_equal(ref, new.astype(np.float64)) \
+                and np.array_equal(reference, ref)
+            print(f"{spec:>10} {name:>8} {len(chunks):>8d} {t_legacy / args.seconds * 1e3:>11.2f} "
+                  f"{t_new / args.seconds * 1e3:>11.2f} {t_legacy / t_new:>7.1f}x {'是' if same else '否':>8}")
+
+        chunks = split_random(pushes)
+        t_new, new = timed(lambda: run_new(frame_parser, chunks), args.repeat)
+        same = np.array_equal(reference, new.astype(np.float64))
+        print(f"{spec:>10} {'任意切分':>8} {len(chunks):>8d} {'-':>11} {t_new / args.seconds * 1e3:>11.2f} "
+              f"{'-':>8} {'是' if same else '否':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+DataServerThread 吞吐上限压测：对每组“设备 × 通道数 × 采样率”在子进程中运行数据服务器替身
+（neuracle_lib.dataServerSimulator，避免与接收端争 GIL），本进程内运行 DataServerThread.read_thread，
+统计服务器结束时已解析的采样点、最终收到的采样点、接收进程 CPU 占用以及服务器被 TCP 背压拖慢的最大滞后。
+
+read_thread 跟不上时内核发送缓冲会被写满，服务器 sendall 阻塞，表现为“服务器滞后”持续增大、
+结束时刻的积压（已发送但尚未解析的数据）超过一个推送间隔；解析线程在服务器关闭连接之前异常退出也记为跟不上。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_neuracle_dataserver.py --device Neuracle --configs 9x1000 33x1000 65x1000 65x4000
+    python benchmarks/bench_neuracle_dataserver.py --device HEEG --configs 33x1000 65x2000 --seconds 10
+    python benchmarks/bench_neuracle_dataserver.py --device DSI --configs 24x300 24x1000 64x1000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from threading import Event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from neuracle_lib.dataServer import DataServerThread  # noqa: E402
+
+UPDATE_INTERVAL = 0.04
+
+
+def run_config(device: str, channels: int, srate: float, args, port: int) -> dict:
+    cmd = [
+        sys.executable, "-m", "neuracle_lib.dataServerSimulator",
+        "--device", device, "--channels", str(channels), "--srate", str(srate),
+        "--port", str(port), "--seconds", str(args.seconds),
+        "--update-interval", str(UPDATE_INTERVAL), "--trigger-interval", str(args.trigger_interval),
+        "--seed", "0", "--json",
+    ]
+    sim = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if sim.stdout.readline().strip() != "ready":
+        sim.wait()
+        raise RuntimeError(f"服务器启动失败: {sim.stderr.read().strip()}")
+
+    client = DataServerThread(device, channels, srate=srate, t_buffer=args.t_buffer)
+    if client.connect(hostname="127.0.0.1", port=port):
+        sim.kill()
+        raise RuntimeError("无法连接服务器")
+    client.daemon = True
+    # 服务器关闭连接后解析线程读完剩余数据即正常退出
+    closed = Event()
+    client.SetClosedCallback(closed.set)
+
+    cpu0 = time.process_time()
+    wall0 = time.monotonic()
+    client.start()
+    out, err = sim.communicate()
+    wall = time.monotonic() - wall0
+    cpu = time.process_time() - cpu0
+    at_exit = client.GetDataLenCount()
+
+    if sim.returncode != 0:
+        raise RuntimeError(f"服务器异常退出: {err.strip()}")
+    sim_stats = json.loads(out.strip().splitlines()[-1])
+    sent = int(sim_stats["samples_sent"])
+
+    # 服务器已关闭连接，再给解析线程一点时间把内核缓冲里剩下的数据读完
+    deadline = time.monotonic() + args.drain
+    while client.is_alive() and client.GetDataLenCount() < sent and time.monotonic() < deadline:
+        time.sleep(0.05)
+    received = client.GetDataLenCount()
+    parser_ok = client.is_alive() or closed.is_set()
+    client.stop()
+    client.join(timeout=10.0)
+    client.sock.close()
+
+    backlog_ms = max(sent - at_exit, 0) / srate * 1000.0
+    return {
+        "sent": sent,
+        "at_exit": at_exit,
+        "received": received,
+        "backlog_ms": backlog_ms,
+        "cpu_pct": cpu / wall * 100.0 if wall > 0 else 0.0,
+        "sim_lag_ms": sim_stats.get("max_lag_ms", 0.0),
+        "mbit": sim_stats.get("mbit_per_s", 0.0),
+        "parser_ok": parser_ok,
+        "sustained": parser_ok and received >= sent and backlog_ms <= 2 * UPDATE_INTERVAL * 1000.0
+                     and sim_stats.get("max_lag_ms", 0.0) <= 2 * UPDATE_INTERVAL * 1000.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--device", choices=("Neuracle", "HEEG", "DSI"), default="Neuracle")
+    parser.add_argument("--configs", nargs="+", default=["9x1000", "33x1000", "65x1000", "65x4000"],
+                        help="通道数x采样率，通道数与 DataServerThread 的 n_chan 相同（Neuracle / HEEG 含 trigger 通道）")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--trigger-interval", type=float, default=1.0, help="事件间隔（秒），0 为不打事件")
+    parser.add_argument("--t-buffer", type=float, default=3.0, help="DataServerThread 环形缓冲长度（秒）")
+    parser.add_argument("--drain", type=float, default=5.0, help="服务器结束后等待解析线程读完剩余数据的最长时间（秒）")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+
+    print(f"设备: {args.device}，每组 {args.seconds:g} s，推送间隔 {UPDATE_INTERVAL * 1000:.0f} ms")
+    print(f"{'配置':>10} {'Mbit/s':>8} {'已发送':>10} {'结束时解析':>10} {'最终解析':>10} {'结束积压(ms)':>12} "
+          f"{'服务器滞后(ms)':>14} {'接收CPU':>8} {'结论':>6}")
+    for i, spec in enumerate(args.configs):
+        channels, srate = spec.lower().split("x")
+        r = run_config(args.device, int(channels), float(srate), args, args.port + i)
+        verdict = "跟得上" if r["sustained"] else ("解析线程退出" if not r["parser_ok"] else "跟不上")
+        print(f"{spec:>10} {r['mbit']:>8.2f} {r['sent']:>10d} {r['at_exit']:>10d} {r['received']:>10d} "
+              f"{r['backlog_ms']:>12.1f} {r['sim_lag_ms']:>14.1f} {r['cpu_pct']:>7.1f}% {verdict:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Neuracle 协议解码微基准：struct.unpack + bytes 拼接（旧实现） vs 结构化 dtype 的 np.frombuffer + memoryview 尾帧搬移。
+两种实现都按相同的、故意不对齐帧边界的 recv 切分喂入，并逐位比对写入环形缓冲的数据。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_neuracle_decode.py --configs 9x1000 33x1000 65x1000 65x4000 --repeat 200
+"""
+
+import os
+import sys
+import time
+import argparse
+from struct import unpack
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neuracle_lib.dataServer import DataServerThread  # noqa: E402
+from neuracle_lib.dataServerSimulator import encode_neuracle  # noqa: E402
+
+UPDATE_INTERVAL = 0.04
+
+
+def legacy_parse(n_chan: int, buffer: bytes, raw: bytes):
+    """原 parseData 的 Neuracle 分支（连同 read_thread 里的拼接与 reshape）"""
+    raw = buffer + raw
+    n = len(raw)
+    hexData = raw[:n - np.mod(n, 4 * n_chan)]
+    buffer = raw[n - np.mod(n, 4 * n_chan):]
+    n_item = int(len(hexData) / 4 / n_chan)
+    format_str = '<' + (str(n_chan - 1) + 'f' + '1I') * n_item
+    data = np.asarray(unpack(format_str, hexData))
+    return data.reshape(len(data) // n_chan, n_chan).T, buffer
+
+
+def make_chunks(n_chan: int, srate: int, seconds: float, seed: int = 0) -> list:
+    """生成 seconds 秒数据，按 40 ms 推送量附近随机长度切分，模拟 TCP recv 的任意边界"""
+    rng = np.random.default_rng(seed)
+    n = int(srate * seconds)
+    eeg = rng.normal(0.0, 50.0, size=(n_chan - 1, n)).astype(np.float32)
+    triggers = np.zeros(n, dtype=np.uint32)
+    triggers[::srate // 2] = rng.integers(1, 256, size=len(triggers[::srate // 2]))
+    stream = encode_neuracle(eeg, triggers)
+    per_push = int(UPDATE_INTERVAL * srate) * 4 * n_chan
+    chunks, pos = [], 0
+    while pos < len(stream):
+        size = int(rng.integers(per_push // 2, per_push * 3 // 2 + 1))
+        chunks.append(stream[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def run_legacy(n_chan: int, chunks: list) -> list:
+    out, buffer = [], b''
+    for raw in chunks:
+        data, buffer = legacy_parse(n_chan, buffer, raw)
+        out.append(data)
+    return out
+
+
+def run_frombuffer(client: DataServerThread, chunks: list) -> list:
+    out = []
+    client._n_left = 0
+    for raw in chunks:
+        # 代替 sock.recv_into：把本次“收到”的字节写到剩余尾帧之后
+        client._recv_view[client._n_left:client._n_left + len(raw)] = raw
+        out.append(client.parseNeuracleBuffer(client._n_left + len(raw)))
+    return out
+
+
+def bench(func, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", default=["9x1000", "33x1000", "65x1000", "65x4000"],
+                        help="通道数x采样率（通道数含 trigger 通道）")
+    parser.add_argument("--seconds", type=float, default=2.0, help="每组解码的数据时长")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'配置':>10} {'recv次数':>8} {'旧实现(us/次)':>14} {'frombuffer(us/次)':>18} {'加速比':>8} {'逐位一致':>8}")
+    for spec in args.configs:
+        n_chan, srate = (int(v) for v in spec.lower().split("x"))
+        chunks = make_chunks(n_chan, srate, args.seconds)
+        client = DataServerThread("Neuracle", n_chan, srate=srate)
+        client.bufsize = max(len(c) for c in chunks)
+        client._recv_buf = bytearray(client.bufsize + client._frame_size)
+        client._recv_view = memoryview(client._recv_buf)
+
+        ref = np.hstack(run_legacy(n_chan, chunks))
+        new = np.hstack(run_frombuffer(client, chunks))
+        same = ref.shape == new.shape and np.array_equal(ref, new.astype(np.float64))
+
+        t_legacy = bench(lambda: run_legacy(n_chan, chunks), args.repeat) / len(chunks)
+        t_new = bench(lambda: run_frombuffer(client, chunks), args.repeat) / len(chunks)
+        print(f"{spec:>10} {len(chunks):>8d} {t_legacy * 1e6:>14.1f} {t_new * 1e6:>18.1f} "
+              f"{t_legacy / t_new:>7.1f}x {'是' if same else '否':>8}")
+
+
+if __name__ == "__main__":
+    main()
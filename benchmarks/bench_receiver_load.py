@@ -0,0 +1,97 @@
+"""
+UdpEegReceiver 吞吐上限压测：对每组“通道数 × 采样率”在子进程中运行 V2 设备模拟器（避免与接收端争 GIL），
+本进程内运行接收器并统计实际收到的采样点、内核丢包、时间戳缺口以及接收进程的 CPU 占用。
+收到比例明显低于 100% 或出现内核丢包的配置即超过了接收端的处理能力。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_receiver_load.py --configs 8x1000 32x1000 32x4000 64x4000 --seconds 10
+    python benchmarks/bench_receiver_load.py --configs 32x4000 --samples 20 --jitter-ms 5 --reorder 0.01
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from PyQt6.QtCore import QCoreApplication
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from acquisition import UdpEegReceiver  # noqa: E402
+
+
+def run_config(channels: int, fs: float, args, port: int) -> dict:
+    receiver = UdpEegReceiver(port=port)
+    received = {"samples": 0, "batches": 0}
+
+    def on_batch(batch):
+        received["batches"] += 1
+        received["samples"] += int(batch.samples.size)
+
+    receiver.subscribe(on_batch)
+    receiver.start()
+
+    cmd = [
+        sys.executable, "-m", "acquisition.simulator",
+        "--port", str(port), "--channels", str(channels), "--fs", str(fs),
+        "--samples", str(args.samples), "--seconds", str(args.seconds),
+        "--jitter-ms", str(args.jitter_ms), "--reorder", str(args.reorder), "--loss", str(args.loss),
+        "--seed", "0", "--json",
+    ]
+    cpu0 = time.process_time()
+    wall0 = time.monotonic()
+    sim = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    # 等接收端把重排缓冲里的尾巴处理完
+    time.sleep(0.3)
+    receiver.stop()
+    wall = time.monotonic() - wall0
+    cpu = time.process_time() - cpu0
+
+    if sim.returncode != 0:
+        raise RuntimeError(f"模拟器异常退出: {sim.stderr.strip()}")
+    sim_stats = json.loads(sim.stdout.strip().splitlines()[-1])
+    # 接收端每个通道的第一包只用于建立时间基准、不输出，不计入应收
+    expected = max(sim_stats.get("samples_per_channel", 0) - args.samples, 0) * channels
+    drops = receiver.get_drop_stats()
+    return {
+        "expected": expected,
+        "received": received["samples"],
+        "batches": received["batches"],
+        "kernel_dropped": drops["kernel_dropped"],
+        "gap_lost": sum(drops["gap_lost"].values()),
+        "cpu_pct": cpu / wall * 100.0 if wall > 0 else 0.0,
+        "sim_lag_ms": sim_stats.get("max_lag_ms", 0.0),
+        "mbit": sim_stats.get("mbit_per_s", 0.0),
+        "sim_dropped": sim_stats.get("datagrams_dropped", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", default=["8x1000", "32x1000", "32x4000", "64x4000"],
+                        help="通道数x采样率，可给多个")
+    parser.add_argument("--samples", type=int, default=40, help="每个通道包的采样点数")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--reorder", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=30390)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)  # noqa: F841  接收器是 QObject，需要一个应用实例
+
+    print(f"{'配置':>10} {'Mbit/s':>8} {'应收采样':>12} {'实收采样':>12} {'收到比例':>8} "
+          f"{'内核丢包':>8} {'缺口包':>8} {'接收CPU':>8} {'模拟器滞后(ms)':>14}")
+    for i, spec in enumerate(args.configs):
+        channels, fs = spec.lower().split("x")
+        r = run_config(int(channels), float(fs), args, args.port + i)
+        ratio = r["received"] / r["expected"] * 100.0 if r["expected"] else 0.0
+        print(f"{spec:>10} {r['mbit']:>8.2f} {r['expected']:>12d} {r['received']:>12d} {ratio:>7.1f}% "
+              f"{str(r['kernel_dropped']):>8} {r['gap_lost']:>8d} {r['cpu_pct']:>7.1f}% {r['sim_lag_ms']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+录制写盘基准：逐采样格式化写 CSV（旧实现） vs 会话二进制文件（float32 + 时间锚点）。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_recording.py --channels 8 --seconds 60 --fs 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recording import SessionWriter, session_path  # noqa: E402
+
+
+def make_chunks(n_channels: int, seconds: float, fs: float, chunk_samples: int):
+    rng = np.random.default_rng(0)
+    n_chunks = int(seconds * fs / chunk_samples)
+    base = np.arange(chunk_samples) / fs
+    for k in range(n_chunks):
+        times = k * chunk_samples / fs + base
+        for ch in range(n_channels):
+            yield ch, times, rng.standard_normal(chunk_samples).astype(np.float32) * 50
+
+
+def bench_csv(out_dir: str, chunks) -> float:
+    files = {}
+    t0 = time.perf_counter()
+    for ch, times, samples in chunks:
+        f = files.get(ch)
+        if f is None:
+            f = files[ch] = open(os.path.join(out_dir, f"EEG_000003_{ch:02d}.csv"), "w",
+                                 encoding="utf-8", newline="")
+            f.write("Time,Response\n")
+        for t_s, v in zip(times.tolist(), samples.tolist()):
+            f.write(f"{t_s:.6f},{v:.6f}\n")
+    for f in files.values():
+        f.close()
+    return time.perf_counter() - t0
+
+
+def bench_binary(out_dir: str, chunks, fs: float) -> float:
+    t0 = time.perf_counter()
+    writer = SessionWriter(session_path(out_dir), sample_rate=fs, serial="000003")
+    for ch, times, samples in chunks:
+        writer.write_chunk(ch, times, samples)
+    writer.close()
+    return time.perf_counter() - t0
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--fs", type=float, default=1000.0)
+    parser.add_argument("--chunk-samples", type=int, default=40, help="每次写入的采样点数（约一个批次）")
+    args = parser.parse_args()
+
+    chunks = list(make_chunks(args.channels, args.seconds, args.fs, args.chunk_samples))
+    with tempfile.TemporaryDirectory() as csv_dir, tempfile.TemporaryDirectory() as bin_dir:
+        t_csv = bench_csv(csv_dir, chunks)
+        t_bin = bench_binary(bin_dir, chunks, args.fs)
+        size_csv = dir_size(csv_dir)
+        size_bin = dir_size(bin_dir)
+
+    n_samples = args.channels * args.seconds * args.fs
+    print(f"{'':>8} {'耗时(s)':>10} {'采样/s':>14} {'文件(MB)':>10}")
+    print(f"{'CSV':>8} {t_csv:>10.3f} {n_samples / t_csv:>14.0f} {size_csv / 1e6:>10.2f}")
+    print(f"{'binary':>8} {t_bin:>10.3f} {n_samples / t_bin:>14.0f} {size_bin / 1e6:>10.2f}")
+    print(f"加速比 {t_csv / t_bin:.1f}x，文件缩小 {size_csv / size_bin:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
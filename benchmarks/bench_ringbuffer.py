@@ -0,0 +1,93 @@
+"""
+DataServerThread 环形缓冲微基准：旧实现（np.mod(np.arange) 花式索引写入、float64、getData 整窗 hstack）
+vs 两段切片写入 + float32 + read_since 增量读取。
+写入按 40 ms 一块；读取模拟一个每 40 ms 轮询一次、只需要新数据的消费者。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_ringbuffer.py --configs 9x1000 65x1000 65x4000 257x16000 --t-buffer 3
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neuracle_lib.dataServer import RingBuffer  # noqa: E402
+
+UPDATE_INTERVAL = 0.04
+
+
+class LegacyRingBuffer:
+    """原 RingBuffer 的写入与读取"""
+
+    def __init__(self, n_chan, n_points):
+        self.n_points = n_points
+        self.buffer = np.zeros((n_chan, n_points))
+        self.currentPtr = 0
+        self.nUpdate = 0
+
+    def appendBuffer(self, data):
+        n = data.shape[1]
+        self.buffer[:, np.mod(np.arange(self.currentPtr, self.currentPtr + n), self.n_points)] = data
+        self.currentPtr = np.mod(self.currentPtr + n - 1, self.n_points) + 1
+        self.nUpdate = self.nUpdate + n
+
+    def getData(self):
+        return np.hstack([self.buffer[:, self.currentPtr:], self.buffer[:, :self.currentPtr]])
+
+
+def bench(func, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", default=["9x1000", "65x1000", "65x4000", "257x16000"],
+                        help="通道数x采样率")
+    parser.add_argument("--t-buffer", type=float, default=3.0, help="缓冲长度（秒）")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'配置':>10} {'旧写入(us)':>10} {'新写入(us)':>10} {'加速比':>7} "
+          f"{'getData(us)':>12} {'read_since(us)':>14} {'加速比':>7} {'旧缓冲(MB)':>10} {'新缓冲(MB)':>10}")
+    for spec in args.configs:
+        n_chan, srate = (int(v) for v in spec.lower().split("x"))
+        n_points = int(round(args.t_buffer * srate))
+        block = np.random.default_rng(0).normal(size=(n_chan, int(UPDATE_INTERVAL * srate))).astype(np.float32)
+
+        legacy = LegacyRingBuffer(n_chan, n_points)
+        ring = RingBuffer(n_chan, n_points)
+        t_append_legacy = bench(lambda: legacy.appendBuffer(block), args.repeat)
+        t_append_new = bench(lambda: ring.appendBuffer(block), args.repeat)
+
+        # 读取只计读取本身：每次先写入一块新数据，再计时一次读取
+        t_read_legacy = t_read_new = 0.0
+        cursor = ring.nTotal
+        for _ in range(args.repeat):
+            legacy.appendBuffer(block)
+            t0 = time.perf_counter()
+            legacy.getData()
+            t_read_legacy += time.perf_counter() - t0
+
+            ring.appendBuffer(block)
+            t0 = time.perf_counter()
+            _, cursor = ring.read_since(cursor)
+            t_read_new += time.perf_counter() - t0
+        t_read_legacy /= args.repeat
+        t_read_new /= args.repeat
+
+        print(f"{spec:>10} {t_append_legacy * 1e6:>10.1f} {t_append_new * 1e6:>10.1f} "
+              f"{t_append_legacy / t_append_new:>6.1f}x {t_read_legacy * 1e6:>12.1f} {t_read_new * 1e6:>14.1f} "
+              f"{t_read_legacy / t_read_new:>6.0f}x "
+              f"{legacy.buffer.nbytes / 2 ** 20:>10.1f} {ring.buffer.nbytes / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
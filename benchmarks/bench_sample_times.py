@@ -0,0 +1,101 @@
+"""
+逐采样时间展开微基准（默认 1 kHz × 8 通道，40 点/包，20 ms 投递节拍）：
+- 旧实现：每个包用 Python 列表推导展开，绘图和保存各调用一次；
+- 新实现：每个批次在第一次调用 EegChannelChunk.sample_times 时对全部通道一次向量化展开并缓存，
+  其他通道、绘图 / 保存 / 其他页面再次取用时直接切片。
+输出按“每个包”折算的耗时。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_sample_times.py --fs 1000 --channels 8 --samples 40 --repeat 2000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acquisition import EegBatch, EegDataPacket  # noqa: E402
+
+
+def legacy_expand_packet_times(packet: EegDataPacket, sample_rate: float) -> list[float]:
+    n = len(packet.data)
+    if n == 0:
+        return []
+    dt_s = 1.0 / sample_rate
+    base_ts = packet.system_timestamp if packet.system_timestamp > 0 else packet.hardware_timestamp
+    t_first = base_ts - (n - 1) * dt_s
+    return [t_first + j * dt_s for j in range(n)]
+
+
+def make_packets(fs: float, n_channels: int, n_samples: int, interval_ms: float) -> list[EegDataPacket]:
+    packets_per_channel = max(int(round(interval_ms / 1000.0 * fs / n_samples)), 1)
+    rng = np.random.default_rng(0)
+    packets = []
+    for k in range(packets_per_channel):
+        t_last = (k + 1) * n_samples / fs
+        for ch in range(n_channels):
+            packets.append(EegDataPacket(
+                hardware_timestamp=t_last,
+                system_timestamp=t_last + 0.5,
+                data=rng.standard_normal(n_samples).astype(np.float32),
+                channel=ch,
+            ))
+    return packets
+
+
+def bench(func, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fs", type=float, default=1000.0)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--samples", type=int, default=40, help="每个通道包内的采样点数")
+    parser.add_argument("--interval-ms", type=float, default=20.0, help="投递节拍（毫秒）")
+    parser.add_argument("--consumers", type=int, default=2, help="每批取用时间轴的次数（绘图 + 保存 = 2）")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    packets = make_packets(args.fs, args.channels, args.samples, args.interval_ms)
+    n_packets = len(packets)
+
+    # 校验：两种实现的时间轴一致
+    batch = EegBatch.from_packets(packets)
+    for ch, chunk in batch.channels.items():
+        ref = np.concatenate([legacy_expand_packet_times(p, args.fs) for p in packets if p.channel == ch])
+        assert np.allclose(chunk.sample_times(args.fs), ref, rtol=0, atol=1e-9)
+
+    def run_legacy():
+        for _ in range(args.consumers):
+            for p in packets:
+                legacy_expand_packet_times(p, args.fs)
+
+    def run_chunk():
+        # 每次新建批次，保证第一次取用时真正展开（含批次构建之外的全部展开开销）
+        b = EegBatch.from_packets(packets)
+        for _ in range(args.consumers):
+            for chunk in b.channels.values():
+                chunk.sample_times(args.fs)
+
+    t_build = bench(lambda: EegBatch.from_packets(packets), args.repeat)
+    t_legacy = bench(run_legacy, args.repeat)
+    t_chunk = bench(run_chunk, args.repeat) - t_build
+
+    print(f"{args.fs:g} Hz × {args.channels} 通道，{args.samples} 点/包，每批 {n_packets} 个包，"
+          f"每批取用 {args.consumers} 次")
+    print(f"{'实现':<24} {'每批(us)':>10} {'每包(us)':>10}")
+    print(f"{'逐包列表展开 × 取用次数':<24} {t_legacy * 1e6:>10.2f} {t_legacy / n_packets * 1e6:>10.3f}")
+    print(f"{'按批次向量化 + 缓存':<24} {t_chunk * 1e6:>10.2f} {t_chunk / n_packets * 1e6:>10.3f}")
+    print(f"加速比 {t_legacy / t_chunk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
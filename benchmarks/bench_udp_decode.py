@@ -0,0 +1,101 @@
+"""
+24bit 采样点解码微基准（一个 datagram = channels 个通道帧，每帧 samples 个采样点，与设备 / 模拟器的拼包方式相同）：
+- 旧实现：逐帧、逐字节 Python 循环；
+- 逐帧 NumPy：每帧调用一次 decode_int24_samples；
+- 整包 NumPy：decode_int24_frames 对整个 datagram 只在 buffer 上建一次零拷贝视图、做一次解码，再按通道切片（接收器当前的做法）；
+- 完整解包：UdpEegReceiver._parse_eeg_packet（帧头扫描 + 整包解码 + 构造 EegDataPacket），供参考。
+表中时间均为每个通道包的平均耗时，加速比为整包 NumPy 相对旧实现；加速比不到 10 倍（一个数量级）的包长会在表后注明。
+8 通道 × 40 采样点/包时整包解码约为旧实现的 1/9，略低于一个数量级，100 采样点/包以上可达 20 倍以上；
+完整解包中帧头扫描与 EegDataPacket 构造仍是逐帧的 Python 开销，40 采样点/包时约为旧实现解码耗时的 1/4。
+
+用法（在项目根目录下）：
+    python benchmarks/bench_udp_decode.py --samples 40 100 200 500 --channels 8 --repeat 5000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acquisition import UdpEegReceiver, decode_int24_frames, decode_int24_samples, encode_v2_frames  # noqa: E402
+
+
+def legacy_decode(data_bytes: bytes) -> list[float]:
+    samples: list[float] = []
+    for j in range(len(data_bytes) // 3):
+        base = j * 3
+        b1 = data_bytes[base]
+        b2 = data_bytes[base + 1]
+        b3 = data_bytes[base + 2]
+        if (b1 & 0x80) != 0:
+            raw_value = (b1 << 16) | (b2 << 8) | b3 | (0xFF << 24)
+        else:
+            raw_value = (b1 << 16) | (b2 << 8) | b3
+        if raw_value >= 0x80000000:
+            raw_value -= 0x100000000
+        samples.append(raw_value / 1000.0)
+    return samples
+
+
+def make_datagram(n_channels: int, n_samples: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    values = rng.integers(-(1 << 23), 1 << 23, size=(n_channels, n_samples), dtype=np.int32)
+    frames = encode_v2_frames(values, np.arange(n_channels), timestamp_us=123456)
+    return frames.tobytes()
+
+
+def bench(func, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, nargs="+", default=[40, 100, 200, 500],
+                        help="每个通道包内的采样点数（可给多个）")
+    parser.add_argument("--channels", type=int, default=8, help="每个 datagram 内的通道帧数")
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    receiver = UdpEegReceiver(port=0)
+    n_ch = args.channels
+    print(f"每个 datagram {n_ch} 个通道帧；时间为每个通道包的平均耗时")
+    print(f"{'采样点/包':>10} {'旧实现(us)':>12} {'逐帧NumPy(us)':>14} {'整包NumPy(us)':>14} "
+          f"{'加速比':>8} {'完整解包(us)':>13} {'最大误差(μV)':>14}")
+    below_target = []
+    for n_samples in args.samples:
+        datagram = make_datagram(n_ch, n_samples)
+        data_length = n_samples * 3
+        frame_len = data_length + UdpEegReceiver.PACK_INFO_LENGTH
+        offsets = [k * frame_len + 8 for k in range(n_ch)]
+        counts = [n_samples] * n_ch
+
+        ref = np.concatenate([
+            np.asarray(legacy_decode(datagram[o: o + data_length]), dtype=np.float64) for o in offsets
+        ])
+        new, _ = decode_int24_frames(datagram, offsets, counts)
+        max_err = float(np.max(np.abs(ref - new))) if ref.size else 0.0
+
+        t_legacy = bench(lambda: [legacy_decode(datagram[o: o + data_length]) for o in offsets], args.repeat)
+        t_frame = bench(lambda: [decode_int24_samples(datagram, o, data_length) for o in offsets], args.repeat)
+        t_batch = bench(lambda: decode_int24_frames(datagram, offsets, counts), args.repeat)
+        t_parse = bench(lambda: receiver._parse_eeg_packet(datagram), args.repeat)
+
+        print(f"{n_samples:>10d} {t_legacy / n_ch * 1e6:>12.2f} {t_frame / n_ch * 1e6:>14.2f} "
+              f"{t_batch / n_ch * 1e6:>14.2f} {t_legacy / t_batch:>7.1f}x {t_parse / n_ch * 1e6:>13.2f} "
+              f"{max_err:>14.3e}")
+        if t_legacy / t_batch < 10.0:
+            below_target.append(n_samples)
+
+    if below_target:
+        print(f"注意：{below_target} 采样点/包的整包解码加速比未达到 10 倍（一个数量级）的目标")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+UdpEegReceiver 长时间运行内存浸泡测试：本机持续发送 V2 帧，只通过 subscribe 消费批次，
+定期采样进程 RSS，预热后 RSS 增长超过阈值即以非 0 退出码失败。
+
+发送端按 --speed 倍速推进片上时间，用较短的墙钟时间模拟数小时的会话数据量。
+
+用法（在项目根目录下，仅 Linux，读取 /proc/self/statm）：
+    python benchmarks/soak_receiver_memory.py --seconds 120 --speed 20 --max-growth-mb 8
+    python benchmarks/soak_receiver_memory.py --tap 5000    # 同时启用有界包旁路
+"""
+
+import os
+import sys
+import time
+import socket
+import struct
+import argparse
+import threading
+
+import numpy as np
+from PyQt6.QtCore import QCoreApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acquisition import UdpEegReceiver  # noqa: E402
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm", "r") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * _PAGE_SIZE / (1024 * 1024)
+
+
+def make_frame(ch: int, ts_us: int, payload: bytes, serial: int = 3) -> bytes:
+    hdr = bytes([1, 1]) + serial.to_bytes(3, "big") + bytes([ch]) + len(payload).to_bytes(2, "big")
+    return hdr + payload + struct.pack(">Q", ts_us) + b"\x00"
+
+
+def sender(port: int, stop: threading.Event, n_channels: int, fs: float, n_samples: int, speed: float):
+    rng = np.random.default_rng(0)
+    values = rng.integers(-(1 << 20), 1 << 20, size=n_samples, dtype=np.int32)
+    payload = values.astype(">i4").view(np.uint8).reshape(n_samples, 4)[:, 1:].tobytes()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    period = n_samples / fs / speed
+    t0 = time.monotonic()
+    k = 0
+    while not stop.is_set():
+        ts_us = int(k * n_samples * 1e6 / fs)
+        sock.sendto(b"".join(make_frame(ch, ts_us, payload) for ch in range(n_channels)), ("127.0.0.1", port))
+        k += 1
+        delay = t0 + k * period - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0, help="墙钟运行时长（秒）")
+    parser.add_argument("--speed", type=float, default=20.0, help="片上时间相对墙钟的倍速")
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--fs", type=float, default=1000.0)
+    parser.add_argument("--samples", type=int, default=40, help="每个通道包的采样点数")
+    parser.add_argument("--port", type=int, default=30399)
+    parser.add_argument("--tap", type=int, default=0, help="启用包旁路并保留最近 N 个包（0 为不启用）")
+    parser.add_argument("--warmup", type=float, default=0.25, help="预热时长占总时长的比例，不计入增长")
+    parser.add_argument("--interval", type=float, default=2.0, help="RSS 采样间隔（秒）")
+    parser.add_argument("--max-growth-mb", type=float, default=8.0, help="预热后允许的 RSS 增长（MB）")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)  # noqa: F841  接收器是 QObject，需要一个应用实例
+
+    receiver = UdpEegReceiver(port=args.port)
+    received = [0]
+    receiver.subscribe(lambda batch: received.__setitem__(
+        0, received[0] + sum(int(c.counts.sum()) for c in batch.channels.values())))
+    tap = receiver.enable_tap(args.tap) if args.tap > 0 else None
+    receiver.start()
+
+    stop = threading.Event()
+    th = threading.Thread(
+        target=sender, args=(args.port, stop, args.channels, args.fs, args.samples, args.speed), daemon=True
+    )
+    th.start()
+
+    t_start = time.monotonic()
+    warmup_end = t_start + args.seconds * args.warmup
+    baseline = None
+    samples_mb: list[tuple[float, float]] = []
+    print(f"{'时间(s)':>8} {'RSS(MB)':>9} {'采样点':>12} {'旁路包数':>8}")
+    try:
+        while time.monotonic() - t_start < args.seconds:
+            time.sleep(args.interval)
+            now = time.monotonic()
+            rss = rss_mb()
+            if now >= warmup_end:
+                if baseline is None:
+                    baseline = rss
+                samples_mb.append((now - t_start, rss))
+            print(f"{now - t_start:>8.1f} {rss:>9.1f} {received[0]:>12d} {len(tap) if tap is not None else 0:>8d}")
+    finally:
+        stop.set()
+        th.join()
+        receiver.stop()
+
+    if baseline is None or len(samples_mb) < 2:
+        print("运行时间太短，没有足够的预热后采样")
+        sys.exit(2)
+
+    t = np.array([s[0] for s in samples_mb])
+    rss = np.array([s[1] for s in samples_mb])
+    growth = float(rss.max() - baseline)
+    slope = float(np.polyfit(t, rss, 1)[0]) * 60.0
+    session_minutes = args.seconds * args.speed / 60.0
+    print(f"模拟会话时长 {session_minutes:.1f} 分钟，接收采样点 {received[0]}，丢包统计 {receiver.get_drop_stats()}")
+    print(f"预热后 RSS 增长 {growth:.2f} MB，线性趋势 {slope:.3f} MB/分钟（阈值 {args.max_growth_mb} MB）")
+    if growth > args.max_growth_mb:
+        print("FAIL: RSS 持续增长")
+        sys.exit(1)
+    print("OK: RSS 平稳")
+
+
+if __name__ == "__main__":
+    main()
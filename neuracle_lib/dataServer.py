@@ -9,35 +9,215 @@
 # Copyright (c) 2020 Neuracle, Inc. All Rights Reserved. http://neuracle.cn/
 
 import socket
-from struct import unpack
 import numpy as np
 from  threading import Lock, Thread, Event
 import select,time
 
 ## create ringbuffer
 # 环形缓冲区，通过currentPtr和nUpdate进行循环写入，且可循环读取。
+# 第 k 个（自 resetBuffer 起的绝对序号）采样点总是存放在第 k % n_points 列，写入最多两段切片拷贝；
+# nTotal 只增不减（不受 ResetDataLenCount 影响），作为各消费者 read_since 的游标。
+# read_thread 写入与其他线程读取之间用 lock 互斥；数据以 float32 存储（trigger 码在 2^24 以内可精确表示）。
 class RingBuffer():
     def __init__(self,n_chan,n_points):
         self.n_chan = n_chan
         self.n_points = n_points
-        self.buffer = np.zeros((n_chan, n_points))
+        self.lock = Lock()
+        self.buffer = np.zeros((n_chan, n_points), dtype=np.float32)
         self.currentPtr = 0
         self.nUpdate = 0
+        self.nTotal = 0
     ## append buffer and update current pointer
     def appendBuffer(self,data):
         n = data.shape[1]
-        self.buffer[:,np.mod(np.arange(self.currentPtr,self.currentPtr+n),self.n_points)] = data
-        self.currentPtr =  np.mod(self.currentPtr+n-1, self.n_points) + 1
-        self.nUpdate = self.nUpdate+n
+        if n == 0:
+            return
+        with self.lock:
+            k = min(n, self.n_points)  # 超过缓冲长度时只有最后 n_points 个点会留下
+            start = (self.nTotal + n - k) % self.n_points
+            first = min(k, self.n_points - start)
+            self.buffer[:, start:start + first] = data[:, n - k:n - k + first]
+            if first < k:
+                self.buffer[:, :k - first] = data[:, n - k + first:]
+            self.currentPtr = np.mod(self.currentPtr+n-1, self.n_points) + 1
+            self.nUpdate = self.nUpdate+n
+            self.nTotal += n
     ## get data from buffer
     def getData(self):
-        data = np.hstack([self.buffer[:,self.currentPtr:], self.buffer[:,:self.currentPtr]])
+        with self.lock:
+            data = np.hstack([self.buffer[:,self.currentPtr:], self.buffer[:,:self.currentPtr]])
         return data
+    ## get samples appended since cursor
+    def read_since(self, cursor):
+        """
+        返回 (data, new_cursor)：data 为游标之后新写入的 (n_chan, n) 数据，new_cursor 供下次调用。
+        初次可传 0（缓冲内全部有效数据）或 nTotal（只要之后的新数据）；落后超过 n_points 的部分已被覆盖，直接跳过。
+        新数据在缓冲内连续时返回视图不拷贝，该视图在写入端绕回覆盖之前（约 t_buffer 减去本次长度的时间）有效，需要长期保存请自行 copy。
+        """
+        with self.lock:
+            total = self.nTotal
+            if cursor > total:  # 缓冲已被 resetBuffer 清空
+                cursor = 0
+            cursor = max(cursor, total - self.n_points)
+            start = cursor % self.n_points
+            end = start + (total - cursor)
+            if end <= self.n_points:
+                data = self.buffer[:, start:end]
+            else:
+                data = np.concatenate((self.buffer[:, start:], self.buffer[:, :end - self.n_points]), axis=1)
+        return data, total
     # reset buffer
     def resetBuffer(self):
-        self.buffer = np.zeros((self.n_chan, self.n_points))
-        self.currentPtr = 0
-        self.nUpdate = 0
+        with self.lock:
+            self.buffer = np.zeros((self.n_chan, self.n_points), dtype=np.float32)
+            self.currentPtr = 0
+            self.nUpdate = 0
+            self.nTotal = 0
+
+## frame parser shared by DataServerThread and acquisition.DataServerClient
+# 按设备协议把字节流解析为 (n_chan, n) float32 数据块（最后一行为 trigger），本身不持有缓冲，可在任意线程使用。
+class FrameParser():
+    def __init__(self,device,n_chan):
+        self.device = device
+        self.n_chan = n_chan
+        # Neuracle 每个采样点为 (n_chan-1) 个 float32 + 1 个 uint32 trigger，用结构化 dtype 直接解码
+        self.frame_dtype = np.dtype([('eeg', '<f4', (n_chan - 1,)), ('trigger', '<u4')])
+        self.frame_size = self.frame_dtype.itemsize
+        # DSI EEG 包的通道数与 n_chan 不符而被跳过的包数（通道数配置错误时所有数据都会被跳过）
+        self.channel_mismatches = 0
+
+    def decodeNeuracle(self, view):
+        """把 view 中完整的帧解码为 (n_chan, n) float32 数据块（最后一行为 trigger），返回 (数据块, 已用字节数)"""
+        n_item = len(view) // self.frame_size
+        frames = np.frombuffer(view, dtype=self.frame_dtype, count=n_item)
+        data = np.empty((self.n_chan, n_item), dtype=np.float32)
+        data[:-1] = frames['eeg'].T
+        data[-1] = frames['trigger']  # trigger 码在 2^24 以内可由 float32 精确表示
+        return data, n_item * self.frame_size
+
+    def scanFrames(self, buf):
+        """按设备协议解析 buf（bytes / bytearray），返回 ((n_chan, n) float32 数据块, 事件列表, 已消费字节数)"""
+        if 'Neuracle' in self.device:
+            with memoryview(buf) as view:
+                data, used = self.decodeNeuracle(view)
+            return data, [], used
+        if 'HEEG' in self.device:
+            blocks, event, used = self.scanHEEG(buf)
+        elif 'DSI' in self.device:
+            blocks, event, used = self.scanDSI(buf)
+        else:
+            print('not avaliable device !')
+            blocks, event, used = [], [], len(buf)
+        if not blocks:
+            return np.empty((self.n_chan, 0), dtype=np.float32), event, used
+        # 各块都是新分配的 C 连续数组，不引用 buf，调用方随后可以安全地 del buf[:used]
+        if len(blocks) == 1:
+            return blocks[0], event, used
+        return np.concatenate(blocks, axis=1), event, used
+
+    def scanHEEG(self, buf):
+        """
+        用 find() 定位 0x5A 0xA5 包头，NumPy 解码包体；通道数与 n_chan - 1 不符或头长度不合理的位置视为误同步，跳过 1 字节继续找。
+        包格式: 5A A5 | HeaderLen(uint32) | uint32 × (HeaderLen-6)/4 | float32 × 通道数 × 点数 | 30 字节 trigger | 2 字节包尾
+        """
+        blocks, event = [], []
+        n = len(buf)
+        n_data_chan = self.n_chan - 1
+        i = 0
+        while True:
+            j = buf.find(b'\x5a\xa5', i)
+            if j < 0:
+                i = max(i, n - 1)  # 最后一个字节可能是下一个包头的 0x5A
+                break
+            if j + 6 > n:
+                i = j
+                break
+            header_len = int.from_bytes(buf[j + 2:j + 6], 'little')
+            if header_len < 26 or header_len > 4096 or (header_len - 6) % 4:
+                i = j + 1
+                continue
+            if j + header_len > n:
+                i = j
+                break
+            header = np.frombuffer(buf, dtype='<u4', count=(header_len - 6) // 4, offset=j + 6)
+            channel_count, count_per_channel = int(header[2]), int(header[4])
+            if channel_count != n_data_chan:
+                i = j + 1
+                continue
+            body_len = channel_count * count_per_channel * 4
+            whole_len = header_len + body_len + 32
+            if j + whole_len > n:
+                i = j
+                break
+            block = np.zeros((self.n_chan, count_per_channel), dtype=np.float32)
+            block[:-1] = np.frombuffer(buf, dtype='<f4', count=channel_count * count_per_channel,
+                                       offset=j + header_len).reshape(channel_count, count_per_channel)
+            trigger = bytes(buf[j + header_len + body_len:j + header_len + body_len + 30])
+            if trigger[0] != 0 and count_per_channel > 0:
+                str_trigger = trigger.replace(b'\x00', b'').decode('ascii', 'ignore')
+                try:
+                    block[-1, 0] = int(str_trigger)
+                    event.append(str_trigger)
+                except ValueError:
+                    print('invalid HEEG trigger %r' % trigger)
+            blocks.append(block)
+            i = j + whole_len
+        return blocks, event, i
+
+    def scanDSI(self, buf):
+        """
+        用 find() 定位 '@ABCD'，包头: token(5) | type(1) | length(2, 大端) | number(4)。
+        连续、等长的 EEG 包（type 1）一次性用带步长的结构化 dtype 解码；事件包（type 5）只计数。
+        通道数与 n_chan 不符的 EEG 包跳过并计入 channel_mismatches，第一次出现时打印两者的通道数。
+        """
+        blocks, event = [], []
+        n = len(buf)
+        i = 0
+        while True:
+            j = buf.find(b'@ABCD', i)
+            if j < 0:
+                i = max(i, n - 4)  # 末尾可能是被截断的 token
+                break
+            if j + 12 > n:
+                i = j
+                break
+            packet_type = buf[j + 5]
+            packet_length = (buf[j + 6] << 8) | buf[j + 7]
+            packet_size = 12 + packet_length
+            if j + packet_size > n:
+                i = j
+                break
+            if packet_type != 1:
+                if packet_type == 5:
+                    event.append(int.from_bytes(buf[j + 12:j + 16], 'big') if packet_length >= 4 else 0)
+                i = j + packet_size
+                continue
+            if (packet_length - 11) % 4 != 0:
+                print('The packetLength may be incorrect!')
+                i = j + packet_size
+                continue
+            data_num = (packet_length - 11) // 4
+            if data_num != self.n_chan:
+                self.channel_mismatches += 1
+                if self.channel_mismatches == 1:
+                    print('DSI packet has %d channels but n_chan is %d, skipping such packets; '
+                          'check the channel count setting' % (data_num, self.n_chan))
+                i = j + packet_size
+                continue
+            # 从 j 开始按包长切成记录，找出连续的同型同长 EEG 包
+            count = (n - j) // packet_size
+            head = np.frombuffer(buf, dtype=np.dtype({'names': ['token', 'type', 'length'],
+                                                      'formats': ['S5', 'u1', '>u2'],
+                                                      'offsets': [0, 5, 6], 'itemsize': packet_size}),
+                                 count=count, offset=j)
+            ok = (head['token'] == b'@ABCD') & (head['type'] == 1) & (head['length'] == packet_length)
+            run = count if ok.all() else int(np.argmin(ok))
+            body = np.frombuffer(buf, dtype=np.dtype({'names': ['data'], 'formats': [('>f4', (data_num,))],
+                                                      'offsets': [23], 'itemsize': packet_size}),
+                                 count=run, offset=j)
+            blocks.append(np.ascontiguousarray(body['data'].T, dtype=np.float32))
+            i = j + run * packet_size
+        return blocks, event, i
 
 ## create a new thread used to receive data from Neuracle/DSI recorder software according TCP/IP socket
 class DataServerThread(Thread,):
@@ -49,6 +229,9 @@ class DataServerThread(Thread,):
         self.n_chan = n_chan
         self.srate = srate #采样率
         self.t_buffer = t_buffer
+        self.parser = FrameParser(device, n_chan)
+        self._frame_size = self.parser.frame_size
+        self._closed_callback = None  # 服务器关闭连接、接收线程退出时回调一次
 
     def connect(self,hostname='127.0.0.1', port= 8712):
         """
@@ -71,11 +254,19 @@ class DataServerThread(Thread,):
                     break
         self.shutdown_flag = Event()
         self.shutdown_flag.set()
+        self._peer_closed = False
         self.sock.setblocking(True)
         self.bufsize = int(self._update_interval*4*self.n_chan*self.srate*10)  # set buffer size
         nPoints= int(np.round(self.t_buffer*self.srate))
         self.ringBuffer = RingBuffer(self.n_chan, nPoints) # initiate the ringbuffer class
         self.buffer = b'' ## binary buffer used to collect binary array from data server
+        if 'Neuracle' in self.device:
+            # recv_into 写入固定的 bytearray，不完整的尾帧用 memoryview 挪到开头，不做 bytes 拼接
+            self._recv_buf = bytearray(self.bufsize + self._frame_size)
+            self._recv_view = memoryview(self._recv_buf)
+            self._n_left = 0
+        else:
+            self._acc = bytearray()
         return notconnect
 
     def run(self):
@@ -92,6 +283,22 @@ class DataServerThread(Thread,):
                 if not self.sock:
                     socket_lock.release()
                     break
+                if 'Neuracle' in self.device:
+                    try:
+                        n = r.recv_into(self._recv_view[self._n_left:], self.bufsize)
+                    except:
+                        print('can not recieve socket ...')
+                        socket_lock.release()
+                        self.sock.close()
+                    else:
+                        if n == 0:
+                            socket_lock.release()
+                            self._onPeerClosed()
+                            break
+                        data = self.parseNeuracleBuffer(self._n_left + n)
+                        socket_lock.release()
+                        self.ringBuffer.appendBuffer(data)
+                    continue
                 try:
                     raw = r.recv(self.bufsize)
                 except:
@@ -99,116 +306,44 @@ class DataServerThread(Thread,):
                     socket_lock.release()
                     self.sock.close()
                 else:
-                    raw = self.buffer + raw
-                    data, evt = self.parseData(raw) ## parse data
+                    if not raw:
+                        socket_lock.release()
+                        self._onPeerClosed()
+                        break
+                    # HEEG / DSI：追加到 bytearray 累加器，解析后只删除已消费的前缀
+                    self._acc += raw
+                    data, evt, used = self.parser.scanFrames(self._acc)
+                    del self._acc[:used]
                     socket_lock.release()
-                    data = data.reshape(len(data) // (self.n_chan), self.n_chan)
-                    self.ringBuffer.appendBuffer(data.T)
+                    self.ringBuffer.appendBuffer(data)
+        if self._peer_closed and self._closed_callback is not None:
+            self._closed_callback()
+
+    def _onPeerClosed(self):
+        # recv 返回空数据：stop() 之后是本端关闭 socket 唤醒了 select；否则是服务器关闭了连接，退出接收线程而不是空转
+        if self.shutdown_flag.isSet():
+            print('data server closed the connection')
+            self._peer_closed = True
+            self.shutdown_flag.clear()
+
+    def parseNeuracleBuffer(self, n_valid):
+        """解码接收缓冲前 n_valid 字节，并把不足一帧的剩余字节挪到缓冲开头"""
+        data, used = self.parser.decodeNeuracle(self._recv_view[:n_valid])
+        self._n_left = n_valid - used
+        if self._n_left and used:
+            # used 是帧长的整数倍而剩余不足一帧，源与目标区间不会重叠
+            self._recv_view[:self._n_left] = self._recv_view[used:n_valid]
+        return data
 
     def parseData(self,raw):
-        if 'Neuracle' in self.device: ## parse data according to Neuracle device protocol
-            n = len(raw)
-            event , hexData  = [], []
-            hexData = raw[:n - np.mod(n, 4 * self.n_chan)] # unpack hex-data  in row
-            self.buffer = raw[n - np.mod(n, 4 * self.n_chan):]
-            n_item = int(len(hexData)/4/self.n_chan)
-            format_str = '<' + (str(self.n_chan -1) + 'f' + '1I') * n_item
-            # format_str = '<' + (str(self.n_chan) + 'f') * n_item
-            parse_data = unpack(format_str, hexData)
-
-        elif 'HEEG' in self.device:
-            pkglen = len(raw)
-            event = []
-            parse_data = []
-            i = 0
-            while i < pkglen:
-                HeadToken = unpack('2B', raw[i:i + 2])
-                if HeadToken[0] == 90 and HeadToken[1] == 165:
-                    HeaderLen = unpack('I', raw[i + 2:i + 6])
-                    Headerbytelen = int((HeaderLen[0] - 6) / 4)
-                    Headercontent = unpack(str(Headerbytelen) + 'I', raw[i + 6:i + HeaderLen[0]])
-                    ChannelCount = Headercontent[2]
-                    DataCountPerChannel = Headercontent[4]
-                    bodylen = int(DataCountPerChannel * ChannelCount)
-                    try:
-                        body = unpack(str(bodylen) + 'f', raw[i + HeaderLen[0]:i + HeaderLen[0] + bodylen * 4])
-                        body = np.array(body).reshape(ChannelCount, DataCountPerChannel)
-                        tmp = unpack('30c', raw[i + HeaderLen[0] + bodylen * 4: i + HeaderLen[0] + bodylen * 4 + 30])
-                        trigger = ''.join([x.decode('utf8') for x in tmp])
-                        rebuildBody = np.vstack((body, np.zeros((1, DataCountPerChannel))))
-                        if ord(trigger[0]) != 0:
-                            str_trigger = ''.join([i for i in trigger if '\x00' not in i])
-                            rebuildBody[-1, 0] = int(str_trigger)
-                            # print('hEEG event = %s' % (trigger))
-                            event.extend(str_trigger)
-                        parse_data.extend(rebuildBody.T.flatten())
-                        tailtoken = unpack('2B', raw[i + HeaderLen[0] + bodylen * 4 + 30: i + HeaderLen[
-                            0] + bodylen * 4 + 32])
-                        whole_len = HeaderLen[0] + bodylen * 4 + 32
-                        tailend = pkglen % whole_len
-                        i = i + whole_len
-                    except:
-                        # print('bodylen =%f,remain length = %f' % (bodylen, len(raw) - (i + HeaderLen[0])))
-                        break
-                else:
-                    i = i + 1
-            self.buffer = raw[i:]
-        elif 'DSI' in self.device : ## parse data according to DSI device protocol
-            token = '@ABCD'
-            n = len(raw)
-            i = 0
-            parse_data, data_record, event, event_record  = [], [], [], []
-            iData = 0
-            iEvent = 1
-            while i + 12 < n:
-                if token == raw[i:i + 5].decode('ascii'):
-                    packetType = raw[i + 5]
-                    # print(packetType)
-                    bytenum = raw[i + 6:i + 8]
-                    packetLength = 256 * bytenum[0] + bytenum[1]
-                    # bytenum = unpack('>4I', buffer[i+8:i+12])
-                    # packetNumber = 16777216*bytenum[0]+65536*bytenum[1]+256*bytenum[2]+bytenum[3]
-                    if i + 12 + packetLength > n:
-                        break
-                    if packetType == 1:
-                        data_record.append({})
-                        # bytenum = unpack('>4I', buffer[i+12:i+16])
-                        # data_record[iData]['TimeStamp'] = 16777216*bytenum[0]+65536*bytenum[1]+256*bytenum[2]+bytenum[3]
-                        # data_record[iData]['DataCounter'] = unpack('>I', buffer[i+16])
-                        # data_record[iData]['ADCStatus'] = unpack('>I', buffer[i+17:i+23])[0]
-                        if np.mod(packetLength - 11, 4) != 0:
-                            print('The packetLength may be incorrect!')
-                        else:
-                            pass
-                        data_num = int((packetLength - 11) / 4)
-                        format = '>' + str(data_num) + 'f'
-                        data_record[iData]['ChannelData'] = unpack(format, raw[i + 23:i + 12 + packetLength])
-                        parse_data.extend(data_record[iData]['ChannelData'])
-                        iData += 1
-                    elif packetType == 5:
-                        event_record.append({})
-                        # bytenum = unpack('>4I', buffer[i+12:i+16])
-                        # event_record[iEvent]['EventCode'] = 16777216*bytenum[0]+65536*bytenum[1]+256*bytenum[2]+bytenum[3]
-                        # bytenum = unpack('>4I', buffer[i+16:i+20])
-                        # event_record[iEvent]['SendingNode'] = 16777216*bytenum[0]+65536*bytenum[1]+256*bytenum[2]+bytenum[3]
-                        # if packerLength > 20:
-                        #     bytenum = unpack('>4I', buffer[i+20:i+24])
-                        #     event_record[iEvent]['MessageLength'] = 16777216*bytenum[0]+65536*bytenum[1]+256*bytenum[2]+bytenum[3]
-                        #     event_record[iEvent]['Message'] = buffer[i+24:i+24+event[iEvent]['MessageLength']].decode('ascii')
-                        # event.extend(event_record[iEvent]['Message'])
-                        iEvent += 1
-                    else:
-                        pass
-                    i = i + 12 + packetLength
-                else:
-                    i += 1
-            self.buffer = raw[i:]
-        else:
-            print('not avaliable device !')
-            parse_data =[]
-            event = []
-            pass
-        return np.asarray(parse_data), event
+        """按 bytes 解析的接口（read_thread 不再使用），返回 (按行展平的数据, 事件列表)，未解析完的尾部留在 self.buffer"""
+        data, event, used = self.parser.scanFrames(raw)
+        self.buffer = raw[used:]
+        return data.T.ravel(), event
+
+    # set callback() invoked once when the data server closes the connection
+    def SetClosedCallback(self, callback):
+        self._closed_callback = callback
 
     ## get float data
     def GetBufferData(self):
@@ -218,16 +353,25 @@ class DataServerThread(Thread,):
     def GetDataLenCount(self):
         return self.ringBuffer.nUpdate
 
+    # get data appended since cursor, returns (data, new_cursor)
+    def GetDataSince(self, cursor):
+        return self.ringBuffer.read_since(cursor)
+
+    # cursor pointing at the newest sample, pass it to GetDataSince to read only later data
+    def GetReadCursor(self):
+        return self.ringBuffer.nTotal
+
     # reset current update point
     def ResetDataLenCount(self, count=0):
         self.ringBuffer.nUpdate = count
 
     # reset trigger channel
     def ResetTriggerChanofBuff(self, data=None):
-        if data == None:
-            self.ringBuffer.buffer[-1, :] = np.zeros((1, self.ringBuffer.buffer.shape[-1]))
-        else:
-            self.ringBuffer.buffer[-1, :] = data
+        with self.ringBuffer.lock:
+            if data == None:
+                self.ringBuffer.buffer[-1, :] = np.zeros((1, self.ringBuffer.buffer.shape[-1]))
+            else:
+                self.ringBuffer.buffer[-1, :] = data
 
     # stop/close thread
     def stop(self):
@@ -0,0 +1,303 @@
+"""
+本机 Neuracle / HEEG / DSI 数据服务器替身：按 DataServerThread.parseData 能解析的三种 TCP 帧格式
+持续推送数据，无需厂商记录软件即可测试 DataServerThread 与依赖它的页面。
+
+帧格式（与 dataServer.DataServerThread.parseData 对应）：
+- Neuracle: 逐采样点连续发送 (n_chan - 1) 个小端 float32 + 1 个小端 uint32 trigger，无帧头；
+- HEEG:     0x5A 0xA5 | HeaderLen(uint32) | 头部 uint32 × (HeaderLen - 6) / 4（[2] 为通道数, [4] 为每通道点数）
+            | float32 × 通道数 × 点数（按通道排列）| 30 字节 ASCII trigger（无事件时全 0）| 2 字节包尾；
+            DataServerThread 会在解析时追加一个 trigger 通道，因此 HEEG 的数据通道数为 n_chan - 1；
+- DSI:      '@ABCD' | 类型(1B) | 长度(2B 大端) | 包序号(4B 大端)，随后按类型：
+            1 = EEG：时间戳(4B) + 计数(1B) + ADC 状态(6B) + n_chan 个大端 float32（每包一个采样点）；
+            5 = 事件：EventCode(4B) + SendingNode(4B)。
+
+用法（在项目根目录下）：
+    python -m neuracle_lib.dataServerSimulator --device Neuracle --channels 65 --srate 1000
+    python -m neuracle_lib.dataServerSimulator --device HEEG --channels 33 --srate 2000 --trigger-interval 1
+    python -m neuracle_lib.dataServerSimulator --device DSI --channels 24 --srate 300 --port 8844
+"""
+
+import json
+import time
+import socket
+import argparse
+import threading
+from typing import Optional
+
+import numpy as np
+
+DEVICES = ("Neuracle", "HEEG", "DSI")
+
+HEEG_HEAD = b"\x5a\xa5"
+HEEG_TAIL = b"\xa5\x5a"
+HEEG_HEADER_WORDS = 5
+HEEG_TRIGGER_BYTES = 30
+
+DSI_TOKEN = b"@ABCD"
+DSI_PACKET_EEG = 1
+DSI_PACKET_EVENT = 5
+DSI_EEG_PREAMBLE = 11  # 时间戳 4 + 计数 1 + ADC 状态 6
+
+
+def encode_neuracle(eeg: np.ndarray, triggers: np.ndarray) -> bytes:
+    """eeg: (n_eeg, n) μV；triggers: (n,) uint32。返回逐采样点交错的字节流"""
+    n_eeg, n = eeg.shape
+    dtype = np.dtype([("eeg", "<f4", (n_eeg,)), ("trigger", "<u4")])
+    frame = np.empty(n, dtype=dtype)
+    frame["eeg"] = eeg.T
+    frame["trigger"] = triggers
+    return frame.tobytes()
+
+
+def encode_heeg(eeg: np.ndarray, seq: int, srate: int, trigger: int = 0) -> bytes:
+    """一个 HEEG 数据包；eeg: (n_eeg, n) μV，trigger 非 0 时写入 30 字节 trigger 字符串"""
+    n_eeg, n = eeg.shape
+    header_len = 6 + 4 * HEEG_HEADER_WORDS
+    header = np.array([seq, 0, n_eeg, srate, n], dtype="<u4")
+    trigger_field = (str(int(trigger)).encode("ascii") if trigger else b"").ljust(HEEG_TRIGGER_BYTES, b"\x00")
+    return b"".join((
+        HEEG_HEAD,
+        np.uint32(header_len).astype("<u4").tobytes(),
+        header.tobytes(),
+        np.ascontiguousarray(eeg, dtype="<f4").tobytes(),
+        trigger_field,
+        HEEG_TAIL,
+    ))
+
+
+def encode_dsi_eeg(eeg: np.ndarray, first_seq: int, t0: float, srate: float) -> bytes:
+    """n 个 DSI EEG 包（每包一个采样点的全部通道）；eeg: (n_chan, n)"""
+    n_chan, n = eeg.shape
+    dtype = np.dtype([
+        ("token", "S5"), ("type", "u1"), ("length", ">u2"), ("number", ">u4"),
+        ("timestamp", ">f4"), ("counter", "u1"), ("adc", "S6"),
+        ("data", ">f4", (n_chan,)),
+    ])
+    packets = np.zeros(n, dtype=dtype)
+    packets["token"] = DSI_TOKEN
+    packets["type"] = DSI_PACKET_EEG
+    packets["length"] = DSI_EEG_PREAMBLE + 4 * n_chan
+    packets["number"] = (first_seq + np.arange(n)) & 0xFFFFFFFF
+    packets["timestamp"] = t0 + np.arange(n) / srate
+    packets["counter"] = (first_seq + np.arange(n)) & 0xFF
+    packets["data"] = eeg.T
+    return packets.tobytes()
+
+
+def encode_dsi_event(seq: int, code: int, node: int = 0) -> bytes:
+    payload = int(code).to_bytes(4, "big") + int(node).to_bytes(4, "big")
+    return DSI_TOKEN + bytes([DSI_PACKET_EVENT]) + len(payload).to_bytes(2, "big") \
+        + int(seq & 0xFFFFFFFF).to_bytes(4, "big") + payload
+
+
+class DataServerSimulator:
+    """
+    单客户端 TCP 服务器：接受连接后按 update_interval（默认 40 ms，与厂商软件一致）推送一段数据，
+    客户端断开后继续等待下一个连接。
+
+    n_chan 与 DataServerThread 的 n_chan 含义相同：Neuracle / HEEG 含最后一个 trigger 通道，DSI 为全部通道。
+    trigger_interval > 0 时每隔该秒数打一个递增的事件码（1~255 循环）。
+    发送跟不上节拍时不丢数据，只累计 max_lag_ms。
+    """
+
+    def __init__(self, device: str = "Neuracle", n_chan: int = 9, srate: float = 1000.0,
+                 host: str = "127.0.0.1", port: int = 8712, update_interval: float = 0.04,
+                 trigger_interval: float = 0.0, seed: Optional[int] = None):
+        if device not in DEVICES:
+            raise ValueError(f"不支持的设备类型 {device}，可选 {DEVICES}")
+        if device in ("Neuracle", "HEEG") and n_chan < 2:
+            raise ValueError("Neuracle / HEEG 的 n_chan 含 trigger 通道，至少为 2")
+        self.device = device
+        self.n_chan = int(n_chan)
+        self.srate = float(srate)
+        self.host = host
+        self.port = int(port)
+        self.update_interval = float(update_interval)
+        self.trigger_interval = float(trigger_interval)
+        self._rng = np.random.default_rng(seed)
+
+        self.n_eeg = self.n_chan if device == "DSI" else self.n_chan - 1
+        self._template = self._make_template()
+
+        self._server: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.clients = 0
+        self.samples_sent = 0
+        self.bytes_sent = 0
+        self.triggers_sent = 0
+        self.max_lag_ms = 0.0
+        self.started_at: Optional[float] = None
+
+    # ---------------- 控制 ----------------
+
+    def start(self):
+        if self._running:
+            return
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen(1)
+        self._server.settimeout(0.2)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="DataServerSimulator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            # 等正在进行的 sendall 完成，stats() 才与客户端实际可收到的数据一致
+            self._thread.join(timeout=10.0)
+            self._thread = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        return {
+            "device": self.device,
+            "n_chan": self.n_chan,
+            "srate": self.srate,
+            "clients": self.clients,
+            "elapsed_s": elapsed,
+            "samples_sent": self.samples_sent,
+            "bytes_sent": self.bytes_sent,
+            "mbit_per_s": self.bytes_sent * 8 / elapsed / 1e6 if elapsed > 0 else 0.0,
+            "triggers_sent": self.triggers_sent,
+            "max_lag_ms": self.max_lag_ms,
+        }
+
+    # ---------------- 生成 / 编码 ----------------
+
+    def _make_template(self) -> np.ndarray:
+        """预先生成 1 秒（整数个周期的正弦 + 噪声）的数据循环发送，避免高通道数时服务器自身成为瓶颈"""
+        period = max(int(round(self.srate)), 1)
+        freqs = 5.0 + np.arange(self.n_eeg, dtype=np.float64) % 40
+        t = np.arange(period, dtype=np.float64) / period
+        eeg = 50.0 * np.sin(2 * np.pi * freqs[:, None] * t[None, :])
+        eeg += self._rng.normal(0.0, 5.0, size=eeg.shape)
+        return eeg.astype(np.float32)
+
+    def _make_eeg(self, first_index: int, n: int) -> np.ndarray:
+        idx = (first_index + np.arange(n)) % self._template.shape[1]
+        return self._template[:, idx]
+
+    def _encode_block(self, first_index: int, n: int, trigger_at: Optional[int], code: int, seq: int) -> bytes:
+        """编码 n 个采样点；trigger_at 为本段内打事件的采样偏移（None 表示无事件）"""
+        eeg = self._make_eeg(first_index, n)
+        if self.device == "Neuracle":
+            triggers = np.zeros(n, dtype=np.uint32)
+            if trigger_at is not None:
+                triggers[trigger_at] = code
+            return encode_neuracle(eeg, triggers)
+        if self.device == "HEEG":
+            # HEEG 的 trigger 挂在整包上，只能落在包的第一个采样点
+            return encode_heeg(eeg, seq, int(self.srate), code if trigger_at is not None else 0)
+        data = encode_dsi_eeg(eeg, first_index, first_index / self.srate, self.srate)
+        if trigger_at is not None:
+            data += encode_dsi_event(seq, code)
+        return data
+
+    # ---------------- 服务 ----------------
+
+    def _serve(self):
+        self.started_at = time.monotonic()
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.clients += 1
+            try:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._stream(conn)
+            except OSError:
+                pass  # 客户端断开
+            finally:
+                conn.close()
+
+    def _stream(self, conn: socket.socket):
+        t0 = time.monotonic()
+        sent_index = 0
+        seq = 0
+        code = 0
+        next_trigger = self.trigger_interval if self.trigger_interval > 0 else None
+        tick = 0
+        while self._running:
+            tick += 1
+            due = t0 + tick * self.update_interval
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                lag_ms = -delay * 1000.0
+                if lag_ms > self.max_lag_ms:
+                    self.max_lag_ms = lag_ms
+
+            target_index = int((time.monotonic() - t0) * self.srate)
+            n = target_index - sent_index
+            if n <= 0:
+                continue
+
+            trigger_at = None
+            if next_trigger is not None and target_index / self.srate >= next_trigger:
+                trigger_at = max(int(next_trigger * self.srate) - sent_index, 0)
+                if trigger_at >= n:
+                    trigger_at = n - 1
+                code = code % 255 + 1
+                next_trigger += self.trigger_interval
+                self.triggers_sent += 1
+
+            data = self._encode_block(sent_index, n, trigger_at, code, seq)
+            conn.sendall(data)
+            sent_index = target_index
+            seq += 1
+            self.samples_sent += n
+            self.bytes_sent += len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neuracle / HEEG / DSI 数据服务器替身")
+    parser.add_argument("--device", choices=DEVICES, default="Neuracle")
+    parser.add_argument("--channels", type=int, default=9, help="与 DataServerThread 的 n_chan 相同")
+    parser.add_argument("--srate", type=float, default=1000.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8712)
+    parser.add_argument("--update-interval", type=float, default=0.04, help="推送间隔（秒）")
+    parser.add_argument("--trigger-interval", type=float, default=0.0, help="事件间隔（秒），0 为不打事件")
+    parser.add_argument("--seconds", type=float, default=0.0, help="运行时长，0 为一直运行到 Ctrl+C")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="只在结束时输出一行 JSON 统计（供压测脚本解析）")
+    args = parser.parse_args()
+
+    server = DataServerSimulator(
+        device=args.device, n_chan=args.channels, srate=args.srate, host=args.host, port=args.port,
+        update_interval=args.update_interval, trigger_interval=args.trigger_interval, seed=args.seed,
+    )
+    server.start()
+    if args.json:
+        print("ready", flush=True)
+    else:
+        print(f"{args.device} 数据服务器监听 {args.host}:{args.port}：{args.channels} 通道 × {args.srate:g} Hz")
+    t_end = time.monotonic() + args.seconds if args.seconds > 0 else None
+    try:
+        while t_end is None or time.monotonic() < t_end:
+            time.sleep(5.0 if t_end is None else min(5.0, max(t_end - time.monotonic(), 0.0)))
+            if not args.json:
+                print(server.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    if args.json:
+        print(json.dumps(server.stats()))
+    else:
+        print("结束:", server.stats())
+
+
+if __name__ == "__main__":
+    main()
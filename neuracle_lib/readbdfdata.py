@@ -15,32 +15,36 @@
 import mne,os,re
 import numpy as np
 
+# TAL（time-stamped annotation list）: +onset[\x15duration]\x14描述\x14...\x14\x00，模块加载时编译一次
+_TAL_PATTERN = re.compile('([+-]\\d+\\.?\\d*)(\x15(\\d+\\.?\\d*))?(\x14.*?)\x14\x00')
+
+
+def _tal_bytes(chan):
+    """把一个注释通道的采样值整体还原为 TAL 字节流（NumPy 视图，不逐个采样处理）"""
+    this_chan = np.asarray(chan).ravel()
+    if this_chan.dtype == np.int32:  # BDF
+        # Why only keep the first 3 bytes as BDF values
+        # are stored with 24 bits (not 32)
+        return this_chan.astype('<i4', copy=False).view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    # EDF: 每个采样 16 位、低字节在前；截断取整后按 2^16 取模，与逐个 [i % 256, i // 256] 相同
+    return this_chan.astype(np.int64).astype('<u2').tobytes()
+
+
 def read_annotations_bdf(annotations):
-    pat = '([+-]\\d+\\.?\\d*)(\x15(\\d+\\.?\\d*))?(\x14.*?)\x14\x00'
     if isinstance(annotations, str):
         with open(annotations, encoding='latin-1') as annot_file:
-            triggers = re.findall(pat, annot_file.read())
+            triggers = _TAL_PATTERN.findall(annot_file.read())
     else:
-        tals = bytearray()
-        for chan in annotations:
-            this_chan = chan.ravel()
-            if this_chan.dtype == np.int32:  # BDF
-                this_chan.dtype = np.uint8
-                this_chan = this_chan.reshape(-1, 4)
-                # Why only keep the first 3 bytes as BDF values
-                # are stored with 24 bits (not 32)
-                this_chan = this_chan[:, :3].ravel()
-                for s in this_chan:
-                    tals.extend(s)
-            else:
-                for s in this_chan:
-                    i = int(s)
-                    tals.extend(np.uint8([i % 256, i // 256]))
+        # 逐通道处理与整块处理得到的字节流相同，ndarray（单通道或 (n_chan, n)）直接整体展平
+        if isinstance(annotations, np.ndarray):
+            tals = _tal_bytes(annotations)
+        else:
+            tals = b''.join(_tal_bytes(chan) for chan in annotations)
 
         # use of latin-1 because characters are only encoded for the first 256
         # code points and utf-8 can triggers an "invalid continuation byte"
         # error
-        triggers = re.findall(pat, tals.decode('latin-1'))
+        triggers = _TAL_PATTERN.findall(tals.decode('latin-1'))
 
     events = []
     for ev in triggers:
@@ -1,16 +1,11 @@
 import os
 import enum
 import re
-import socket
 import threading
 import time
 import queue
-import struct
 import logging
-import random
-from collections import deque
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Tuple
+from typing import Optional, Dict
 from pathlib import Path
 
 import yaml
@@ -20,9 +15,12 @@ import numpy as np
 from scipy.signal import resample
 
 from PyQt6 import QtWidgets
-from PyQt6.QtCore import Qt, QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, QTimer
 import pyqtgraph as pg
 
+from acquisition import EegBatch, UdpEegReceiver, acquire_receiver, release_receiver
+from recording import EVENTS_FILENAME, RecordingWriter, session_path
+from plotting import MinMaxDecimator, MirroredRingBuffer, RenderScheduler, SweepFramebuffer
 from models.models import build_model
 from braindecode.models import EEGNet
 from process.process import bandpass_filter
@@ -67,451 +65,6 @@ def is_valid_sample_rate(fs: str) -> bool:
         return False
 
 
-# ====================== 数据结构 & 时间校正 ======================
-
-@dataclass
-class EegDataPacket:
-    hardware_timestamp: float
-    system_timestamp: float
-    data: List[float]
-    packet_id: int = 0
-    channel: int = 0
-    raw_packet: Optional[bytes] = None
-
-
-@dataclass
-class TimeRegulatingResult:
-    valid: bool
-    pack_skipped: bool
-    regulated_time: float
-
-
-class ActualTimeRegulator:
-    """
-    与 Page2 一致的时间校正器：
-    - pack_time: 片上时间（秒）
-    - received_at: 会话起点以来的 elapsed 秒（monotonic）
-    """
-
-    def __init__(self, rollback_tolerance_sec: float = 0.01):
-        self._first_pack_time: float = 0.0
-        self._prev_pack_time: float = 0.0
-        self._first_pack_computer_time: float = 0.0
-        self._first_pack: bool = True
-        # 当片上时间回退超过此阈值时，认为异常并重置
-        self._rollback_tolerance = rollback_tolerance_sec
-
-    def reset(self):
-        self._first_pack = True
-        self._prev_pack_time = 0.0
-        self._first_pack_time = 0.0
-        self._first_pack_computer_time = 0.0
-
-    def get_time(self, pack_time: float, received_at: float) -> TimeRegulatingResult:
-        if (not self._first_pack) and (pack_time + self._rollback_tolerance < self._prev_pack_time):
-            # 片上时间明显回退，认为异常，重置状态并跳过该包
-            self.reset()
-            return TimeRegulatingResult(False, True, received_at)
-
-        if self._first_pack:
-            # 第一包：建立基准，只记录，不输出校正时间
-            self._first_pack_time = pack_time
-            self._first_pack_computer_time = received_at
-            self._first_pack = False
-            self._prev_pack_time = pack_time
-            return TimeRegulatingResult(False, False, received_at)
-
-        # 对齐到电脑时间轴
-        regulated = (pack_time - self._first_pack_time) + self._first_pack_computer_time
-        self._prev_pack_time = pack_time
-        return TimeRegulatingResult(True, False, regulated)
-
-
-# ====================== UDP 接收器（与 Page2 对齐 + 网络模拟） ======================
-
-class UdpEegReceiver(QObject):
-    """
-    UDP EEG数据接收器 - PyQt6版本
-
-    解包逻辑与 C# 的 V2BufferParser 对齐：
-    每个包结构（从某个索引 i 开始）：
-        [0]   SensorType
-        [1]   SensorType  (与 [0] 相同)
-        [2-4] Serial Number (3字节)
-        [5]   Channel Number (0xFF = MetaInfo)
-        [6-7] DataLength (大端)
-        [8 ... 8+DataLength-1]       Data 区
-        [8+DataLength ... +7]        OnBoardTime 时间戳（8字节，大端 uint64，单位：微秒）
-        [8+DataLength+8]             CRC8 校验和（此处暂不实际校验，只预留接口）
-
-    总长度 = DataLength + PACK_INFO_LENGTH (17)
-    """
-
-    data_received = pyqtSignal(object)  # 发出 EegDataPacket 实例
-    error_occurred = pyqtSignal(str)    # 错误发生
-
-    PACK_INFO_LENGTH = 17  # header(8) + timestamp(8) + CRC(1)
-
-    def __init__(
-        self, host: str = "0.0.0.0", port: int = 30300, buffer_size: int = 8192,
-        parent: Optional[QObject] = None
-    ):
-        super().__init__(parent)
-        self.host = host
-        self.port = port
-        self.buffer_size = buffer_size
-        self.socket: Optional[socket.socket] = None
-        self.running = False
-        self.data_queue: "queue.Queue[EegDataPacket]" = queue.Queue()
-        self.packet_count = 0
-        self.active_channels = set()
-        self.logger = logging.getLogger("UdpEegReceiver")
-
-        self._recv_count = 0
-        self._last_stat_time = time.time()
-        self.receiver_thread: Optional[threading.Thread] = None
-
-        # 最近一次接收到的片上时间戳（秒）
-        self._last_hw_timestamp: Optional[float] = None
-        # 最近一次接收到的“校正后的电脑时间”（秒）
-        self._last_regulated_ts: Optional[float] = None
-
-        # 每个通道一个时间纠正器和排序缓冲区
-        self._time_regulators: Dict[int, ActualTimeRegulator] = {}
-        self._sorted_packets: Dict[int, List[Tuple[float, EegDataPacket]]] = {}
-        self._buffer_size_per_channel: int = 5
-
-        # 会话起点，用于生成“电脑时间轴” received_at
-        self._start_monotonic: Optional[float] = None
-
-        # ====== 模拟网络不稳定相关参数（默认开启丢包）======
-        self.enable_loss_simulation = False   # 是否开启模拟丢包
-        self.loss_rate = 0.6                  # 丢包比例（0~1）
-        self.enable_jitter_simulation = False  # 是否模拟随机延迟
-        self.jitter_max_delay = 0.05           # 最大延迟秒数
-
-    def get_last_hw_timestamp(self) -> Optional[float]:
-        """返回最近一次接收到的数据包的片上时间戳（秒）。如果还没有收到任何数据则返回 None。"""
-        return self._last_hw_timestamp
-
-    def get_last_regulated_timestamp(self) -> Optional[float]:
-        """
-        返回最近一次接收到的数据包的“校正后的电脑时间”（秒）。
-        """
-        return self._last_regulated_ts
-
-    def is_running(self) -> bool:
-        """当前 UDP 接收线程是否在运行。"""
-        return self.running
-
-    # -------- 启动 / 停止 --------
-
-    def start(self):
-        """启动UDP接收器"""
-        if self.running:
-            self.logger.warning("接收器已经在运行中")
-            return
-
-        try:
-            self.running = True
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-            # 尝试增大接收缓冲区
-            try:
-                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
-                actual_buffer = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-                self.logger.info(f"Socket接收缓冲区大小: {actual_buffer} 字节")
-            except Exception as e:
-                self.logger.warning(f"设置socket缓冲区失败: {e}")
-
-            self.socket.bind((self.host, self.port))
-            self.socket.settimeout(0.1)  # 100ms 超时，方便干净关闭
-
-            self._recv_count = 0
-            self._last_stat_time = time.time()
-            self._last_hw_timestamp = None
-            self._last_regulated_ts = None
-
-            # 重置时间纠正器与排序队列
-            self._time_regulators.clear()
-            self._sorted_packets.clear()
-
-            # 会话起点
-            self._start_monotonic = time.monotonic()
-
-            self.receiver_thread = threading.Thread(
-                target=self._receive_loop,
-                daemon=True,
-                name="UDP-Receiver-Thread",
-            )
-            self.receiver_thread.start()
-
-            self.logger.info(f"UDP接收器已启动，监听 {self.host}:{self.port}")
-
-        except Exception as e:
-            self.running = False
-            self.logger.error(f"启动UDP接收器失败: {e}")
-            self.error_occurred.emit(f"启动UDP接收器失败: {e}")
-            raise
-
-    def stop(self):
-        """停止UDP接收器"""
-        if not self.running:
-            return
-
-        self.running = False
-        if self.socket:
-            self.socket.close()
-            self.socket = None
-
-        if self.receiver_thread and self.receiver_thread.is_alive():
-            self.receiver_thread.join(timeout=2.0)
-
-        self.logger.info("UDP接收器已停止")
-
-    # -------- 接收 & 解析循环（含时间校正 + 排序 + 网络模拟） --------
-
-    def _receive_loop(self):
-        """接收循环，在单独线程中运行"""
-        while self.running:
-            try:
-                data, addr = self.socket.recvfrom(self.buffer_size)
-
-                # ---- (可选) 模拟网络抖动：随机延迟一小段时间 ----
-                if self.enable_jitter_simulation and self.jitter_max_delay > 0:
-                    time.sleep(random.uniform(0, self.jitter_max_delay))
-
-                # ---- (可选) 模拟 UDP 丢包：随机丢弃整个 datagram ----
-                if self.enable_loss_simulation and random.random() < self.loss_rate:
-                    self.logger.warning("【模拟丢包】随机丢弃 1 个 UDP datagram")
-                    continue
-
-                system_ts_wall = time.time()  # 真正的电脑时间（用于日志）
-                if self._start_monotonic is not None:
-                    recv_elapsed = time.monotonic() - self._start_monotonic
-                else:
-                    recv_elapsed = 0.0
-
-                # 统计接收速率（仅日志用）
-                self._recv_count += 1
-                if self._recv_count % 100 == 0:
-                    elapsed = system_ts_wall - self._last_stat_time
-                    rate = 100 / elapsed if elapsed > 0 else 0
-                    self.logger.info(f"UDP接收速率: {rate:.1f} packet/s (已接收{self._recv_count}个)")
-                    self._last_stat_time = system_ts_wall
-
-                # 解析一个 datagram 中可能包含的多个包
-                packets = self._parse_eeg_packet(data)
-
-                # 如果解析不到合法数据，直接跳过
-                if not packets:
-                    continue
-
-                # 使用与 C# 类似的逻辑：按通道使用 ActualTimeRegulator + 排序缓冲
-                for packet in packets:
-                    ch = packet.channel
-
-                    # 维护“最大片上时间”，用于上层查询
-                    if self._last_hw_timestamp is None or packet.hardware_timestamp > self._last_hw_timestamp:
-                        self._last_hw_timestamp = packet.hardware_timestamp
-
-                    # 获取 / 创建通道对应的时间调节器
-                    regulator = self._time_regulators.get(ch)
-                    if regulator is None:
-                        regulator = ActualTimeRegulator()
-                        self._time_regulators[ch] = regulator
-
-                    # 获取 / 创建通道对应的排序缓冲区
-                    channel_buf = self._sorted_packets.get(ch)
-                    if channel_buf is None:
-                        channel_buf = []
-                        self._sorted_packets[ch] = channel_buf
-
-                    # 对应 C# regulator.GetTime(packNumber, session.Stopwatch.Elapsed.TotalSeconds)
-                    reg_result = regulator.get_time(
-                        pack_time=packet.hardware_timestamp,  # 秒
-                        received_at=recv_elapsed,             # 秒
-                    )
-
-                    if reg_result.pack_skipped:
-                        # 如果出现“片上时间倒退”，C# 会 Reset，并跳过该包
-                        self.logger.warning(
-                            f"通道 {ch} 监测到片上时间倒退超过阈值，本包被跳过并重置时间调节器"
-                        )
-                        channel_buf.clear()
-                        continue
-
-                    if not reg_result.valid:
-                        # 第一包仅建立基准，不输出
-                        continue
-
-                    # 写入“校正后的电脑时间”
-                    packet.system_timestamp = reg_result.regulated_time
-
-                    # 按片上时间排序缓存
-                    channel_buf.append((packet.hardware_timestamp, packet))
-                    channel_buf.sort(key=lambda x: x[0])
-
-                    # 当该通道缓存达到一定数量后，弹出最早的一个包
-                    if len(channel_buf) >= self._buffer_size_per_channel:
-                        _, out_packet = channel_buf.pop(0)
-                        self._emit_packet(out_packet)
-
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    self.logger.error(f"接收数据时出错: {e}")
-                    self.error_occurred.emit(f"接收数据时出错: {e}")
-
-    def _emit_packet(self, packet: EegDataPacket):
-        """将排序好的包发给上层（通过 signal）"""
-        self.packet_count += 1
-        self.active_channels.add(packet.channel)
-
-        # 记录最近一个“校正后的电脑时间”
-        if packet.system_timestamp > 0:
-            self._last_regulated_ts = packet.system_timestamp
-
-        # 这里保留 data_queue 以防后续需要
-        self.data_queue.put(packet)
-        # 直接通过信号发给上层
-        self.data_received.emit(packet)
-
-    # -------- C# 风格 UDP 解包 --------
-
-    def _parse_eeg_packet(self, data: bytes) -> List[EegDataPacket]:
-        """
-        解包逻辑改成 C# V2BufferParser 的形式：
-        - 包格式：
-            SensorType,
-            SensorType,
-            Serial(3B),
-            Channel,
-            DataLen(2B),
-            Data(DataLenB),
-            Timestamp(8B, big-endian, µs),
-            CRC(1B)
-        - 总长度 = DataLen + PACK_INFO_LENGTH (17)
-        - 假设一个 UDP datagram 内不会截断单个包（UDP 不会拆包），但可能包含多个包
-        """
-        packets: List[EegDataPacket] = []
-        buf = data
-        n = len(buf)
-        i = 0
-
-        while i + self.PACK_INFO_LENGTH <= n:
-            if i + 8 > n:
-                break
-
-            sensor_type = buf[i]
-            sensor_type_dup = buf[i + 1]
-
-            # 对应 C# MatchPackInfo：两个字节相同
-            if sensor_type != sensor_type_dup:
-                i += 1
-                continue
-
-            # DataLength（大端）
-            data_len = (buf[i + 6] << 8) | buf[i + 7]
-            if data_len <= 0:
-                i += 1
-                continue
-
-            total_len = data_len + self.PACK_INFO_LENGTH
-            pack_end = i + total_len - 1
-            if pack_end >= n:
-                # 剩余数据不足一个完整包
-                break
-
-            # CRC 校验暂不实现
-            frame_data = buf[i: pack_end + 1]
-            packet = self._parse_single_channel_frame(frame_data)
-            if packet is not None:
-                packets.append(packet)
-
-            i = pack_end + 1  # 跳到下一个候选包起点
-
-        return packets
-
-    def _parse_single_channel_frame(self, frame_data: bytes) -> Optional[EegDataPacket]:
-        """解析单个通道的数据帧"""
-        try:
-            if len(frame_data) < self.PACK_INFO_LENGTH:
-                return None
-
-            # --- 头部：SensorType / Serial / Channel / DataLength ---
-            sensor_type = frame_data[0]
-            sensor_type_dup = frame_data[1]
-            if sensor_type != sensor_type_dup:
-                return None
-
-            # 传感器序列号（3 字节）
-            serial_raw = (frame_data[2] << 16) | (frame_data[3] << 8) | frame_data[4]
-
-            # 通道号
-            channel = frame_data[5]
-
-            # meta 信息（Channel == 0xFF）忽略
-            if channel == 0xFF:
-                return None
-
-            # 数据长度（大端）
-            data_length = (frame_data[6] << 8) | frame_data[7]
-            expected_len = data_length + self.PACK_INFO_LENGTH
-            if len(frame_data) != expected_len:
-                return None
-
-            # --- 时间戳：8 + DataLen 开始的 8 字节，big-endian 微秒 ---
-            timestamp_offset = 8 + data_length
-            if timestamp_offset + 8 > len(frame_data):
-                return None
-
-            hardware_ts_raw = struct.unpack(">Q", frame_data[timestamp_offset: timestamp_offset + 8])[0]
-            # 微秒 -> 秒
-            hardware_ts = hardware_ts_raw / 1_000_000.0
-
-            # --- 数据区：从 8 开始，长度 data_length ---
-            data_bytes = frame_data[8: 8 + data_length]
-            data_point_count = data_length // 3
-            samples: List[float] = []
-
-            for j in range(data_point_count):
-                base = j * 3
-                if base + 2 >= len(data_bytes):
-                    break
-                b1 = data_bytes[base]
-                b2 = data_bytes[base + 1]
-                b3 = data_bytes[base + 2]
-
-                # 24bit 转 32bit 有符号整数
-                if (b1 & 0x80) != 0:
-                    raw_value = (b1 << 16) | (b2 << 8) | b3 | (0xFF << 24)
-                else:
-                    raw_value = (b1 << 16) | (b2 << 8) | b3
-
-                if raw_value >= 0x80000000:
-                    raw_value -= 0x100000000
-
-                microvolts = raw_value / 1000.0
-                samples.append(microvolts)
-
-            if not samples:
-                return None
-
-            return EegDataPacket(
-                hardware_timestamp=hardware_ts,
-                system_timestamp=0.0,  # 占位，后续由 ActualTimeRegulator 覆盖
-                data=samples,
-                channel=channel,
-                raw_packet=frame_data,
-            )
-
-        except Exception as e:
-            self.logger.error(f"解析单通道数据帧失败: {e}")
-            return None
-
-
 # ====================== 模型推理相关 ======================
 
 class ModelInference:
@@ -680,8 +233,10 @@ class Page10Widget(QtWidgets.QWidget):
         self.sensor_serial: str = "000003"
         self._sensor_serial_parsed: bool = False
 
-        self.last_plot_time = 0.0
-        self.plot_interval = 1.0 / 30.0  # 最多 ~30 FPS
+        # 绘图由 RenderScheduler 定时驱动，收到新数据只置脏标记
+        self._plot_dirty = False
+        self._last_status_time = 0.0
+        self.render_scheduler = RenderScheduler(self._on_render_tick, target_fps=30.0, parent=self)
 
         self.main_layout = QtWidgets.QVBoxLayout(self)
         self.main_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
@@ -745,9 +300,9 @@ class Page10Widget(QtWidgets.QWidget):
         show_channels_layout.addWidget(self.label_show_channels)
         show_channels_layout.addLayout(self.channel_checkbox_layout)
 
-        # ---------- 绘图降采样 checkbox ----------
-        self.checkbox_downsample_plot = QtWidgets.QCheckBox("绘图降采样1/5")
-        self.checkbox_downsample_plot.setChecked(False)
+        # ---------- 绘图 min/max 包络抽取 checkbox ----------
+        self.checkbox_downsample_plot = QtWidgets.QCheckBox("绘图包络抽取(min/max)")
+        self.checkbox_downsample_plot.setChecked(True)
 
         downsample_layout = QtWidgets.QHBoxLayout()
         downsample_layout.setContentsMargins(0, 0, 0, 0)
@@ -769,6 +324,20 @@ class Page10Widget(QtWidgets.QWidget):
         scroll_mode_layout.addWidget(self.label_scroll_mode)
         scroll_mode_layout.addWidget(self.combo_scroll_mode)
 
+        # ---------- 绘图刷新率 ----------
+        self.label_target_fps = QtWidgets.QLabel("刷新率(FPS)：")
+        self.spin_target_fps = QtWidgets.QSpinBox()
+        self.spin_target_fps.setFixedWidth(70)
+        self.spin_target_fps.setRange(5, 60)
+        self.spin_target_fps.setValue(30)
+        self.spin_target_fps.valueChanged.connect(self.render_scheduler.set_target_fps)
+
+        fps_layout = QtWidgets.QHBoxLayout()
+        fps_layout.setContentsMargins(0, 0, 0, 0)
+        fps_layout.setSpacing(4)
+        fps_layout.addWidget(self.label_target_fps)
+        fps_layout.addWidget(self.spin_target_fps)
+
         # ---------- 顶部整行 ----------
         self.top_controls_layout = QtWidgets.QHBoxLayout()
         self.top_controls_layout.setContentsMargins(20, 0, 20, 0)
@@ -784,6 +353,8 @@ class Page10Widget(QtWidgets.QWidget):
         self.top_controls_layout.addLayout(downsample_layout)
         self.top_controls_layout.addSpacing(16)
         self.top_controls_layout.addLayout(scroll_mode_layout)
+        self.top_controls_layout.addSpacing(16)
+        self.top_controls_layout.addLayout(fps_layout)
         self.top_controls_layout.addStretch()
 
         # ===================== 第二行：按钮 + 状态 =====================
@@ -856,17 +427,16 @@ class Page10Widget(QtWidgets.QWidget):
 
         self.max_points = 1000
         self.sample_rate_hz: Optional[float] = None
-        self.plot_downsample_step = 5
 
         self.window_sec = 5.0
         self.window_points = 1000
-        self.sweep_x: List[float] = [
-            self.window_sec * i / max(self.window_points - 1, 1)
-            for i in range(self.window_points)
-        ]
 
-        self.channel_data_x: Dict[int, deque] = {}
-        self.channel_data_y: Dict[int, deque] = {}
+        self.channel_data_x: Dict[int, MirroredRingBuffer] = {}
+        self.channel_data_y: Dict[int, MirroredRingBuffer] = {}
+        # 每通道的 min/max 包络抽取结果（按像素宽度增量更新）
+        self.channel_decimators: Dict[int, MinMaxDecimator] = {}
+        # 扫屏模式每通道的定长帧缓冲（写指针覆盖 + 固定 NaN 间隙）
+        self.channel_sweeps: Dict[int, SweepFramebuffer] = {}
         self.channel_sample_index: Dict[int, int] = {}
         self.channel_curves: Dict[int, pg.PlotDataItem] = {}
         self.active_channels_in_plot: set[int] = set()
@@ -928,12 +498,14 @@ class Page10Widget(QtWidgets.QWidget):
 
         # ===== 保存数据相关 =====
         self.is_saving: bool = False
-        self.channel_save_files: Dict[int, object] = {}
-        self.channel_save_index: Dict[int, int] = {}
-        self.marker_file: Optional[object] = None
+        # 采样写入会话二进制文件（session.eegrec），需要 CSV 时用 recording.convert 转换；
+        # 写盘在 RecordingWriter 的独立线程中完成，GUI 线程只负责入队
+        self.recording_writer: Optional[RecordingWriter] = None
+        # 最近一次保存结束时的录制统计（stop_saving 时更新），用于在状态栏继续提示写盘错误
+        self.last_recording_metrics: Optional[dict] = None
 
         # ===== 推理相关结构 =====
-        self.shared_queue: "queue.Queue[EegDataPacket]" = queue.Queue()
+        self.shared_queue: "queue.Queue[EegBatch]" = queue.Queue()
         self.result_queue: "queue.Queue[dict]" = queue.Queue()
 
         self.inference_model: Optional[ModelInference] = None
@@ -972,54 +544,33 @@ class Page10Widget(QtWidgets.QWidget):
             if child_layout is not None:
                 self._clear_layout(child_layout)
 
-    # -------- 时间展开的小工具函数（完全与 Page2 一致） --------
-
-    def _expand_packet_times(self, packet: EegDataPacket) -> List[float]:
-        """
-        根据当前 sample_rate_hz，将一个包里的采样点展开成逐点时间列表。
-        - 使用与 CSV / Page2 相同的“校正电脑时间轴”（系统时间）。
-        - 约定 packet.system_timestamp 为“本包最后一个采样点”的时间。
-        返回长度 == len(packet.data)。若采样率无效或数据为空则返回 []。
-        """
-        if self.sample_rate_hz is None or self.sample_rate_hz <= 0:
-            return []
-
-        samples = packet.data
-        n = len(samples)
-        if n == 0:
-            return []
-
-        dt_s = 1.0 / self.sample_rate_hz
-
-        # 基准时间：本包“最后一个采样点”的电脑时间
-        base_ts = packet.system_timestamp if packet.system_timestamp > 0 else packet.hardware_timestamp
-
-        if dt_s > 0:
-            # 第一个采样点时间 = 最后一个点时间 - (n-1)*dt
-            t_first = base_ts - (n - 1) * dt_s
-        else:
-            t_first = base_ts
+    # -------- 共享接收器的释放 --------
 
-        return [t_first + j * dt_s for j in range(n)]
-
-    # -------- 根据数据帧解析传感器序列号 --------
-
-    def _parse_sensor_serial(self, frame_data: bytes) -> str:
-        """
-        根据数据帧解析传感器序列号：
-        示例：使用第 2~4 字节作为 3 字节无符号整数，格式化为 6 位十进制。
-        """
+    def _release_receiver(self):
+        if self.receiver is None:
+            return
+        receiver = self.receiver
+        self.receiver = None
+        receiver.unsubscribe(self._enqueue_for_inference)
+        # 先释放再断开：若这是最后一个引用，stop() 会同步送出重排缓冲中的尾包
+        release_receiver(receiver)
         try:
-            if len(frame_data) < 5:
-                return "000000"
+            receiver.batch_received.disconnect(self.on_eeg_batch)
+            receiver.error_occurred.disconnect(self.on_error)
+        except TypeError:
+            pass
+        self.render_scheduler.stop()
+        # 停止时送达的尾包补画一帧
+        self._render_frame()
 
-            raw = (frame_data[2] << 16) | (frame_data[3] << 8) | frame_data[4]
-            serial_int = raw & 0xFFFFFF
-            serial_str = f"{serial_int:06d}"
-            return serial_str
-        except Exception as e:
-            print("解析传感器序列号失败:", e)
-            return "000000"
+    def _enqueue_for_inference(self, batch: EegBatch):
+        """接收线程回调：把批次扔给 3 秒缓冲池（推理线程消费）。"""
+        if self.inference_stop_event is None:
+            return
+        try:
+            self.shared_queue.put_nowait(batch)
+        except Exception:
+            pass
 
     # -------- 通道数变化：更新 checkbox --------
 
@@ -1078,21 +629,15 @@ class Page10Widget(QtWidgets.QWidget):
             self.window_points = max(points_for_5s, 1000)
             self.max_points = max(self.window_points * 2, 1000)
 
-            if self.window_points > 1:
-                self.sweep_x = [
-                    self.window_sec * i / (self.window_points - 1)
-                    for i in range(self.window_points)
-                ]
-            else:
-                self.sweep_x = [0.0]
-
             # 清空旧数据
             self.channel_data_x.clear()
             self.channel_data_y.clear()
+            self.channel_decimators.clear()
+            self.channel_sweeps.clear()
             self.channel_sample_index.clear()
             self.channel_curves.clear()
             self.active_channels_in_plot.clear()
-            self.last_plot_time = 0.0
+            self._plot_dirty = False
 
             # 重置传感器序列号解析标记
             self.sensor_serial = "000003"
@@ -1124,22 +669,12 @@ class Page10Widget(QtWidgets.QWidget):
             self.combo_channel_count.setDisabled(True)
             self.combo_scroll_mode.setDisabled(True)
 
-            # 如果之前有 receiver，先停掉
-            if self.receiver is not None:
-                self.receiver.stop()
-                self.receiver.deleteLater()
-                self.receiver = None
-
-            # 创建新的 UdpEegReceiver
-            self.receiver = UdpEegReceiver(host=ip, port=port, buffer_size=8192, parent=self)
+            # 如果之前有 receiver，先释放
+            self._release_receiver()
 
-            # 连接信号
-            self.receiver.data_received.connect(self.on_eeg_packet)
-            self.receiver.error_occurred.connect(self.on_error)
-
-            # 启动
+            # 获取共享的 UdpEegReceiver（同一端口与 Page2 共用一个 socket / 接收线程）
             try:
-                self.receiver.start()
+                self.receiver = acquire_receiver(host=ip, port=port, buffer_size=8192)
             except Exception as e:
                 self.label_1.setText(f"启动UDP接收器失败: {e}")
                 self.label_1.setStyleSheet("color: red")
@@ -1148,11 +683,14 @@ class Page10Widget(QtWidgets.QWidget):
                 self.input_fs.setDisabled(False)
                 self.combo_channel_count.setDisabled(False)
                 self.combo_scroll_mode.setDisabled(False)
-                if self.receiver is not None:
-                    self.receiver.deleteLater()
-                    self.receiver = None
                 return
 
+            # 连接信号：画图 / 保存在 GUI 线程；推理直接在接收线程入队
+            self.receiver.batch_received.connect(self.on_eeg_batch)
+            self.receiver.error_occurred.connect(self.on_error)
+            self.render_scheduler.start()
+            self.receiver.subscribe(self._enqueue_for_inference)
+
             self.button_1.setText(ButtonStates.stop.value)
             self.label_1.setText(LabelStates.listening.value)
             self.label_1.setStyleSheet("color: #5d5d5d")
@@ -1165,10 +703,7 @@ class Page10Widget(QtWidgets.QWidget):
 
         # 停止
         elif self.button_1.text() == ButtonStates.stop.value:
-            if self.receiver is not None:
-                self.receiver.stop()
-                self.receiver.deleteLater()
-                self.receiver = None
+            self._release_receiver()
 
             self.stop_saving()
             self.button_save.setEnabled(False)
@@ -1336,18 +871,17 @@ class Page10Widget(QtWidgets.QWidget):
         while self.inference_stop_event is not None and (not self.inference_stop_event.is_set()):
             # 取数据填入 3 秒缓冲
             try:
-                packet = self.shared_queue.get(timeout=0.1)
-                packets = [packet]
+                batch = self.shared_queue.get(timeout=0.1)
+                batches = [batch]
                 while True:
                     try:
-                        packets.append(self.shared_queue.get_nowait())
+                        batches.append(self.shared_queue.get_nowait())
                     except queue.Empty:
                         break
 
-                for pkt in packets:
-                    ch = pkt.channel
-                    samples = np.asarray(pkt.data, dtype=np.float32)
-                    self.eeg_processor.update_channel_buffer(ch, samples)
+                for b in batches:
+                    for ch, chunk in b.channels.items():
+                        self.eeg_processor.update_channel_buffer(ch, chunk.data)
             except queue.Empty:
                 pass
 
@@ -1398,75 +932,53 @@ class Page10Widget(QtWidgets.QWidget):
 
     # -------- EEG 数据回调：画图 + 保存 + 推理队列（Page2 风格） --------
 
-    def on_eeg_packet(self, packet: EegDataPacket):
+    def on_eeg_batch(self, batch: EegBatch):
         """
-        收到 UdpEegReceiver 解析好的 EegDataPacket
-        - packet.hardware_timestamp：片上时间（秒）
-        - packet.system_timestamp：经过 ActualTimeRegulator 校正后的电脑时间（秒）
-        当前绘图和保存都以“校正后的电脑时间轴”为准（packet.system_timestamp 展开）。
-        画图逻辑完全按 Page2，另额外把 packet 丢给推理队列 shared_queue。
+        收到 UdpEegReceiver 按节拍打包的 EegBatch（每个通道一段连续数组）
+        - chunk.hardware_timestamps：每包片上时间（秒）
+        - chunk.system_timestamps：每包经过 ActualTimeRegulator 校正后的电脑时间（秒）
+        当前绘图和保存都以“校正后的电脑时间轴”为准，每个通道每批只做一次向量化追加。
+        画图逻辑完全按 Page2；推理队列 shared_queue 由接收线程的订阅者直接写入。
         """
         if self.sample_rate_hz is None or self.sample_rate_hz <= 0:
             return
 
-        ch = packet.channel
-
         # 第一次收到数据时，解析传感器序列号
-        if (not self._sensor_serial_parsed) and packet.raw_packet:
-            self.sensor_serial = self._parse_sensor_serial(packet.raw_packet)
+        if (not self._sensor_serial_parsed) and batch.serial is not None:
+            self.sensor_serial = f"{batch.serial:06d}"
             self._sensor_serial_parsed = True
             print(f"数据来自传感器序列号: {self.sensor_serial}")
 
-        # 保存数据
-        if self.is_saving:
-            self._save_packet_samples(packet)
+        for ch in sorted(batch.channels):
+            chunk = batch.channels[ch]
 
-        # 初始化通道数据结构和曲线
-        if ch not in self.channel_data_x:
-            self.channel_data_x[ch] = deque(maxlen=self.max_points)
-            self.channel_data_y[ch] = deque(maxlen=self.max_points)
-            self.channel_sample_index[ch] = 0
+            # ===== 逐采样时间在 acquisition 层展开并缓存在 chunk 上，与 Page2 共用同一份，绘图与保存共用 =====
+            times = chunk.sample_times(self.sample_rate_hz)
+            if times.size == 0:
+                continue
 
-            color = self.channel_colors[len(self.channel_curves) % len(self.channel_colors)]
-            curve = self.plot_widget.plot(pen=color, name=f"Ch {ch}")
-            self.channel_curves[ch] = curve
+            # 保存数据
+            if self.is_saving:
+                self._save_chunk_samples(ch, times, chunk.data)
 
-        self.active_channels_in_plot.add(ch)
+            # 初始化通道数据结构和曲线
+            if ch not in self.channel_data_x:
+                self.channel_data_x[ch] = MirroredRingBuffer(self.max_points, dtype=np.float64)
+                self.channel_data_y[ch] = MirroredRingBuffer(self.max_points, dtype=np.float32)
+                self.channel_decimators[ch] = MinMaxDecimator(self.max_points)
+                self.channel_sample_index[ch] = 0
 
-        # ===== 使用工具函数展开时间轴（与 Page2 一致） =====
-        times = self._expand_packet_times(packet)
-        if not times:
-            return
+                color = self.channel_colors[len(self.channel_curves) % len(self.channel_colors)]
+                curve = self.plot_widget.plot(pen=color, name=f"Ch {ch}")
+                self.channel_curves[ch] = curve
 
-        for t_s, v in zip(times, packet.data):
-            self.channel_sample_index[ch] += 1
-            self.channel_data_x[ch].append(t_s)
-            self.channel_data_y[ch].append(v)
-
-        # ------- 推理队列：把原始包扔给 3 秒缓冲池 -------
-        try:
-            self.shared_queue.put_nowait(packet)
-        except Exception:
-            pass
+            self.active_channels_in_plot.add(ch)
 
-        now = time.time()
-        if now - self.last_plot_time >= self.plot_interval:
-            # 当前显示通道列表
-            channels_sorted = sorted(self.active_channels_in_plot)
-            visible_channels = []
-            for c in channels_sorted:
-                cb = self.channel_checkboxes.get(c)
-                if cb is None or cb.isChecked():
-                    visible_channels.append(c)
-
-            # 只在重绘时更新状态文字 + 颜色
-            self.label_1.setText(
-                f"{LabelStates.receiving.value} 当前显示通道: {visible_channels}"
-            )
-            self.label_1.setStyleSheet("color: #008000")
+            self.channel_sample_index[ch] += times.size
+            self.channel_data_x[ch].append(times)
+            self.channel_data_y[ch].append(chunk.data)
 
-            self.update_plot()
-            self.last_plot_time = now
+        self._plot_dirty = True
 
     # -------- 保存按钮逻辑 --------
 
@@ -1478,7 +990,7 @@ class Page10Widget(QtWidgets.QWidget):
 
     def start_saving(self, save_dir: Optional[str] = None):
         """
-        开始保存数据：创建 CSV 文件和 markers.csv
+        开始保存数据：创建会话数据文件 session.eegrec 和稀疏事件文件 events.csv
         - save_dir 为 None 时：使用 self.data_dir（默认 "data"）
         """
         if self.is_saving:
@@ -1500,18 +1012,21 @@ class Page10Widget(QtWidgets.QWidget):
             self.data_dir = self.default_data_dir
         os.makedirs(self.data_dir, exist_ok=True)
 
-        self.is_saving = True
-        self.channel_save_files.clear()
-        self.channel_save_index.clear()
-
-        # 创建 markers.csv
         try:
-            marker_path = os.path.join(self.data_dir, "markers.csv")
-            self.marker_file = open(marker_path, "w", encoding="utf-8", newline="")
-            self.marker_file.write("Time,marker_index\n")
+            self.recording_writer = RecordingWriter(
+                session_path(self.data_dir),
+                sample_rate=self.sample_rate_hz,
+                serial=getattr(self, "sensor_serial", "xxxxxx"),
+                events_path=os.path.join(self.data_dir, EVENTS_FILENAME),
+            )
         except Exception as e:
-            print("创建 markers.csv 失败:", e)
-            self.marker_file = None
+            print("创建会话数据文件失败:", e)
+            self.label_1.setText(f"创建会话数据文件失败: {e}")
+            self.label_1.setStyleSheet("color: red")
+            return
+
+        self.is_saving = True
+        self.last_recording_metrics = None
 
         self.button_save.setText("暂停保存数据，并落盘")
 
@@ -1519,64 +1034,36 @@ class Page10Widget(QtWidgets.QWidget):
         if not self.is_saving:
             return
 
-        for f in self.channel_save_files.values():
+        if self.recording_writer is not None:
+            # close() 会等待队列中的数据全部写完并 fsync，之后上层可以立即读取文件
             try:
-                f.close()
-            except Exception:
-                pass
-        self.channel_save_files.clear()
-        self.channel_save_index.clear()
+                self.recording_writer.close()
+                self.last_recording_metrics = self.recording_writer.metrics()
+                print("录制统计:", self.last_recording_metrics)
+            except Exception as e:
+                print("关闭会话数据文件失败:", e)
+                self.label_1.setText(f"关闭会话数据文件失败: {e}")
+                self.label_1.setStyleSheet("color: red")
+            self.recording_writer = None
 
-        if self.marker_file is not None:
-            try:
-                self.marker_file.close()
-            except Exception:
-                pass
-            self.marker_file = None
+            m = self.last_recording_metrics
+            if m is not None and m["write_errors"]:
+                message = f"本次保存有 {m['write_errors']} 次写入失败，数据可能不完整: {m['last_error']}"
+                print(message)
+                self.label_1.setText(message)
+                self.label_1.setStyleSheet("color: red")
 
         self.is_saving = False
         self.button_save.setText("开始保存数据")
 
-    def _save_packet_samples(self, packet: EegDataPacket):
+    def _save_chunk_samples(self, ch: int, times: np.ndarray, samples: np.ndarray):
         """
-        将一个 EegDataPacket 中的每个采样点写入对应通道的 CSV，
-        时间轴按“校正后的电脑时间（system_timestamp）+ 采样率”展开。
-        使用与绘图相同的 _expand_packet_times，保证 CSV 时间轴与绘图一致。
+        将一个通道批次交给录制线程写入会话二进制文件（float32 采样 + 时间锚点），
+        times 由 on_eeg_batch 通过 chunk.sample_times 展开，转换出的 CSV 时间轴与绘图一致。
         """
-        ch = packet.channel
-
-        if ch not in self.channel_save_files:
-            serial_str = getattr(self, "sensor_serial", "xxxxxx")
-            filename = os.path.join(self.data_dir, f"EEG_{serial_str}_{ch:02d}.csv")
-            try:
-                f = open(filename, "w", encoding="utf-8", newline="")
-                f.write("Time,Response\n")
-                self.channel_save_files[ch] = f
-                self.channel_save_index[ch] = 0
-            except Exception as e:
-                print(f"打开通道 {ch} 的 CSV 文件失败:", e)
-                return
-
-        f = self.channel_save_files[ch]
-
-        # 使用同一套时间展开逻辑，保证 CSV 时间轴与绘图一致
-        times = self._expand_packet_times(packet)
-        if not times:
+        if self.recording_writer is None:
             return
-
-        samples = packet.data
-        idx = self.channel_save_index.get(ch, 0)
-
-        for t_s, v in zip(times, samples):
-            f.write(f"{t_s:.6f},{v:.6f}\n")
-
-            # 简单示例：在 ch==0 的每个点写一个 marker=0（你后面可以按需要修改逻辑）
-            if ch == 0 and self.marker_file is not None:
-                self.marker_file.write(f"{t_s:.6f},0\n")
-
-            idx += 1
-
-        self.channel_save_index[ch] = idx
+        self.recording_writer.submit_samples(ch, times, samples)
 
     # -------- 其他 UI 回调 --------
 
@@ -1600,14 +1087,89 @@ class Page10Widget(QtWidgets.QWidget):
     def reset_y_axis_range(self):
         self.plot_widget.setYRange(-200, 200)
 
-    # -------- 画图：两种走纸方式 + 可选 1/5 降采样（完全拷贝 Page2） --------
+    # -------- 画图：两种走纸方式 + 可选 min/max 包络抽取（按绘图区像素宽度增量更新，与 Page2 相同） --------
+
+    def _render_frame(self):
+        if self._plot_dirty:
+            self._plot_dirty = False
+            self.update_plot()
+
+    def _on_render_tick(self):
+        """RenderScheduler 每帧回调：有新数据才重画，并定期在状态栏显示帧率与绘图耗时"""
+        self._render_frame()
+
+        if not self.active_channels_in_plot:
+            return
+        now = time.monotonic()
+        if now - self._last_status_time < 0.5:
+            return
+        self._last_status_time = now
+
+        # 状态文字限频更新，避免每帧重排 label
+        visible_channels = []
+        for c in sorted(self.active_channels_in_plot):
+            cb = self.channel_checkboxes.get(c)
+            if cb is None or cb.isChecked():
+                visible_channels.append(c)
+
+        scheduler = self.render_scheduler
+        status = (
+            f"{LabelStates.receiving.value} 当前显示通道: {visible_channels} | "
+            f"{scheduler.current_fps:.0f} FPS 绘图 {scheduler.mean_ms():.1f} ms (p99 {scheduler.p99_ms():.1f} ms)"
+        )
+        color = "#008000"
+        m = self.last_recording_metrics
+        if self.recording_writer is not None:
+            m = self.recording_writer.metrics()
+            status += f" | 录制队列 {m['queue_depth']} 写入 p99 {m['write_latency_p99_ms']:.1f} ms"
+            if m["dropped_chunks"]:
+                status += f" 丢弃 {m['dropped_chunks']}"
+        # 写线程中的写盘错误不会抛到 GUI 线程：保存中及停止保存后都在状态栏上用红字提示
+        if m is not None and m["write_errors"]:
+            status += f" | 写入失败 {m['write_errors']} 次: {m['last_error']}"
+            color = "red"
+        self.label_1.setText(status)
+        self.label_1.setStyleSheet(f"color: {color}")
+
+    def _plot_bucket_size(self) -> int:
+        """包络抽取每组的采样点数：窗口内采样点数 / 绘图区水平像素数，即每像素约 2 个点"""
+        width_px = int(self.plot_widget.getPlotItem().getViewBox().width())
+        if width_px <= 0 or not self.sample_rate_hz:
+            return 1
+        return max(int(self.sample_rate_hz * self.window_sec / width_px), 1)
+
+    def _plot_series(self, ch: int, bucket: int):
+        """返回通道 ch 用于绘图的 (x, y)：bucket > 1 时为增量更新的 min/max 包络，否则为原始历史"""
+        x_hist = self.channel_data_x[ch]
+        y_hist = self.channel_data_y[ch]
+        decimator = self.channel_decimators[ch]
+        # 每组点数变化（含关闭包络）时 configure 会清空抽取结果，下次 update 从原始历史整体重算
+        decimator.configure(bucket)
+        if bucket <= 1:
+            return x_hist.view(), y_hist.view()
+
+        decimator.update(x_hist, y_hist, self.channel_sample_index[ch])
+        return decimator.x_view(), decimator.y_view()
+
+    def _sweep_series(self, ch: int, bucket: int) -> SweepFramebuffer:
+        """返回通道 ch 已增量更新到最新的扫屏帧缓冲；列数随包络每组点数变化，变化时用原始历史重建"""
+        window_samples = max(int(round((self.sample_rate_hz or 1.0) * self.window_sec)), 1)
+        n_columns = max(-(-window_samples // bucket), 1)
+
+        sweep = self.channel_sweeps.get(ch)
+        if sweep is None or sweep.n_columns != n_columns or sweep.window_sec != self.window_sec:
+            sweep = SweepFramebuffer(self.window_sec, n_columns, gap_columns=n_columns // 50)
+            self.channel_sweeps[ch] = sweep
+
+        sweep.update(self.channel_data_x[ch], self.channel_data_y[ch], self.channel_sample_index[ch])
+        return sweep
 
     def update_plot(self):
         if not self.channel_curves:
             return
 
         # 1. 统一获取需要的数据，避免多次查询
-        # 将 deque 转换为 numpy array 是加速的第一步
+        # 历史数据保存在 MirroredRingBuffer 中，view() 为零拷贝连续数组
         data_map = {}
         t_max = 0.0
 
@@ -1619,7 +1181,7 @@ class Page10Widget(QtWidgets.QWidget):
                 # 检查数据是否为空
                 if self.channel_data_x[ch]:
                     visible_channels.append((ch, curve))
-                    t_max = max(t_max, self.channel_data_x[ch][-1])
+                    t_max = max(t_max, self.channel_data_x[ch].last())
             else:
                 curve.setVisible(False)
 
@@ -1627,8 +1189,8 @@ class Page10Widget(QtWidgets.QWidget):
             return
 
         window = self.window_sec
-        downsample = self.checkbox_downsample_plot.isChecked()
-        step = self.plot_downsample_step if downsample else 1
+        use_envelope = self.checkbox_downsample_plot.isChecked()
+        bucket = self._plot_bucket_size() if use_envelope else 1
 
         # ================= Mode 1: 滚动窗口 (Scrolling) =================
         if self.scroll_mode == 1:
@@ -1644,14 +1206,8 @@ class Page10Widget(QtWidgets.QWidget):
             for ch, curve in visible_channels:
                 curve.setVisible(True)
 
-                # 转为 numpy 数组
-                x_arr = np.array(self.channel_data_x[ch])
-                y_arr = np.array(self.channel_data_y[ch])
-
-                # 降采样 (切片操作在 numpy 中是瞬时的)
-                if step > 1:
-                    x_arr = x_arr[::step]
-                    y_arr = y_arr[::step]
+                # 取绘图数据（min/max 包络或原始历史，均为零拷贝视图）
+                x_arr, y_arr = self._plot_series(ch, bucket)
 
                 # 直接设置数据，pyqtgraph 处理 numpy 极快
                 curve.setData(x_arr, y_arr)
@@ -1666,47 +1222,11 @@ class Page10Widget(QtWidgets.QWidget):
             # 固定 X 轴
             self.plot_widget.setXRange(0, window, padding=0)
 
-            # 计算有效时间起点
-            start_valid_time = t_max - window
-
             for ch, curve in visible_channels:
                 curve.setVisible(True)
-
-                x_arr = np.array(self.channel_data_x[ch])
-                y_arr = np.array(self.channel_data_y[ch])
-
-                # 1. 过滤：只取最近 window 秒的数据
-                mask = x_arr > start_valid_time
-                x_roi = x_arr[mask]
-                y_roi = y_arr[mask]
-
-                if len(x_roi) == 0:
-                    curve.setData([], [])
-                    continue
-
-                # 2. 降采样
-                if step > 1:
-                    x_roi = x_roi[::step]
-                    y_roi = y_roi[::step]
-
-                # 3. 向量化计算取模 (扫屏的核心优化)
-                x_mod = x_roi % window
-
-                # 4. 处理回绕 (Wrap-around) 断点
-                diffs = np.diff(x_mod)
-                wrap_indices = np.where(diffs < 0)[0]
-
-                if len(wrap_indices) > 0:
-                    # 回绕处插入 NaN 来断开连线
-                    insert_idx = wrap_indices + 1
-                    x_draw = np.insert(x_mod, insert_idx, np.nan)
-                    y_draw = np.insert(y_roi, insert_idx, np.nan)
-                else:
-                    x_draw = x_mod
-                    y_draw = y_roi
-
-                # connect="finite" 配合 numpy 的 NaN 使用
-                curve.setData(x_draw, y_draw, connect="finite")
+                # 帧缓冲只写入新到的采样，NaN 间隙配合 connect="finite" 断开新旧两段
+                sweep = self._sweep_series(ch, bucket)
+                curve.setData(sweep.x_view(), sweep.y_view(), connect="finite")
 
     # -------- 轮询推理结果，更新 UI --------
 
@@ -1745,10 +1265,7 @@ class Page10Widget(QtWidgets.QWidget):
     # -------- 生命周期清理 --------
 
     def closeEvent(self, event):
-        if self.receiver is not None:
-            self.receiver.stop()
-            self.receiver.deleteLater()
-            self.receiver = None
+        self._release_receiver()
 
         if self.is_saving:
             self.stop_saving()
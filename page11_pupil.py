@@ -809,6 +809,7 @@ import math
 from datetime import datetime
 import sys
 import json
+import time
 
 from PyQt6 import QtCore, QtWidgets
 from PyQt6.QtWidgets import (
@@ -825,6 +826,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QShortcut, QKeySequence
 
+from recording import read_trigger_events, trigger_placement_stats
+
 
 class Page11Widget(QWidget):
     """
@@ -835,21 +838,21 @@ class Page11Widget(QWidget):
     - Page11 只在“刺激开始 / 结束”两个阶段向 Page2 发送 trigger：
         1 -> stim_start
         2 -> stim_end
-      其他时间段 trigger 默认为 0（baseline），由 Page2 在写 triggers.csv 时自动填充。
+      其他时间段没有事件，即 baseline。
 
-    - Page2 收到 trigger 后，会在下一采样点把该值写入 triggers.csv，
-      其余采样点写 0。文件名为：
-        <run_dir>/triggers.csv
+    - Page2 收到 trigger 后，把它落到时间最接近的采样点上，在稀疏事件文件中记录一行
+      （只有事件，没有逐采样的 0 背景）。文件名为：
+        <run_dir>/events.csv
       内容：
-        Time,trigger
-        12.345678,0
-        12.346678,1
+        sample_index,Time,trigger
+        1345,12.346678,1
         ...
+      需要旧格式的逐采样 triggers.csv 时用 recording.write_dense_triggers 按需生成。
 
     - 本页面 **不再调用 get_last_eeg_time**。
       实验结束或 ESC 中断时：
-        1) 先 stop_saving() 关闭 CSV 与 triggers.csv；
-        2) 再从 triggers.csv 读取所有 (Time, trigger)；
+        1) 先 stop_saving() 关闭会话数据文件与 events.csv；
+        2) 再从 events.csv 读取所有 (Time, trigger)；
         3) 用 trigger 序列解析出一组 trial：
            每次遇到 1(stim_start)，记录开始时间；
            下一次遇到 2(stim_end)，记录结束时间；
@@ -1176,7 +1179,7 @@ class Page11Widget(QWidget):
         self.run_dir = os.path.join(self.user_dir, self.run_timestamp)
         os.makedirs(self.run_dir, exist_ok=True)
 
-        # ====== 启动 EEG CSV & triggers 记录 ======
+        # ====== 启动 EEG 会话数据 & 事件记录 ======
         self.eeg_exp_start = None
         self.eeg_exp_end = None
         try:
@@ -1227,7 +1230,7 @@ class Page11Widget(QWidget):
             self._start_final_countdown()
             return
 
-        # 记录本 trial 的参数（时间点之后再从 triggers.csv 解析）
+        # 记录本 trial 的参数（时间点之后再从 events.csv 解析）
         log = {
             "trial_index": self.trial_index + 1,
             "params": {
@@ -1248,7 +1251,7 @@ class Page11Widget(QWidget):
         self.message_label.setText("请注视圆点")
         self._update_message_label_position()
 
-        # 不发送 trigger，baseline 由 triggers.csv 中的 0 表示
+        # 不发送 trigger，baseline 即两个事件之间没有事件的时段
         QtCore.QTimer.singleShot(
             int(self.baseline_duration * 1000),
             self._start_stimulus,
@@ -1370,10 +1373,10 @@ class Page11Widget(QWidget):
         self._reset_ui()
         self._exit_fullscreen()
 
-    # ==================== 解析 triggers.csv 得到 trials ====================
+    # ==================== 解析 events.csv 得到 trials ====================
     def _parse_trials_from_triggers(self) -> list[dict]:
         """
-        从 <run_dir>/triggers.csv 中解析出 trial 列表。
+        从 <run_dir>/events.csv（旧数据回退到 triggers.csv）中解析出 trial 列表。
         规则：
           - 只关心 trigger = 1(stim_start), 2(stim_end)；
           - 按时间排序；
@@ -1385,34 +1388,11 @@ class Page11Widget(QWidget):
         trials: list[dict] = []
 
         base_dir = self.run_dir or self.user_dir or self.pupil_root
-        triggers_path = os.path.join(base_dir, "triggers.csv")
-        if not os.path.exists(triggers_path):
-            return trials
-
-        events: list[tuple[float, int]] = []
         try:
-            with open(triggers_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            events = read_trigger_events(base_dir, codes=(self.TRIG_STIM_START, self.TRIG_STIM_END))
         except Exception:
             return trials
 
-        for line in lines[1:]:
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split(",")
-            if len(parts) < 2:
-                continue
-            try:
-                t = float(parts[0])
-                code = int(float(parts[1]))
-            except Exception:
-                continue
-            if code in (self.TRIG_STIM_START, self.TRIG_STIM_END):
-                events.append((t, code))
-
-        events.sort(key=lambda x: x[0])
-
         current_start: float | None = None
         for t, code in events:
             if code == self.TRIG_STIM_START:
@@ -1431,7 +1411,7 @@ class Page11Widget(QWidget):
     # ==================== 报告写入 ====================
     def _write_report(self, aborted: bool = False):
         """
-        根据 triggers.csv 解析的 trials 写出：
+        根据 events.csv 解析的 trials 写出：
           1) txt 报告：每个 trial 一行，label 固定 'pupil'；
           2) meta.json：记录 subject / timing / trigger_code_labels / trials。
         """
@@ -1443,7 +1423,7 @@ class Page11Widget(QWidget):
 
         ts_for_name = self.run_timestamp or datetime.now().strftime("%Y%m%d%H%M%S")
 
-        # ---- 1. 从 triggers.csv 解析 trials ----
+        # ---- 1. 从 events.csv 解析 trials ----
         trials = self._parse_trials_from_triggers()
         n_trials = len(trials)
 
@@ -1513,6 +1493,7 @@ class Page11Widget(QWidget):
             "timing": timing,
             "trigger_code_labels": trigger_code_labels,
             "trials": meta_trials,
+            "trigger_placement": trigger_placement_stats(getattr(self, "eeg_page", None)),
         }
 
         meta_path = os.path.join(
@@ -1530,8 +1511,9 @@ class Page11Widget(QWidget):
     def _send_trigger(self, code: int):
         """
         由本页面内部调用，将 trigger 发送给 Page2。
-        Page2 会在下一个采样点把该码写入 triggers.csv。
+        发送时刻按 time.monotonic() 打点，Page2 把该码写到时间最接近的采样点（events.csv）。
         """
+        host_time = time.monotonic()
         eeg_page = getattr(self, "eeg_page", None)
         if eeg_page is None:
             return
@@ -1539,7 +1521,7 @@ class Page11Widget(QWidget):
         if setter is None:
             return
         try:
-            setter(int(code))
+            setter(int(code), host_time=host_time)
         except Exception:
             pass
 
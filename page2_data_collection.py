@@ -2,24 +2,30 @@ import os
 import re
 import enum
 import time
-import struct
-import socket
-import random
 import logging
-import threading
 from collections import deque
-from typing import List
-from dataclasses import dataclass
 
 import numpy as np
 import pyqtgraph as pg
 from PyQt6 import QtWidgets
-from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtCore import Qt
+
+from acquisition import (
+    BACKENDS,
+    BACKEND_DEFAULT_HOST,
+    BACKEND_DEFAULT_PORT,
+    AcquisitionBackend,
+    EegBatch,
+    acquire_backend,
+    release_backend,
+)
+from recording import EVENTS_FILENAME, RecordingWriter, session_path
+from plotting import MinMaxDecimator, MirroredRingBuffer, RenderScheduler, SweepFramebuffer
 
 
 class LabelStates(enum.Enum):
     stopped = "未监听（请填写端口号后点击开始）"
-    listening = "已开启UDP监听，但还没有收到数据"
+    listening = "已开始接收，但还没有收到数据"
     receiving = "正在接收EEG数据..."
 
 
@@ -51,344 +57,9 @@ def is_valid_sample_rate(fs: str) -> bool:
         return False
 
 
-@dataclass
-class EegDataPacket:
-    hardware_timestamp: float
-    system_timestamp: float
-    data: List[float]
-    packet_id: int = 0
-    channel: int = 0
-    raw_packet: bytes | None = None
-
-
-@dataclass
-class TimeRegulatingResult:
-    valid: bool
-    pack_skipped: bool
-    regulated_time: float
-
-
-class ActualTimeRegulator:
-    def __init__(self, rollback_tolerance_sec: float = 0.01):
-        self._first_pack_time: float = 0.0
-        self._prev_pack_time: float = 0.0
-        self._first_pack_computer_time: float = 0.0
-        self._first_pack: bool = True
-        self._rollback_tolerance = rollback_tolerance_sec
-
-    def reset(self):
-        self._first_pack = True
-        self._prev_pack_time = 0.0
-        self._first_pack_time = 0.0
-        self._first_pack_computer_time = 0.0
-
-    def get_time(self, pack_time: float, received_at: float) -> TimeRegulatingResult:
-        if (not self._first_pack) and (pack_time + self._rollback_tolerance < self._prev_pack_time):
-            self.reset()
-            return TimeRegulatingResult(False, True, received_at)
-
-        if self._first_pack:
-            self._first_pack_time = pack_time
-            self._first_pack_computer_time = received_at
-            self._first_pack = False
-            self._prev_pack_time = pack_time
-            return TimeRegulatingResult(False, False, received_at)
-
-        regulated = (pack_time - self._first_pack_time) + self._first_pack_computer_time
-        self._prev_pack_time = pack_time
-        return TimeRegulatingResult(True, False, regulated)
-
-
-class UdpEegReceiver(QObject):
-    data_received = pyqtSignal(object)
-    error_occurred = pyqtSignal(str)
-
-    PACK_INFO_LENGTH = 17
-
-    def __init__(self, host: str = "0.0.0.0", port: int = 30300, buffer_size: int = 8192, parent: QObject | None = None):
-        super().__init__(parent)
-        self.host = host
-        self.port = port
-        self.buffer_size = buffer_size
-        self.socket: socket.socket | None = None
-        self.running = False
-        self.packet_count = 0
-        self.active_channels = set()
-        self.logger = logging.getLogger("UdpEegReceiver")
-
-        self._recv_count = 0
-        self._last_stat_time = time.time()
-        self.receiver_thread: threading.Thread | None = None
-
-        self._last_hw_timestamp: float | None = None
-        self._last_regulated_ts: float | None = None
-
-        self._time_regulators: dict[int, ActualTimeRegulator] = {}
-        self._sorted_packets: dict[int, list[tuple[float, EegDataPacket]]] = {}
-        self._buffer_size_per_channel: int = 5
-
-        self._start_monotonic: float | None = None
-
-        self.enable_loss_simulation = False
-        self.loss_rate = 0.6
-        self.enable_jitter_simulation = False
-        self.jitter_max_delay = 0.05
-
-    def get_last_hw_timestamp(self) -> float | None:
-        return self._last_hw_timestamp
-
-    def get_last_regulated_timestamp(self) -> float | None:
-        return self._last_regulated_ts
-
-    def is_running(self) -> bool:
-        return self.running
-
-    def start(self):
-        if self.running:
-            self.logger.warning("接收器已经在运行中")
-            return
-
-        try:
-            self.running = True
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-            try:
-                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
-                actual_buffer = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-                self.logger.info(f"Socket接收缓冲区大小: {actual_buffer} 字节")
-            except Exception as e:
-                self.logger.warning(f"设置socket缓冲区失败: {e}")
-
-            self.socket.bind((self.host, self.port))
-            self.socket.settimeout(0.1)
-
-            self._recv_count = 0
-            self._last_stat_time = time.time()
-            self._last_hw_timestamp = None
-            self._last_regulated_ts = None
-
-            self._time_regulators.clear()
-            self._sorted_packets.clear()
-
-            self._start_monotonic = time.monotonic()
-
-            self.receiver_thread = threading.Thread(
-                target=self._receive_loop,
-                daemon=True,
-                name="UDP-Receiver-Thread",
-            )
-            self.receiver_thread.start()
-
-            self.logger.info(f"UDP接收器已启动，监听 {self.host}:{self.port}")
-
-        except Exception as e:
-            self.running = False
-            self.logger.error(f"启动UDP接收器失败: {e}")
-            self.error_occurred.emit(f"启动UDP接收器失败: {e}")
-            raise
-
-    def stop(self):
-        if not self.running:
-            return
-
-        self.running = False
-        if self.socket:
-            self.socket.close()
-            self.socket = None
-
-        if self.receiver_thread and self.receiver_thread.is_alive():
-            self.receiver_thread.join(timeout=2.0)
-
-        self.logger.info("UDP接收器已停止")
-
-    def _receive_loop(self):
-        while self.running:
-            try:
-                data, addr = self.socket.recvfrom(self.buffer_size)
-
-                if self.enable_jitter_simulation and self.jitter_max_delay > 0:
-                    time.sleep(random.uniform(0, self.jitter_max_delay))
-
-                if self.enable_loss_simulation and random.random() < self.loss_rate:
-                    self.logger.warning("【模拟丢包】随机丢弃 1 个 UDP datagram")
-                    continue
-
-                system_ts_wall = time.time()
-                if self._start_monotonic is not None:
-                    recv_elapsed = time.monotonic() - self._start_monotonic
-                else:
-                    recv_elapsed = 0.0
-
-                self._recv_count += 1
-                if self._recv_count % 100 == 0:
-                    elapsed = system_ts_wall - self._last_stat_time
-                    rate = 100 / elapsed if elapsed > 0 else 0
-                    self.logger.info(f"UDP接收速率: {rate:.1f} packet/s (已接收{self._recv_count}个)")
-                    self._last_stat_time = system_ts_wall
-
-                packets = self._parse_eeg_packet(data)
-                if not packets:
-                    continue
-
-                for packet in packets:
-                    ch = packet.channel
-                    if self._last_hw_timestamp is None or packet.hardware_timestamp > self._last_hw_timestamp:
-                        self._last_hw_timestamp = packet.hardware_timestamp
-
-                    regulator = self._time_regulators.get(ch)
-                    if regulator is None:
-                        regulator = ActualTimeRegulator()
-                        self._time_regulators[ch] = regulator
-
-                    channel_buf = self._sorted_packets.get(ch)
-                    if channel_buf is None:
-                        channel_buf = []
-                        self._sorted_packets[ch] = channel_buf
-
-                    reg_result = regulator.get_time(
-                        pack_time=packet.hardware_timestamp,
-                        received_at=recv_elapsed,
-                    )
-
-                    if reg_result.pack_skipped:
-                        self.logger.warning(
-                            f"通道 {ch} 监测到片上时间倒退超过阈值，本包被跳过并重置时间调节器"
-                        )
-                        channel_buf.clear()
-                        continue
-
-                    if not reg_result.valid:
-                        continue
-
-                    packet.system_timestamp = reg_result.regulated_time
-
-                    channel_buf.append((packet.hardware_timestamp, packet))
-                    channel_buf.sort(key=lambda x: x[0])
-
-                    if len(channel_buf) >= self._buffer_size_per_channel:
-                        _, out_packet = channel_buf.pop(0)
-                        self._emit_packet(out_packet)
-
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    self.logger.error(f"接收数据时出错: {e}")
-                    self.error_occurred.emit(f"接收数据时出错: {e}")
-
-    def _emit_packet(self, packet: EegDataPacket):
-        self.packet_count += 1
-        self.active_channels.add(packet.channel)
-
-        if packet.system_timestamp > 0:
-            self._last_regulated_ts = packet.system_timestamp
-
-        self.data_received.emit(packet)
-
-    def _parse_eeg_packet(self, data: bytes):
-        packets: List[EegDataPacket] = []
-        buf = data
-        n = len(buf)
-        i = 0
-
-        while i + self.PACK_INFO_LENGTH <= n:
-            if i + 8 > n:
-                break
-
-            sensor_type = buf[i]
-            sensor_type_dup = buf[i + 1]
-
-            if sensor_type != sensor_type_dup:
-                i += 1
-                continue
-
-            data_len = (buf[i + 6] << 8) | buf[i + 7]
-            if data_len <= 0:
-                i += 1
-                continue
-
-            total_len = data_len + self.PACK_INFO_LENGTH
-            pack_end = i + total_len - 1
-            if pack_end >= n:
-                break
-
-            frame_data = buf[i: pack_end + 1]
-            packet = self._parse_single_channel_frame(frame_data)
-            if packet is not None:
-                packets.append(packet)
-
-            i = pack_end + 1
-
-        return packets
-
-    def _parse_single_channel_frame(self, frame_data: bytes) -> EegDataPacket | None:
-        try:
-            if len(frame_data) < self.PACK_INFO_LENGTH:
-                return None
-
-            sensor_type = frame_data[0]
-            sensor_type_dup = frame_data[1]
-            if sensor_type != sensor_type_dup:
-                return None
-
-            serial_raw = (frame_data[2] << 16) | (frame_data[3] << 8) | frame_data[4]
-
-            channel = frame_data[5]
-            if channel == 0xFF:
-                return None
-
-            data_length = (frame_data[6] << 8) | frame_data[7]
-            expected_len = data_length + self.PACK_INFO_LENGTH
-            if len(frame_data) != expected_len:
-                return None
-
-            timestamp_offset = 8 + data_length
-            if timestamp_offset + 8 > len(frame_data):
-                return None
-
-            hardware_ts_raw = struct.unpack(">Q", frame_data[timestamp_offset: timestamp_offset + 8])[0]
-            hardware_ts = hardware_ts_raw / 1_000_000.0
-
-            data_bytes = frame_data[8: 8 + data_length]
-            data_point_count = data_length // 3
-            samples: List[float] = []
-
-            for j in range(data_point_count):
-                base = j * 3
-                if base + 2 >= len(data_bytes):
-                    break
-                b1 = data_bytes[base]
-                b2 = data_bytes[base + 1]
-                b3 = data_bytes[base + 2]
-
-                if (b1 & 0x80) != 0:
-                    raw_value = (b1 << 16) | (b2 << 8) | b3 | (0xFF << 24)
-                else:
-                    raw_value = (b1 << 16) | (b2 << 8) | b3
-
-                if raw_value >= 0x80000000:
-                    raw_value -= 0x100000000
-
-                microvolts = raw_value / 1000.0
-                samples.append(microvolts)
-
-            if not samples:
-                return None
-
-            return EegDataPacket(
-                hardware_timestamp=hardware_ts,
-                system_timestamp=0.0,
-                data=samples,
-                channel=channel,
-                raw_packet=frame_data,
-            )
-
-        except Exception as e:
-            self.logger.error(f"解析单通道数据帧失败: {e}")
-            return None
-
-
 class Page2Widget(QtWidgets.QWidget):
+    MAX_PLOT_CHANNELS = 16
+
     def __init__(self, parent=None):
         super(Page2Widget, self).__init__(parent)
 
@@ -399,14 +70,41 @@ class Page2Widget(QtWidgets.QWidget):
         self.sensor_serial: str = "000003"
         self._sensor_serial_parsed: bool = False
 
-        self.last_plot_time = 0.0
-        self.plot_interval = 1.0 / 30.0
+        self._plot_dirty = False
+        self._last_status_time = 0.0
+        self.render_scheduler = RenderScheduler(self._on_render_tick, target_fps=30.0, parent=self)
 
         self.main_layout = QtWidgets.QVBoxLayout(self)
         self.main_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.setSpacing(4)
 
+        self.label_backend = QtWidgets.QLabel("数据源：")
+
+        self.combo_backend = QtWidgets.QComboBox()
+        self.combo_backend.setFixedWidth(170)
+        for kind, name in BACKENDS.items():
+            self.combo_backend.addItem(name, kind)
+
+        backend_layout = QtWidgets.QHBoxLayout()
+        backend_layout.setContentsMargins(0, 0, 0, 0)
+        backend_layout.setSpacing(4)
+        backend_layout.addWidget(self.label_backend)
+        backend_layout.addWidget(self.combo_backend)
+
+        # UDP 时为本机监听IP（固定 0.0.0.0，不显示），数据服务器时为记录软件所在电脑的IP
+        self.label_ip = QtWidgets.QLabel("服务器IP：")
+        self.input_ip = QtWidgets.QLineEdit()
+        self.input_ip.setFixedWidth(110)
+        self.input_ip.setPlaceholderText("例如 127.0.0.1")
+        self.input_ip.setText("0.0.0.0")
+
+        ip_layout = QtWidgets.QHBoxLayout()
+        ip_layout.setContentsMargins(0, 0, 0, 0)
+        ip_layout.setSpacing(4)
+        ip_layout.addWidget(self.label_ip)
+        ip_layout.addWidget(self.input_ip)
+
         self.label_port = QtWidgets.QLabel("端口：")
         self.label_port.setSizePolicy(
             QtWidgets.QSizePolicy.Policy.Fixed,
@@ -424,6 +122,19 @@ class Page2Widget(QtWidgets.QWidget):
         port_layout.addWidget(self.label_port)
         port_layout.addWidget(self.input_port)
 
+        # UDP 的采样率固定为 1000 Hz（不显示），数据服务器需按记录软件的设置填写
+        self.label_fs = QtWidgets.QLabel("采样率(Hz)：")
+        self.input_fs = QtWidgets.QLineEdit()
+        self.input_fs.setFixedWidth(70)
+        self.input_fs.setPlaceholderText("例如 1000")
+        self.input_fs.setText("1000")
+
+        fs_layout = QtWidgets.QHBoxLayout()
+        fs_layout.setContentsMargins(0, 0, 0, 0)
+        fs_layout.setSpacing(4)
+        fs_layout.addWidget(self.label_fs)
+        fs_layout.addWidget(self.input_fs)
+
         self.label_channel_count = QtWidgets.QLabel("通道数：")
 
         self.combo_channel_count = QtWidgets.QComboBox()
@@ -431,11 +142,19 @@ class Page2Widget(QtWidgets.QWidget):
         self.combo_channel_count.addItem("3", 3)
         self.combo_channel_count.addItem("4", 4)
 
+        # 数据服务器的通道数，与 DataServerThread 的 n_chan 相同（Neuracle / HEEG 含最后一个 trigger 通道）
+        self.spin_channel_count = QtWidgets.QSpinBox()
+        self.spin_channel_count.setFixedWidth(70)
+        self.spin_channel_count.setRange(2, 1024)
+        self.spin_channel_count.setValue(9)
+        self.spin_channel_count.setToolTip("与数据服务器的通道数相同，Neuracle / HEEG 含最后一个 trigger 通道")
+
         channel_count_layout = QtWidgets.QHBoxLayout()
         channel_count_layout.setContentsMargins(0, 0, 0, 0)
         channel_count_layout.setSpacing(4)
         channel_count_layout.addWidget(self.label_channel_count)
         channel_count_layout.addWidget(self.combo_channel_count)
+        channel_count_layout.addWidget(self.spin_channel_count)
 
         self.label_show_channels = QtWidgets.QLabel("显示通道：")
         self.label_show_channels.setSizePolicy(
@@ -455,8 +174,8 @@ class Page2Widget(QtWidgets.QWidget):
         show_channels_layout.addWidget(self.label_show_channels)
         show_channels_layout.addLayout(self.channel_checkbox_layout)
 
-        self.checkbox_downsample_plot = QtWidgets.QCheckBox("绘图降采样1/5")
-        self.checkbox_downsample_plot.setChecked(False)
+        self.checkbox_downsample_plot = QtWidgets.QCheckBox("绘图包络抽取(min/max)")
+        self.checkbox_downsample_plot.setChecked(True)
 
         downsample_layout = QtWidgets.QHBoxLayout()
         downsample_layout.setContentsMargins(0, 0, 0, 0)
@@ -476,12 +195,29 @@ class Page2Widget(QtWidgets.QWidget):
         scroll_mode_layout.addWidget(self.label_scroll_mode)
         scroll_mode_layout.addWidget(self.combo_scroll_mode)
 
+        self.label_target_fps = QtWidgets.QLabel("刷新率(FPS)：")
+        self.spin_target_fps = QtWidgets.QSpinBox()
+        self.spin_target_fps.setFixedWidth(70)
+        self.spin_target_fps.setRange(5, 60)
+        self.spin_target_fps.setValue(30)
+        self.spin_target_fps.valueChanged.connect(self.render_scheduler.set_target_fps)
+
+        fps_layout = QtWidgets.QHBoxLayout()
+        fps_layout.setContentsMargins(0, 0, 0, 0)
+        fps_layout.setSpacing(4)
+        fps_layout.addWidget(self.label_target_fps)
+        fps_layout.addWidget(self.spin_target_fps)
+
         self.top_controls_layout = QtWidgets.QHBoxLayout()
         self.top_controls_layout.setContentsMargins(20, 0, 20, 0)
         self.top_controls_layout.setSpacing(12)
 
         self.top_controls_layout.addStretch()
+        self.top_controls_layout.addLayout(backend_layout)
+        self.top_controls_layout.addSpacing(16)
+        self.top_controls_layout.addLayout(ip_layout)
         self.top_controls_layout.addLayout(port_layout)
+        self.top_controls_layout.addLayout(fs_layout)
         self.top_controls_layout.addSpacing(16)
         self.top_controls_layout.addLayout(channel_count_layout)
         self.top_controls_layout.addSpacing(16)
@@ -490,6 +226,8 @@ class Page2Widget(QtWidgets.QWidget):
         self.top_controls_layout.addLayout(downsample_layout)
         self.top_controls_layout.addSpacing(16)
         self.top_controls_layout.addLayout(scroll_mode_layout)
+        self.top_controls_layout.addSpacing(16)
+        self.top_controls_layout.addLayout(fps_layout)
         self.top_controls_layout.addStretch()
 
         self.button_reset_y = QtWidgets.QPushButton("重置y轴范围")
@@ -528,24 +266,21 @@ class Page2Widget(QtWidgets.QWidget):
 
         self.max_points = 1000
         self.sample_rate_hz: float | None = None
-        self.plot_downsample_step = 5
 
         self.window_sec = 5.0
         self.window_points = 1000
-        self.sweep_x: List[float] = [
-            self.window_sec * i / max(self.window_points - 1, 1)
-            for i in range(self.window_points)
-        ]
 
-        self.channel_data_x: dict[int, deque] = {}
-        self.channel_data_y: dict[int, deque] = {}
+        self.channel_data_x: dict[int, MirroredRingBuffer] = {}
+        self.channel_data_y: dict[int, MirroredRingBuffer] = {}
+        # 每通道的 min/max 包络抽取结果（按像素宽度增量更新）
+        self.channel_decimators: dict[int, MinMaxDecimator] = {}
         self.channel_sample_index: dict[int, int] = {}
         self.channel_curves: dict[int, pg.PlotDataItem] = {}
         self.active_channels_in_plot: set[int] = set()
         self.channel_colors = ["r", "g", "b", "c", "m", "y", "k"]
 
-        self.sweep_buffers: dict[int, List[float]] = {}
-        self.sweep_index: dict[int, int] = {}
+        # 扫屏模式每通道的定长帧缓冲（写指针覆盖 + 固定 NaN 间隙）
+        self.channel_sweeps: dict[int, SweepFramebuffer] = {}
 
         self.plot_widget = pg.PlotWidget()
         self.plot_widget.setBackground("w")
@@ -566,40 +301,25 @@ class Page2Widget(QtWidgets.QWidget):
         self.combo_scroll_mode.currentIndexChanged.connect(self.on_scroll_mode_changed)
 
         self.combo_channel_count.currentIndexChanged.connect(self.on_channel_count_changed)
-        self.on_channel_count_changed()
+        self.spin_channel_count.valueChanged.connect(self.on_channel_count_changed)
+        self.combo_backend.currentIndexChanged.connect(self.on_backend_changed)
+        self.on_backend_changed()
 
-        self.label_ip = QtWidgets.QLabel("监听IP：")
-        self.label_ip.setFixedWidth(60)
-        self.input_ip = QtWidgets.QLineEdit()
-        self.input_ip.setFixedWidth(150)
-        self.input_ip.setPlaceholderText("例如 0.0.0.0")
-        self.input_ip.setText("0.0.0.0")
-
-        self.label_fs = QtWidgets.QLabel("采样率(Hz)：")
-        self.label_fs.setFixedWidth(80)
-        self.input_fs = QtWidgets.QLineEdit()
-        self.input_fs.setFixedWidth(80)
-        self.input_fs.setPlaceholderText("例如 1000")
-        self.input_fs.setText("1000")
-
-        self.label_ip.hide()
-        self.input_ip.hide()
-        self.label_fs.hide()
-        self.input_fs.hide()
-
-        self.button_1.clicked.connect(self.start_udp_receiving)
+        self.button_1.clicked.connect(self.start_receiving)
         self.button_reset_y.clicked.connect(self.reset_y_axis_range)
         self.button_save.clicked.connect(self.toggle_save_data)
 
-        self.receiver: UdpEegReceiver | None = None
+        self.receiver: AcquisitionBackend | None = None
 
         self.is_saving: bool = False
-        self.channel_save_files: dict[int, object] = {}
-        self.channel_save_index: dict[int, int] = {}
+        # 采样写入会话二进制文件（session.eegrec），需要 CSV 时用 recording.convert 转换；
+        # 写盘在 RecordingWriter 的独立线程中完成，GUI 线程只负责入队
+        self.recording_writer: RecordingWriter | None = None
 
-        # triggers.csv 相关
-        self.trigger_file: object | None = None
+        # 没有时间映射时待写入的 trigger 码（落到下一个 ch0 采样点，由 RecordingWriter 写入 events.csv）
         self.trigger_queue: deque[int] = deque()
+        # 最近一次 stop_saving 时的录制统计（含 trigger 落点误差），供范式页面写入 meta.json
+        self.last_recording_metrics: dict | None = None
 
     def _clear_layout(self, layout: QtWidgets.QLayout):
         while layout.count():
@@ -611,43 +331,55 @@ class Page2Widget(QtWidgets.QWidget):
             if child_layout is not None:
                 self._clear_layout(child_layout)
 
-    def _expand_packet_times(self, packet: EegDataPacket):
-        if self.sample_rate_hz is None or self.sample_rate_hz <= 0:
-            return []
-
-        samples = packet.data
-        n = len(samples)
-        if n == 0:
-            return []
-
-        dt_s = 1.0 / self.sample_rate_hz
-        base_ts = packet.system_timestamp if packet.system_timestamp > 0 else packet.hardware_timestamp
-        if dt_s > 0:
-            t_first = base_ts - (n - 1) * dt_s
-        else:
-            t_first = base_ts
-
-        return [t_first + j * dt_s for j in range(n)]
-
-    def _parse_sensor_serial(self, frame_data: bytes) -> str:
+    def _release_receiver(self):
+        if self.receiver is None:
+            return
+        receiver = self.receiver
+        self.receiver = None
+        # 先释放再断开：若这是最后一个引用，stop() 会同步送出尾包 / 已排队的数据
+        release_backend(receiver)
         try:
-            if len(frame_data) < 5:
-                return "000000"
-            raw = (frame_data[2] << 16) | (frame_data[3] << 8) | frame_data[4]
-            serial_int = raw & 0xFFFFFF
-            serial_str = f"{serial_int:06d}"
-            return serial_str
-        except Exception as e:
-            print("解析传感器序列号失败:", e)
-            return "000000"
+            receiver.batch_received.disconnect(self.on_eeg_batch)
+            receiver.error_occurred.disconnect(self.on_error)
+        except TypeError:
+            pass
+        self.render_scheduler.stop()
+        # 停止时送达的尾包补画一帧
+        self._render_frame()
+
+    def _backend_kind(self) -> str:
+        return self.combo_backend.currentData() or "udp"
+
+    def on_backend_changed(self):
+        kind = self._backend_kind()
+        is_udp = kind == "udp"
+        self.input_ip.setText(BACKEND_DEFAULT_HOST[kind])
+        self.input_port.setText(str(BACKEND_DEFAULT_PORT[kind]))
+        self.input_port.setPlaceholderText(f"例如 {BACKEND_DEFAULT_PORT[kind]}")
+        if is_udp:
+            self.input_fs.setText("1000")
+
+        self.label_ip.setVisible(not is_udp)
+        self.input_ip.setVisible(not is_udp)
+        self.label_fs.setVisible(not is_udp)
+        self.input_fs.setVisible(not is_udp)
+        self.combo_channel_count.setVisible(is_udp)
+        self.spin_channel_count.setVisible(not is_udp)
+        self.on_channel_count_changed()
 
     def on_channel_count_changed(self):
         self._clear_layout(self.channel_checkbox_layout)
         self.channel_checkboxes.clear()
 
-        count = self.combo_channel_count.currentData()
-        if count is None:
-            count = 3
+        kind = self._backend_kind()
+        if kind == "udp":
+            count = self.combo_channel_count.currentData()
+            if count is None:
+                count = 3
+        else:
+            # 带内 trigger 通道不是 EEG，不显示；通道很多时只为前 MAX_PLOT_CHANNELS 个提供勾选（其余通道只录制不绘图）
+            count = self.spin_channel_count.value() - (0 if kind == "DSI" else 1)
+            count = min(count, self.MAX_PLOT_CHANNELS)
 
         for ch in range(count):
             cb = QtWidgets.QCheckBox(f"Ch{ch}")
@@ -660,7 +392,7 @@ class Page2Widget(QtWidgets.QWidget):
         if mode in (1, 2):
             self.scroll_mode = mode
 
-    def start_udp_receiving(self):
+    def start_receiving(self):
         ip = self.input_ip.text().strip()
         port_str = self.input_port.text().strip()
         fs_str = self.input_fs.text().strip()
@@ -692,23 +424,15 @@ class Page2Widget(QtWidgets.QWidget):
             self.window_points = max(points_for_5s, 1000)
             self.max_points = max(self.window_points * 2, 1000)
 
-            if self.window_points > 1:
-                self.sweep_x = [
-                    self.window_sec * i / (self.window_points - 1)
-                    for i in range(self.window_points)
-                ]
-            else:
-                self.sweep_x = [0.0]
-
             self.channel_data_x.clear()
             self.channel_data_y.clear()
+            self.channel_decimators.clear()
             self.channel_sample_index.clear()
             self.channel_curves.clear()
             self.active_channels_in_plot.clear()
-            self.last_plot_time = 0.0
+            self._plot_dirty = False
 
-            self.sweep_buffers.clear()
-            self.sweep_index.clear()
+            self.channel_sweeps.clear()
 
             self.sensor_serial = "000003"
             self._sensor_serial_parsed = False
@@ -729,37 +453,24 @@ class Page2Widget(QtWidgets.QWidget):
             self.plot_widget.addItem(self.sweep_line)
             self.sweep_line.setVisible(self.scroll_mode == 2)
 
-            self.input_ip.setDisabled(True)
-            self.input_port.setDisabled(True)
-            self.input_fs.setDisabled(True)
-            self.combo_channel_count.setDisabled(True)
-            self.combo_scroll_mode.setDisabled(True)
+            self._set_inputs_enabled(False)
 
-            if self.receiver is not None:
-                self.receiver.stop()
-                self.receiver.deleteLater()
-                self.receiver = None
-
-            self.receiver = UdpEegReceiver(host=ip, port=port, buffer_size=8192, parent=self)
-
-            self.receiver.data_received.connect(self.on_eeg_packet)
-            self.receiver.error_occurred.connect(self.on_error)
+            self._release_receiver()
 
+            kind = self._backend_kind()
+            n_chan = None if kind == "udp" else self.spin_channel_count.value()
             try:
-                self.receiver.start()
+                self.receiver = acquire_backend(kind, ip, port, self.sample_rate_hz, n_chan=n_chan)
             except Exception as e:
-                self.label_1.setText(f"启动UDP接收器失败: {e}")
+                self.label_1.setText(f"启动{BACKENDS[kind]}接收失败: {e}")
                 self.label_1.setStyleSheet("color: red")
-                self.input_ip.setDisabled(False)
-                self.input_port.setDisabled(False)
-                self.input_fs.setDisabled(False)
-                self.combo_channel_count.setDisabled(False)
-                self.combo_scroll_mode.setDisabled(False)
-                if self.receiver is not None:
-                    self.receiver.deleteLater()
-                    self.receiver = None
+                self._set_inputs_enabled(True)
                 return
 
+            self.receiver.batch_received.connect(self.on_eeg_batch)
+            self.receiver.error_occurred.connect(self.on_error)
+            self.render_scheduler.start()
+
             self.button_1.setText(ButtonStates.stop.value)
             self.label_1.setText(LabelStates.listening.value)
             self.label_1.setStyleSheet("color: #5d5d5d")
@@ -768,10 +479,7 @@ class Page2Widget(QtWidgets.QWidget):
             self.button_save.setEnabled(True)
 
         elif self.button_1.text() == ButtonStates.stop.value:
-            if self.receiver is not None:
-                self.receiver.stop()
-                self.receiver.deleteLater()
-                self.receiver = None
+            self._release_receiver()
 
             self.stop_saving()
             self.button_save.setEnabled(False)
@@ -779,62 +487,54 @@ class Page2Widget(QtWidgets.QWidget):
             self.button_1.setText(ButtonStates.start.value)
             self.label_1.setText(LabelStates.stopped.value)
             self.label_1.setStyleSheet("color: #5d5d5d")
-            self.input_ip.setDisabled(False)
-            self.input_port.setDisabled(False)
-            self.input_fs.setDisabled(False)
-            self.combo_channel_count.setDisabled(False)
-            self.combo_scroll_mode.setDisabled(False)
+            self._set_inputs_enabled(True)
+
+    def _set_inputs_enabled(self, enabled: bool):
+        for widget in (
+            self.combo_backend, self.input_ip, self.input_port, self.input_fs,
+            self.combo_channel_count, self.spin_channel_count, self.combo_scroll_mode,
+        ):
+            widget.setDisabled(not enabled)
 
-    def on_eeg_packet(self, packet: EegDataPacket):
+    def on_eeg_batch(self, batch: EegBatch):
         if self.sample_rate_hz is None or self.sample_rate_hz <= 0:
             return
 
-        ch = packet.channel
-
-        if (not self._sensor_serial_parsed) and packet.raw_packet:
-            self.sensor_serial = self._parse_sensor_serial(packet.raw_packet)
+        if (not self._sensor_serial_parsed) and batch.serial is not None:
+            self.sensor_serial = f"{batch.serial:06d}"
             self._sensor_serial_parsed = True
             print(f"数据来自传感器序列号: {self.sensor_serial}")
 
-        if self.is_saving:
-            self._save_packet_samples(packet)
+        for ch in sorted(batch.channels):
+            chunk = batch.channels[ch]
+            times = chunk.sample_times(self.sample_rate_hz)
+            if times.size == 0:
+                continue
 
-        if ch not in self.channel_data_x:
-            self.channel_data_x[ch] = deque(maxlen=self.max_points)
-            self.channel_data_y[ch] = deque(maxlen=self.max_points)
-            self.channel_sample_index[ch] = 0
+            if self.is_saving:
+                self._save_chunk_samples(ch, times, chunk.data, batch.triggers if ch == 0 else None)
 
-            color = self.channel_colors[len(self.channel_curves) % len(self.channel_colors)]
-            curve = self.plot_widget.plot(pen=color, name=f"Ch {ch}")
-            self.channel_curves[ch] = curve
+            # 没有勾选框的通道（数据服务器通道很多时）只录制不绘图
+            if ch not in self.channel_checkboxes:
+                continue
 
-        self.active_channels_in_plot.add(ch)
+            if ch not in self.channel_data_x:
+                self.channel_data_x[ch] = MirroredRingBuffer(self.max_points, dtype=np.float64)
+                self.channel_data_y[ch] = MirroredRingBuffer(self.max_points, dtype=np.float32)
+                self.channel_decimators[ch] = MinMaxDecimator(self.max_points)
+                self.channel_sample_index[ch] = 0
 
-        times = self._expand_packet_times(packet)
-        if not times:
-            return
+                color = self.channel_colors[len(self.channel_curves) % len(self.channel_colors)]
+                curve = self.plot_widget.plot(pen=color, name=f"Ch {ch}")
+                self.channel_curves[ch] = curve
 
-        for t_s, v in zip(times, packet.data):
-            self.channel_sample_index[ch] += 1
-            self.channel_data_x[ch].append(t_s)
-            self.channel_data_y[ch].append(v)
-
-        now = time.time()
-        if now - self.last_plot_time >= self.plot_interval:
-            channels_sorted = sorted(self.active_channels_in_plot)
-            visible_channels = []
-            for c in channels_sorted:
-                cb = self.channel_checkboxes.get(c)
-                if cb is None or cb.isChecked():
-                    visible_channels.append(c)
-
-            self.label_1.setText(
-                f"{LabelStates.receiving.value} 当前显示通道: {visible_channels}"
-            )
-            self.label_1.setStyleSheet("color: #008000")
+            self.active_channels_in_plot.add(ch)
 
-            self.update_plot()
-            self.last_plot_time = now
+            self.channel_sample_index[ch] += times.size
+            self.channel_data_x[ch].append(times)
+            self.channel_data_y[ch].append(chunk.data)
+
+        self._plot_dirty = True
 
     def toggle_save_data(self):
         if not self.is_saving:
@@ -862,19 +562,23 @@ class Page2Widget(QtWidgets.QWidget):
             self.data_dir = self.default_data_dir
         os.makedirs(self.data_dir, exist_ok=True)
 
+        try:
+            self.recording_writer = RecordingWriter(
+                session_path(self.data_dir),
+                sample_rate=self.sample_rate_hz,
+                serial=getattr(self, "sensor_serial", "xxxxxx"),
+                events_path=os.path.join(self.data_dir, EVENTS_FILENAME),
+            )
+        except Exception as e:
+            print("创建会话数据文件失败:", e)
+            self.label_1.setText(f"创建会话数据文件失败: {e}")
+            self.label_1.setStyleSheet("color: red")
+            return
+
         self.is_saving = True
-        self.channel_save_files.clear()
-        self.channel_save_index.clear()
 
-        self.trigger_file = None
         self.trigger_queue.clear()
-        try:
-            triggers_path = os.path.join(self.data_dir, "triggers.csv")
-            self.trigger_file = open(triggers_path, "w", encoding="utf-8", newline="")
-            self.trigger_file.write("Time,trigger\n")
-        except Exception as e:
-            print("创建 triggers.csv 失败:", e)
-            self.trigger_file = None
+        self.last_recording_metrics = None
 
         self.button_save.setText("暂停保存数据，并落盘")
 
@@ -882,33 +586,42 @@ class Page2Widget(QtWidgets.QWidget):
         if not self.is_saving:
             return
 
-        for f in self.channel_save_files.values():
+        if self.recording_writer is not None:
+            # close() 会等待队列中的数据全部写完并 fsync，之后上层可以立即读取文件
             try:
-                f.close()
-            except Exception:
-                pass
-        self.channel_save_files.clear()
-        self.channel_save_index.clear()
+                self.recording_writer.close()
+                self.last_recording_metrics = self.recording_writer.metrics()
+                print("录制统计:", self.last_recording_metrics)
+            except Exception as e:
+                print("关闭会话数据文件失败:", e)
+                self.label_1.setText(f"关闭会话数据文件失败: {e}")
+                self.label_1.setStyleSheet("color: red")
+            self.recording_writer = None
 
-        if self.trigger_file is not None:
-            try:
-                self.trigger_file.close()
-            except Exception:
-                pass
-            self.trigger_file = None
+            m = self.last_recording_metrics
+            if m is not None and m["write_errors"]:
+                message = f"本次保存有 {m['write_errors']} 次写入失败，数据可能不完整: {m['last_error']}"
+                print(message)
+                self.label_1.setText(message)
+                self.label_1.setStyleSheet("color: red")
 
         self.trigger_queue.clear()
 
         self.is_saving = False
         self.button_save.setText("开始保存数据")
 
-    def set_trigger(self, trigger_code: int):
+    def set_trigger(self, trigger_code: int, host_time: float | None = None):
         """
-        由其他页面（例如 Page7 实验范式）调用，用于在 triggers.csv 中写入一次性 trigger。
-        - 传入非 0 值时，会把该 trigger 压入队列；
-        - 在后续的 ch0 数据写入时，每个采样点会消耗队列中的一个 trigger 码，
-          并写入对应时间点的 Time,trigger；队列为空时写 0。
+        由其他页面（例如 Page7 实验范式）调用，用于在 events.csv 中记录一次性 trigger。
+        - host_time 为事件发生时的 time.monotonic()，不传时取调用时刻；
+        - 该时间经接收器映射到校正时间轴后交给 RecordingWriter，
+          由写线程落到时间最接近的 ch0 采样点，并记录一行 sample_index,Time,trigger；
+        - 还没有时间映射（ch0 尚无有效数据）时退回旧逻辑：落到下一个写入的 ch0 采样点；
+        - UDP 与数据服务器后端走同一条路径；数据服务器自带的 trigger 通道另由 _save_chunk_samples 原样记录；
+        - 需要旧格式的逐采样 triggers.csv 时用 recording.write_dense_triggers 按需生成。
         """
+        if host_time is None:
+            host_time = time.monotonic()
         try:
             code = int(trigger_code)
         except Exception:
@@ -917,51 +630,65 @@ class Page2Widget(QtWidgets.QWidget):
         if code <= 0:
             return
 
-        self.trigger_queue.append(code)
-
-    def _save_packet_samples(self, packet: EegDataPacket):
-        ch = packet.channel
-
-        if ch not in self.channel_save_files:
-            serial_str = getattr(self, "sensor_serial", "xxxxxx")
-            filename = os.path.join(self.data_dir, f"EEG_{serial_str}_{ch:02d}.csv")
-            try:
-                f = open(filename, "w", encoding="utf-8", newline="")
-                f.write("Time,Response\n")
-                self.channel_save_files[ch] = f
-                self.channel_save_index[ch] = 0
-            except Exception as e:
-                print(f"打开通道 {ch} 的 CSV 文件失败:", e)
+        eeg_time = self.host_to_eeg_time(host_time)
+        if eeg_time is not None and self.recording_writer is not None:
+            # 事件不受录制队列上限约束，只有写入器已关闭时才会失败，此时退回 trigger_queue
+            if self.recording_writer.submit_timed_event(0, eeg_time, code):
                 return
 
-        f = self.channel_save_files[ch]
-
-        times = self._expand_packet_times(packet)
-        if not times:
-            return
-
-        samples = packet.data
-        idx = self.channel_save_index.get(ch, 0)
-
-        for t_s, v in zip(times, samples):
-            f.write(f"{t_s:.6f},{v:.6f}\n")
+        self.trigger_queue.append(code)
 
-            if ch == 0 and self.trigger_file is not None:
-                if self.trigger_queue:
-                    trig_value = self.trigger_queue.popleft()
-                else:
-                    trig_value = 0
-                try:
-                    self.trigger_file.write(f"{t_s:.6f},{trig_value}\n")
-                except Exception as e:
-                    print("写入 trigger 失败:", e)
+    def host_to_eeg_time(self, host_time: float, ch: int = 0) -> float | None:
+        """把 time.monotonic() 时刻映射到 ch 通道的校正时间轴（秒），无法映射时返回 None"""
+        if self.receiver is None:
+            return None
+        mapper = getattr(self.receiver, "host_to_eeg_time", None)
+        if mapper is None:
+            return None
+        try:
+            return mapper(host_time, ch)
+        except Exception:
+            return None
 
-            idx += 1
+    def get_trigger_placement_stats(self) -> dict | None:
+        """最近一次保存的 trigger 落点统计（stop_saving 之后可用），见 RecordingWriter.trigger_placement"""
+        if self.last_recording_metrics is None:
+            return None
+        return self.last_recording_metrics.get("trigger_placement")
 
-        self.channel_save_index[ch] = idx
+    def _save_chunk_samples(self, ch: int, times: np.ndarray, samples: np.ndarray,
+                            triggers: np.ndarray | None = None):
+        if self.recording_writer is None:
+            return
+        base_index = self.recording_writer.submitted_samples(ch)
+        accepted = self.recording_writer.submit_samples(ch, times, samples)
+
+        if triggers is not None:
+            # 数据服务器的带内 trigger 通道：非零点即事件，原样落在对应的采样点上
+            nz = np.flatnonzero(triggers)
+            if nz.size and accepted:
+                self.recording_writer.submit_events(
+                    ch, base_index + nz, times[nz], triggers[nz].astype(np.int64)
+                )
+            elif nz.size:
+                # 录制队列已满、这一块采样被丢弃：事件不受队列上限约束，改按时间落到之后写入的最近采样点上，不丢事件
+                for t_s, code in zip(times[nz].tolist(), triggers[nz].astype(np.int64).tolist()):
+                    self.recording_writer.submit_timed_event(ch, t_s, code)
+
+        # 这一块没有写入时不消耗排队的 trigger，留给下一块
+        if ch != 0 or not self.trigger_queue or not accepted:
+            return
+        # ch0 的每个采样点消耗队列中的一个 trigger 码，每个事件记录一行（采样下标 + 时间 + 码）
+        n_trig = min(len(self.trigger_queue), times.size)
+        codes = np.array([self.trigger_queue.popleft() for _ in range(n_trig)], dtype=np.int64)
+        if not self.recording_writer.submit_events(
+            ch, base_index + np.arange(n_trig, dtype=np.int64), times[:n_trig], codes
+        ):
+            # 没有写入时按原顺序放回队首，留给下一块
+            self.trigger_queue.extendleft(reversed(codes.tolist()))
 
     def on_error(self, message: str):
-        print("UDP 错误:", message)
+        print("采集错误:", message)
         self.label_1.setText(message)
         self.label_1.setStyleSheet("color: red")
 
@@ -999,6 +726,81 @@ class Page2Widget(QtWidgets.QWidget):
     def reset_y_axis_range(self):
         self.plot_widget.setYRange(-200, 200)
 
+    def _render_frame(self):
+        if self._plot_dirty:
+            self._plot_dirty = False
+            self.update_plot()
+
+    def _on_render_tick(self):
+        """RenderScheduler 每帧回调：有新数据才重画，并定期在状态栏显示帧率与绘图耗时"""
+        self._render_frame()
+
+        # 接收已停止（如数据服务器关闭连接）时保留 on_error 显示的错误信息
+        if not self.active_channels_in_plot or not self.is_listening():
+            return
+        now = time.monotonic()
+        if now - self._last_status_time < 0.5:
+            return
+        self._last_status_time = now
+
+        visible_channels = []
+        for c in sorted(self.active_channels_in_plot):
+            cb = self.channel_checkboxes.get(c)
+            if cb is None or cb.isChecked():
+                visible_channels.append(c)
+
+        scheduler = self.render_scheduler
+        status = (
+            f"{LabelStates.receiving.value} 当前显示通道: {visible_channels} | "
+            f"{scheduler.current_fps:.0f} FPS 绘图 {scheduler.mean_ms():.1f} ms (p99 {scheduler.p99_ms():.1f} ms)"
+        )
+        color = "#008000"
+        m = self.last_recording_metrics
+        if self.recording_writer is not None:
+            m = self.recording_writer.metrics()
+            status += f" | 录制队列 {m['queue_depth']} 写入 p99 {m['write_latency_p99_ms']:.1f} ms"
+            if m["dropped_chunks"]:
+                status += f" 丢弃 {m['dropped_chunks']}"
+        # 写线程中的写盘错误不会抛到 GUI 线程：保存中及停止保存后都在状态栏上用红字提示
+        if m is not None and m["write_errors"]:
+            status += f" | 写入失败 {m['write_errors']} 次: {m['last_error']}"
+            color = "red"
+        self.label_1.setText(status)
+        self.label_1.setStyleSheet(f"color: {color}")
+
+    def _plot_bucket_size(self) -> int:
+        """包络抽取每组的采样点数：窗口内采样点数 / 绘图区水平像素数，即每像素约 2 个点"""
+        width_px = int(self.plot_widget.getPlotItem().getViewBox().width())
+        if width_px <= 0 or not self.sample_rate_hz:
+            return 1
+        return max(int(self.sample_rate_hz * self.window_sec / width_px), 1)
+
+    def _plot_series(self, ch: int, bucket: int):
+        """返回通道 ch 用于绘图的 (x, y)：bucket > 1 时为增量更新的 min/max 包络，否则为原始历史"""
+        x_hist = self.channel_data_x[ch]
+        y_hist = self.channel_data_y[ch]
+        decimator = self.channel_decimators[ch]
+        # 每组点数变化（含关闭包络）时 configure 会清空抽取结果，下次 update 从原始历史整体重算
+        decimator.configure(bucket)
+        if bucket <= 1:
+            return x_hist.view(), y_hist.view()
+
+        decimator.update(x_hist, y_hist, self.channel_sample_index[ch])
+        return decimator.x_view(), decimator.y_view()
+
+    def _sweep_series(self, ch: int, bucket: int) -> SweepFramebuffer:
+        """返回通道 ch 已增量更新到最新的扫屏帧缓冲；列数随包络每组点数变化，变化时用原始历史重建"""
+        window_samples = max(int(round((self.sample_rate_hz or 1.0) * self.window_sec)), 1)
+        n_columns = max(-(-window_samples // bucket), 1)
+
+        sweep = self.channel_sweeps.get(ch)
+        if sweep is None or sweep.n_columns != n_columns or sweep.window_sec != self.window_sec:
+            sweep = SweepFramebuffer(self.window_sec, n_columns, gap_columns=n_columns // 50)
+            self.channel_sweeps[ch] = sweep
+
+        sweep.update(self.channel_data_x[ch], self.channel_data_y[ch], self.channel_sample_index[ch])
+        return sweep
+
     def update_plot(self):
         if not self.channel_curves:
             return
@@ -1010,7 +812,7 @@ class Page2Widget(QtWidgets.QWidget):
             cb = self.channel_checkboxes.get(ch)
             if cb is not None and cb.isChecked() and self.channel_data_x.get(ch):
                 visible_channels.append((ch, curve))
-                t_max = max(t_max, self.channel_data_x[ch][-1])
+                t_max = max(t_max, self.channel_data_x[ch].last())
             else:
                 curve.setVisible(False)
 
@@ -1018,8 +820,8 @@ class Page2Widget(QtWidgets.QWidget):
             return
 
         window = self.window_sec
-        downsample = self.checkbox_downsample_plot.isChecked()
-        step = self.plot_downsample_step if downsample else 1
+        use_envelope = self.checkbox_downsample_plot.isChecked()
+        bucket = self._plot_bucket_size() if use_envelope else 1
 
         if self.scroll_mode == 1:
             if self.sweep_line is not None:
@@ -1032,11 +834,7 @@ class Page2Widget(QtWidgets.QWidget):
 
             for ch, curve in visible_channels:
                 curve.setVisible(True)
-                x_arr = np.array(self.channel_data_x[ch])
-                y_arr = np.array(self.channel_data_y[ch])
-                if step > 1:
-                    x_arr = x_arr[::step]
-                    y_arr = y_arr[::step]
+                x_arr, y_arr = self._plot_series(ch, bucket)
                 curve.setData(x_arr, y_arr)
 
         else:
@@ -1046,45 +844,15 @@ class Page2Widget(QtWidgets.QWidget):
                 self.sweep_line.setValue(line_pos)
 
             self.plot_widget.setXRange(0, window, padding=0)
-            start_valid_time = t_max - window
 
             for ch, curve in visible_channels:
                 curve.setVisible(True)
-                x_arr = np.array(self.channel_data_x[ch])
-                y_arr = np.array(self.channel_data_y[ch])
-
-                mask = x_arr > start_valid_time
-                x_roi = x_arr[mask]
-                y_roi = y_arr[mask]
-
-                if len(x_roi) == 0:
-                    curve.setData([], [])
-                    continue
-
-                if step > 1:
-                    x_roi = x_roi[::step]
-                    y_roi = y_roi[::step]
-
-                x_mod = x_roi % window
-
-                diffs = np.diff(x_mod)
-                wrap_indices = np.where(diffs < 0)[0]
-
-                if len(wrap_indices) > 0:
-                    insert_idx = wrap_indices + 1
-                    x_draw = np.insert(x_mod, insert_idx, np.nan)
-                    y_draw = np.insert(y_roi, insert_idx, np.nan)
-                else:
-                    x_draw = x_mod
-                    y_draw = y_roi
-
-                curve.setData(x_draw, y_draw, connect="finite")
+                # 帧缓冲只写入新到的采样，NaN 间隙配合 connect="finite" 断开新旧两段
+                sweep = self._sweep_series(ch, bucket)
+                curve.setData(sweep.x_view(), sweep.y_view(), connect="finite")
 
     def closeEvent(self, event):
-        if self.receiver is not None:
-            self.receiver.stop()
-            self.receiver.deleteLater()
-            self.receiver = None
+        self._release_receiver()
 
         if self.is_saving:
             self.stop_saving()
@@ -673,8 +673,8 @@ import random
 import string
 import datetime
 import math
-import csv
 import json
+import time
 from PyQt6 import QtCore, QtWidgets
 from PyQt6.QtWidgets import (
     QWidget,
@@ -691,6 +691,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QShortcut, QKeySequence
 
+from recording import EVENTS_FILENAME, read_trigger_events, trigger_placement_stats
+
 
 class Page4Widget(QWidget):
     """
@@ -716,12 +718,13 @@ class Page4Widget(QWidget):
 
     数据保存 / 时间记录逻辑（对齐 Page7）：
       - 点击【开始 N-back 实验】后调用 Page2.start_saving(run_dir)，
-        由 Page2 在 run_dir 下写入 EEG CSV 和 triggers.csv；
+        由 Page2 在 run_dir 下写入会话数据文件 session.eegrec 和稀疏事件文件 events.csv；
       - 每个 loop（Run）开始 / 结束时，通过 Page2.set_trigger(code) 发送触发码：
           loop_start_trigger / loop_end_trigger；
-      - triggers.csv 中记录 Time,trigger（0 为背景，其它为事件码）；
+      - events.csv 每个事件一行 sample_index,Time,trigger，不含 0 背景行
+        （需要旧格式的逐采样 triggers.csv 时用 recording.write_dense_triggers 按需生成）；
       - 实验正常结束或 ESC 中断时调用 Page2.stop_saving()；
-      - 随后 Page4 读取 triggers.csv 中的非 0 事件，按顺序为每个 loop 回填
+      - 随后 Page4 读取 events.csv 中的事件，按顺序为每个 loop 回填
         loop_start_time / loop_end_time，写入 txt 报告，并生成 meta.json。
     """
 
@@ -766,7 +769,7 @@ class Page4Widget(QWidget):
 
         # 与 EEG 采集页面（Page2）联动
         self.eeg_page = None
-        # 整个实验的开始/结束时间（通过 triggers.csv 推断）
+        # 整个实验的开始/结束时间（通过 events.csv 推断）
         self.eeg_exp_start: float | None = None
         self.eeg_exp_end: float | None = None
         # 每个 loop 的开始/结束时间（写入 txt）
@@ -774,7 +777,6 @@ class Page4Widget(QWidget):
         self.loop_eeg_end: list[float | None] = []
 
         # trigger 相关（对齐 Page7 的模式，编码 1 / 2）
-        self.triggers_filename = "triggers.csv"
         self.loop_start_trigger = 1
         self.loop_end_trigger = 2
         self.trigger_code_labels: dict[int, str] = {
@@ -1024,7 +1026,7 @@ class Page4Widget(QWidget):
         self.current_loop = 0
         self.current_index = 0
 
-        # 清空时间记录（统一使用 triggers.csv 推断）
+        # 清空时间记录（统一使用 events.csv 推断）
         self.eeg_exp_start = None
         self.eeg_exp_end = None
         self.loop_eeg_start = []
@@ -1163,7 +1165,7 @@ class Page4Widget(QWidget):
                 except Exception:
                     pass
 
-            # 从 triggers.csv 回填每个 loop 的开始/结束时间
+            # 从 events.csv 回填每个 loop 的开始/结束时间
             self._update_loop_times_from_triggers()
             self.write_report(aborted=False)
             self._save_meta_json(aborted=False)
@@ -1267,8 +1269,9 @@ class Page4Widget(QWidget):
 
     def _send_trigger(self, code: int):
         """
-        发送一次性 trigger，由 Page2 写入 triggers.csv。
+        发送一次性 trigger，由 Page2 写入 events.csv。
         """
+        host_time = time.monotonic()
         eeg_page = getattr(self, "eeg_page", None)
         if eeg_page is None:
             return
@@ -1278,13 +1281,13 @@ class Page4Widget(QWidget):
             return
 
         try:
-            setter(int(code))
+            setter(int(code), host_time=host_time)
         except Exception:
             pass
 
     def _update_loop_times_from_triggers(self):
         """
-        从 triggers.csv 中推断每个 loop 的开始 / 结束时间。
+        从触发事件（events.csv，旧数据为 triggers.csv）中推断每个 loop 的开始 / 结束时间。
         使用 loop_start_trigger / loop_end_trigger 编码。
         """
         self.trigger_assignment_mode = "unknown"
@@ -1296,27 +1299,10 @@ class Page4Widget(QWidget):
         if not self.run_dir:
             return
 
-        triggers_path = os.path.join(self.run_dir, self.triggers_filename)
-        if not os.path.exists(triggers_path):
-            return
-
-        events: list[tuple[float, int]] = []
         try:
-            with open(triggers_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                next(reader, None)  # 跳过表头
-                for row in reader:
-                    if len(row) < 2:
-                        continue
-                    try:
-                        t = float(row[0])
-                        code = int(float(row[1]))
-                    except Exception:
-                        continue
-                    if code in (self.loop_start_trigger, self.loop_end_trigger):
-                        events.append((t, code))
+            events = read_trigger_events(self.run_dir, codes=(self.loop_start_trigger, self.loop_end_trigger))
         except Exception as e:
-            QMessageBox.warning(self, "触发文件读取失败", f"读取 {self.triggers_filename} 失败：{e}")
+            QMessageBox.warning(self, "触发文件读取失败", f"读取 {EVENTS_FILENAME} 失败：{e}")
             return
 
         if not events or not self.trial_data:
@@ -1385,7 +1371,7 @@ class Page4Widget(QWidget):
 
     def abort_and_finalize(self):
         """
-        ESC 中断实验：停止 EEG 保存，尽可能根据已存在的 triggers.csv 写报告，然后复位 UI。
+        ESC 中断实验：停止 EEG 保存，尽可能根据已存在的 events.csv 写报告，然后复位 UI。
         """
         eeg_page = getattr(self, "eeg_page", None)
         if eeg_page is not None and hasattr(eeg_page, "stop_saving"):
@@ -1411,7 +1397,7 @@ class Page4Widget(QWidget):
 
         其中：
           - loop_start_time / loop_end_time 为该 loop 的开始/结束时间（秒），
-            使用的是与 CSV Time 列一致的“校正后的电脑时间轴”（通过 triggers.csv 推断）；
+            使用的是与 CSV Time 列一致的“校正后的电脑时间轴”（通过 events.csv 推断）；
           - 后续可以用这两个时间在各通道 CSV 的 Time 列中定位 EEG 片段。
         """
         name = self.current_user_name or self.name_input.text().strip() or "unknown"
@@ -1520,6 +1506,7 @@ class Page4Widget(QWidget):
             "eeg_time": eeg_time,
             "trigger_code_labels": {str(k): v for k, v in self.trigger_code_labels.items()},
             "loops": loops_json,
+            "trigger_placement": trigger_placement_stats(getattr(self, "eeg_page", None)),
         }
 
         path = os.path.join(base_dir, "meta.json")
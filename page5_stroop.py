@@ -2,7 +2,7 @@ import os
 import sys
 import random
 import json
-import csv
+import time
 from datetime import datetime
 
 from PyQt6 import QtCore, QtGui, QtWidgets
@@ -21,6 +21,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QKeySequence, QShortcut
 
+from recording import read_trigger_events, trigger_placement_stats
+
 # 中文颜色与对应英文色值
 COLOR_OPTIONS = [
     ("红", "red"),
@@ -50,17 +52,18 @@ class Page5Widget(QWidget):
       - 被试与参数设置页面为“卡片”布局，点击【开始实验】后：
           * 检查 Page2 是否已开始监测信号（is_listening）；
           * 在 data/stroop/<Name>/<YYYYMMDDHHMMSS>/ 下创建本次 run 目录；
-          * 调用 Page2.start_saving(run_dir)，开始写 EEG CSV 和 triggers.csv。
+          * 调用 Page2.start_saving(run_dir)，开始写会话数据文件 session.eegrec 和稀疏事件文件 events.csv
+            （每个事件一行，没有逐采样的 0 背景；旧格式 triggers.csv 由 recording.write_dense_triggers 按需生成）。
       - 每个 loop（Run）：
           * 在 loop 开始时通过 Page2.set_trigger(loop_start_code) 写入一次 trigger；
           * 在 loop 结束时通过 Page2.set_trigger(loop_end_code) 写入一次 trigger；
       - 实验自然结束或 ESC 中断时：
           * 调用 Page2.stop_saving() 关闭 EEG 与 trigger 文件；
-          * Page5 读取本次 run_dir 下的 triggers.csv，筛选出属于 Stroop 的
+          * Page5 读取本次 run_dir 下的 events.csv，筛选出属于 Stroop 的
             loop_start / loop_end trigger，按出现顺序为每个 loop 回填
             loop_start_time / loop_end_time；
           * save_report() 中，每一行第 1、2 列即为该 loop 的 EEG 时间范围，
-            可对齐 EEG CSV 做切片。
+            可对齐会话数据的时间轴做切片。
     """
 
     def __init__(self, parent=None):
@@ -119,7 +122,6 @@ class Page5Widget(QWidget):
 
         # ===== 触发器（trigger）相关（专用于 Stroop） =====
         # 这里使用 1 / 2 标记 Stroop 每个 loop 的开始 / 结束
-        self.triggers_filename = "triggers.csv"
         self.trigger_codes: dict[str, int] = {
             "loop_start": 1,
             "loop_end": 2,
@@ -332,8 +334,9 @@ class Page5Widget(QWidget):
     # ==================== 与 Page2 的 trigger 交互 ====================
     def _send_trigger(self, code: int):
         """
-        将 trigger 发送给 Page2，由 Page2 决定在 triggers.csv 的哪个时间点写入。
+        将 trigger 发送给 Page2，由 Page2 决定落在哪个采样点并写入 events.csv。
         """
+        host_time = time.monotonic()
         if code is None or code <= 0:
             return
         eeg_page = getattr(self, "eeg_page", None)
@@ -343,7 +346,7 @@ class Page5Widget(QWidget):
         if setter is None:
             return
         try:
-            setter(int(code))
+            setter(int(code), host_time=host_time)
         except Exception:
             pass
 
@@ -425,13 +428,13 @@ class Page5Widget(QWidget):
         self.input_enabled = False
         self.is_running = True
 
-        # 初始化时间记录（稍后由 triggers.csv 回填）
+        # 初始化时间记录（稍后由 events.csv 回填）
         self.eeg_exp_start = None
         self.eeg_exp_end = None
         self.loop_eeg_start = [None] * self.loops
         self.loop_eeg_end = [None] * self.loops
 
-        # 4. 在有效点击 Start 后立刻开始保存 EEG CSV + triggers
+        # 4. 在有效点击 Start 后立刻开始保存 EEG 会话数据 + 事件
         if hasattr(eeg_page, "start_saving"):
             try:
                 eeg_page.start_saving(self.run_dir)
@@ -709,10 +712,10 @@ class Page5Widget(QWidget):
         self.current_loop += 1
         self._start_loop()
 
-    # ========== 实验结束 / 中断 & triggers.csv → loop 时间回填 ==========
+    # ========== 实验结束 / 中断 & events.csv → loop 时间回填 ==========
     def _update_loop_times_from_triggers(self):
         """
-        从当前 run_dir 下的 triggers.csv 中读取 loop_start / loop_end trigger，
+        从当前 run_dir 下的触发事件（events.csv，旧数据为 triggers.csv）中读取 loop_start / loop_end trigger，
         为每个 loop 回填 EEG 时间（秒）。
         """
         self.eeg_exp_start = None
@@ -721,25 +724,8 @@ class Page5Widget(QWidget):
         if not self.run_dir:
             return
 
-        path = os.path.join(self.run_dir, self.triggers_filename)
-        if not os.path.exists(path):
-            return
-
-        events: list[tuple[float, int]] = []
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                header = next(reader, None)  # 跳过表头
-                for row in reader:
-                    if len(row) < 2:
-                        continue
-                    try:
-                        t = float(row[0])
-                        code = int(float(row[1]))
-                    except Exception:
-                        continue
-                    if code != 0:
-                        events.append((t, code))
+            events = read_trigger_events(self.run_dir)
         except Exception:
             return
 
@@ -823,7 +809,7 @@ class Page5Widget(QWidget):
 
         其中：
           - loop_start_time / loop_end_time 为该 loop 的开始/结束时间（秒），
-            使用的是由 triggers.csv 回填的 EEG 时间轴；
+            使用的是由 events.csv 回填的 EEG 时间轴；
           - accuracy 为该轮正确率；
           - seq_str 为该轮 trial 序列，形如：
               字‘红’颜色‘黄’TF|字‘蓝’颜色‘绿’TN|...
@@ -1006,6 +992,7 @@ class Page5Widget(QWidget):
             "timing": timing,
             "trigger_code_labels": {str(k): v for k, v in self.trigger_code_labels.items()},
             "loops": loops_json,
+            "trigger_placement": trigger_placement_stats(getattr(self, "eeg_page", None)),
         }
 
         path = os.path.join(base_dir, "meta.json")
@@ -1390,12 +1390,12 @@
 #     sys.exit(app.exec())
 
 
-import csv
 import json
 import math
 import os
 import random
 import sys
+import time
 from datetime import datetime
 
 from PyQt6 import QtCore, QtWidgets
@@ -1419,6 +1419,8 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from recording import EVENTS_FILENAME, read_trigger_events, trigger_placement_stats
+
 
 class Page7Widget(QWidget):
     """
@@ -1428,13 +1430,13 @@ class Page7Widget(QWidget):
       Prompt -> 视频引导 -> 想象阶段 -> 自评 -> 休息
 
     Leichi 模式：
-      - Page2.start_saving(run_dir) 写 EEG CSV + triggers.csv
+      - Page2.start_saving(run_dir) 写会话数据 session.eegrec + 稀疏事件文件 events.csv
       - Task 开始/结束调用 Page2.set_trigger(code)
       - 结束后调用 Page2.stop_saving()
-      - 本页读取 triggers.csv 回填 trial 时间，写 txt + meta.json
+      - 本页读取 events.csv 回填 trial 时间，写 txt + meta.json
 
     Neuracle 模式：
-      - 只负责通过 TriggerBox 打码，不保存 EEG/triggers.csv
+      - 只负责通过 TriggerBox 打码，不保存 EEG / 事件文件
     """
 
     def __init__(self, parent=None):
@@ -1539,7 +1541,6 @@ class Page7Widget(QWidget):
             43: "sprint_imagine_end",
         }
 
-        self.triggers_filename = "triggers.csv"
         self.trigger_assignment_mode: str = "unknown"
 
         self.likert_labels_3 = {1: "不同意", 2: "一般", 3: "同意"}
@@ -2240,6 +2241,7 @@ class Page7Widget(QWidget):
 
     # ==================== trigger ====================
     def _send_trigger_for_current_trial(self, stage: str):
+        host_time = time.monotonic()
         cond = self.current_condition
         if not cond:
             return
@@ -2256,7 +2258,7 @@ class Page7Widget(QWidget):
             if self.eeg_page is None:
                 return
             try:
-                self.eeg_page.set_trigger(int(code))
+                self.eeg_page.set_trigger(int(code), host_time=host_time)
             except Exception:
                 pass
 
@@ -2338,28 +2340,11 @@ class Page7Widget(QWidget):
         if not self.run_dir:
             return
 
-        triggers_path = os.path.join(self.run_dir, self.triggers_filename)
-        if not os.path.exists(triggers_path):
-            return
-
-        events: list[tuple[float, int]] = []
         try:
-            with open(triggers_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                next(reader, None)
-                for row in reader:
-                    if len(row) < 2:
-                        continue
-                    try:
-                        t = float(row[0])
-                        code = int(float(row[1]))
-                    except Exception:
-                        continue
-                    if code != 0:
-                        events.append((t, code))
+            events = read_trigger_events(self.run_dir)
         except Exception as e:
             QMessageBox.warning(
-                self, "触发文件读取失败", f"读取 {self.triggers_filename} 失败：{e}"
+                self, "触发文件读取失败", f"读取 {EVENTS_FILENAME} 失败：{e}"
             )
             return
 
@@ -2774,6 +2759,7 @@ class Page7Widget(QWidget):
             "timing": timing,
             "trigger_code_labels": {str(k): v for k, v in self.trigger_code_labels.items()},
             "trials": trials_json,
+            "trigger_placement": trigger_placement_stats(getattr(self, "eeg_page", None)),
         }
 
         path = os.path.join(base_dir, "meta.json")
@@ -2,7 +2,7 @@ import os
 import sys
 import random
 import json
-import csv
+import time
 import math
 from datetime import datetime
 
@@ -24,6 +24,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QKeySequence, QShortcut
 
+from recording import EVENTS_FILENAME, read_trigger_events, trigger_placement_stats
+
 
 class Page8Widget(QWidget):
     """
@@ -31,11 +33,12 @@ class Page8Widget(QWidget):
 
     时间记录逻辑（新版，与 Page7 一致）：
       - 点击【开始实验】后调用 Page2.start_saving(run_dir)，
-        Page2 在 run_dir 下写 EEG CSV + triggers.csv；
+        Page2 在 run_dir 下写会话数据 session.eegrec + 稀疏事件文件 events.csv；
       - 在 Task 阶段开始 / 结束时，通过 Page2.set_trigger(code) 发送 trigger；
-      - triggers.csv 记录 Time,trigger（采样时刻 + 非 0 触发事件）；
+      - events.csv 每个事件一行 sample_index,Time,trigger（只有事件，没有逐采样的 0 背景；
+        需要旧格式的 triggers.csv 时用 recording.write_dense_triggers 按需生成）；
       - 实验结束 / ESC 中断时调用 Page2.stop_saving()；
-      - 之后 Page8 读取 triggers.csv 中的非 0 事件，按顺序为每个 trial
+      - 之后 Page8 读取 events.csv 中的事件，按顺序为每个 trial
         回填 task_start_time / task_end_time，再按原格式写 txt 报告，
         同时生成 meta.json（包含实验 meta 和每个 trial 的 JSON 信息）。
     """
@@ -93,7 +96,6 @@ class Page8Widget(QWidget):
             4: "arm_raise_end",
         }
         # 触发文件名（由 Page2 在 run_dir 下写入）
-        self.triggers_filename = "triggers.csv"
         # meta 里记录的触发模式
         self.trigger_assignment_mode: str = "unknown"  # "start_end" or "start_only"
 
@@ -437,7 +439,7 @@ class Page8Widget(QWidget):
         self.run_dir = os.path.join(self.user_dir, self.run_timestamp)
         os.makedirs(self.run_dir, exist_ok=True)
 
-        # ===== 启动 EEG CSV / triggers.csv 记录 =====
+        # ===== 启动 EEG 会话数据 / events.csv 记录 =====
         self.eeg_exp_start = None
         self.eeg_exp_end = None
         try:
@@ -644,6 +646,7 @@ class Page8Widget(QWidget):
         根据当前 condition 和阶段（task_start / task_end），
         通过 Page2.set_trigger 发送 trigger。
         """
+        host_time = time.monotonic()
         eeg_page = getattr(self, "eeg_page", None)
         if eeg_page is None:
             return
@@ -665,13 +668,13 @@ class Page8Widget(QWidget):
             return
 
         try:
-            setter(int(code))
+            setter(int(code), host_time=host_time)
         except Exception:
             pass
 
     def _update_trial_times_from_triggers(self):
         """
-        从 triggers.csv 中回填每个 trial 的开始/结束时间，
+        从触发事件（events.csv，旧数据为 triggers.csv）中回填每个 trial 的开始/结束时间，
         并估算整体 eeg_exp_start / eeg_exp_end。
         """
         self.trigger_assignment_mode = "unknown"
@@ -681,27 +684,10 @@ class Page8Widget(QWidget):
         if not self.run_dir:
             return
 
-        triggers_path = os.path.join(self.run_dir, self.triggers_filename)
-        if not os.path.exists(triggers_path):
-            return
-
-        events: list[tuple[float, int]] = []
         try:
-            with open(triggers_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                next(reader, None)  # 跳过表头
-                for row in reader:
-                    if len(row) < 2:
-                        continue
-                    try:
-                        t = float(row[0])
-                        code = int(float(row[1]))
-                    except Exception:
-                        continue
-                    if code != 0:
-                        events.append((t, code))
+            events = read_trigger_events(self.run_dir)
         except Exception as e:
-            QMessageBox.warning(self, "触发文件读取失败", f"读取 {self.triggers_filename} 失败：{e}")
+            QMessageBox.warning(self, "触发文件读取失败", f"读取 {EVENTS_FILENAME} 失败：{e}")
             return
 
         if not events:
@@ -898,7 +884,7 @@ class Page8Widget(QWidget):
         """
         正常完成所有 trial + 结束倒计时：
         - 停止 EEG 保存
-        - 从 triggers.csv 回填时间
+        - 从 events.csv 回填时间
         - 写入 txt 报告 + meta.json
         - 重置 UI
         """
@@ -918,7 +904,7 @@ class Page8Widget(QWidget):
         """
         ESC 中断：
         - 尝试停止 EEG 保存
-        - 从 triggers.csv 回填已有 trial 的时间
+        - 从 events.csv 回填已有 trial 的时间
         - 写 ABORT 报告 + meta.json
         - 重置 UI
         """
@@ -1100,6 +1086,7 @@ class Page8Widget(QWidget):
             "timing": timing,
             "trigger_code_labels": {str(k): v for k, v in self.trigger_code_labels.items()},
             "trials": trials_json,
+            "trigger_placement": trigger_placement_stats(getattr(self, "eeg_page", None)),
         }
 
         path = os.path.join(base_dir, "meta.json")
@@ -818,6 +818,7 @@
 import json
 import os
 import sys
+import time
 from datetime import datetime
 
 from PyQt6 import QtCore, QtWidgets
@@ -836,6 +837,8 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from recording import read_trigger_events, trigger_placement_stats
+
 try:
     from PyQt6.QtTextToSpeech import QTextToSpeech
 except ImportError:
@@ -848,11 +851,10 @@ class Page9Widget(QWidget):
 
     记录方式：
     - 支持 Leichi / Neuracle 设备选择
-    - 实验结束后，Page9 读取 triggers.csv（Leichi 模式），对齐每个激活段的 start/end，
+    - 实验结束后，Page9 读取 Page2 写的稀疏事件文件 events.csv（Leichi 模式），对齐每个激活段的 start/end，
       并生成 txt + meta.json。
 
-    trigger 定义：
-      0: baseline（由 Page2 在无事件时写 0）
+    trigger 定义（events.csv 只记录事件，没有事件的时段即 baseline）：
       1: closed_eyes_start
       2: closed_eyes_end
       3: mental_math_start
@@ -1093,6 +1095,7 @@ class Page9Widget(QWidget):
 
     # ---------- 向设备发送 trigger ----------
     def _send_trigger(self, code: int):
+        host_time = time.monotonic()
         if self.device_type == "Leichi":
             eeg_page = getattr(self, "eeg_page", None)
             if eeg_page is None:
@@ -1101,7 +1104,7 @@ class Page9Widget(QWidget):
             if setter is None:
                 return
             try:
-                setter(int(code))
+                setter(int(code), host_time=host_time)
             except Exception:
                 pass
         elif self.device_type == "Neuracle":
@@ -1327,7 +1330,7 @@ class Page9Widget(QWidget):
 
         # 检查是否还有下一个 run
         if self.current_run >= self.total_runs:
-            # 修改：新增实验结束 10 秒倒计时，既给被试提示，也为写入 triggers.csv 争取缓冲时间
+            # 修改：新增实验结束 10 秒倒计时，既给被试提示，也为写入 events.csv 争取缓冲时间
             self._show_fullscreen_message(
                 "实验结束\n{n}秒后自动保存并退出",
                 self.end_countdown,
@@ -1482,42 +1485,19 @@ class Page9Widget(QWidget):
         self.fullscreen_win.close()
         self.fullscreen_win = None
 
-    # ---------- 从 triggers.csv 解析各段时间 ----------
+    # ---------- 从 events.csv 解析各段时间 ----------
     def _parse_segments_from_triggers(self) -> list[dict]:
         segments: list[dict] = []
 
         base_dir = self.run_dir or self.user_dir or self.eye_root
-        triggers_path = os.path.join(base_dir, "triggers.csv")
-        if not os.path.exists(triggers_path):
-            return segments
+        start_codes = {self.TRIG_CLOSED_START, self.TRIG_MATH_START}
+        end_codes = {self.TRIG_CLOSED_END, self.TRIG_MATH_END}
 
-        events: list[tuple[float, int]] = []
         try:
-            with open(triggers_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            events = read_trigger_events(base_dir, codes=start_codes | end_codes)
         except Exception:
             return segments
 
-        start_codes = {self.TRIG_CLOSED_START, self.TRIG_MATH_START}
-        end_codes = {self.TRIG_CLOSED_END, self.TRIG_MATH_END}
-
-        for line in lines[1:]:
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split(",")
-            if len(parts) < 2:
-                continue
-            try:
-                t = float(parts[0])
-                code = int(float(parts[1]))
-            except Exception:
-                continue
-            if code in start_codes or code in end_codes:
-                events.append((t, code))
-
-        events.sort(key=lambda x: x[0])
-
         current_start: float | None = None
         for t, code in events:
             if code in start_codes:
@@ -1658,6 +1638,7 @@ class Page9Widget(QWidget):
             "timing": timing,
             "trigger_code_labels": trigger_code_labels,
             "trials": meta_trials,
+            "trigger_placement": trigger_placement_stats(getattr(self, "eeg_page", None)),
         }
 
         meta_path = os.path.join(
@@ -0,0 +1,11 @@
+from .ring_buffer import MirroredRingBuffer
+from .decimation import MinMaxDecimator
+from .sweep import SweepFramebuffer
+from .render_scheduler import RenderScheduler
+
+__all__ = [
+    "MirroredRingBuffer",
+    "MinMaxDecimator",
+    "SweepFramebuffer",
+    "RenderScheduler",
+]
@@ -0,0 +1,107 @@
+import numpy as np
+
+from .ring_buffer import MirroredRingBuffer
+
+
+class MinMaxDecimator:
+    """
+    增量式 min/max（保峰值）包络抽取。
+
+    - 原始采样按 bucket_size 个点一组，每组只输出最小值和最大值两个点（按原始先后顺序），
+      bucket_size 取“每个水平像素对应的采样点数”时，每个像素约 2 个点，尖峰 / 眨眼不会被跳采丢掉；
+    - update() 只处理自上次调用以来新到的采样，不足一组的尾巴留到下一帧，
+      每帧代价与新数据量成正比，而与窗口长度无关；
+    - bucket_size 变化（窗口缩放、采样率改变）时由 configure() 清空，再从原始历史整体重算一次。
+    """
+
+    def __init__(self, raw_capacity: int, bucket_size: int = 1):
+        self.raw_capacity = max(int(raw_capacity), 1)
+        self.bucket_size = max(int(bucket_size), 1)
+        self._consumed = 0
+        self._pending_x = np.empty(0, dtype=np.float64)
+        self._pending_y = np.empty(0, dtype=np.float32)
+        self._alloc()
+
+    def _alloc(self):
+        if self.bucket_size == 1:
+            capacity = self.raw_capacity
+        else:
+            capacity = 2 * (self.raw_capacity // self.bucket_size + 1)
+        self._x = MirroredRingBuffer(capacity, dtype=np.float64)
+        self._y = MirroredRingBuffer(capacity, dtype=np.float32)
+
+    def configure(self, bucket_size: int) -> bool:
+        """修改每组点数；若发生变化则清空已抽取结果，返回 True（调用方随后用 update 重新喂全部历史）"""
+        bucket_size = max(int(bucket_size), 1)
+        if bucket_size == self.bucket_size:
+            return False
+        self.bucket_size = bucket_size
+        self.reset()
+        return True
+
+    def reset(self):
+        self._consumed = 0
+        self._pending_x = self._pending_x[:0]
+        self._pending_y = self._pending_y[:0]
+        self._alloc()
+
+    def update(self, x_hist: MirroredRingBuffer, y_hist: MirroredRingBuffer, total_count: int):
+        """
+        从原始历史缓冲中取出新到的采样并抽取。
+        total_count 为该通道累计收到的采样数（单调递增），用于判断哪些点是新的。
+        """
+        new_count = total_count - self._consumed
+        if new_count <= 0:
+            return
+        self._consumed = total_count
+
+        avail = len(x_hist)
+        if new_count > avail:
+            # 两次 update 之间新数据已超过原始缓冲容量，丢掉的部分本来也不会显示
+            new_count = avail
+            self._pending_x = self._pending_x[:0]
+            self._pending_y = self._pending_y[:0]
+        if new_count == 0:
+            return
+        x_new = x_hist.view()[-new_count:]
+        y_new = y_hist.view()[-new_count:]
+
+        bucket = self.bucket_size
+        if bucket == 1:
+            self._x.append(x_new)
+            self._y.append(y_new)
+            return
+
+        if self._pending_x.size:
+            x_new = np.concatenate((self._pending_x, x_new))
+            y_new = np.concatenate((self._pending_y, y_new))
+
+        n_buckets = x_new.size // bucket
+        used = n_buckets * bucket
+        self._pending_x = x_new[used:].copy()
+        self._pending_y = y_new[used:].copy()
+        if n_buckets == 0:
+            return
+
+        xb = x_new[:used].reshape(n_buckets, bucket)
+        yb = y_new[:used].reshape(n_buckets, bucket)
+        i_min = yb.argmin(axis=1)
+        i_max = yb.argmax(axis=1)
+        first = np.minimum(i_min, i_max)
+        second = np.maximum(i_min, i_max)
+        rows = np.arange(n_buckets)
+
+        out_x = np.empty(2 * n_buckets, dtype=np.float64)
+        out_y = np.empty(2 * n_buckets, dtype=np.float32)
+        out_x[0::2] = xb[rows, first]
+        out_x[1::2] = xb[rows, second]
+        out_y[0::2] = yb[rows, first]
+        out_y[1::2] = yb[rows, second]
+        self._x.append(out_x)
+        self._y.append(out_y)
+
+    def x_view(self) -> np.ndarray:
+        return self._x.view()
+
+    def y_view(self) -> np.ndarray:
+        return self._y.view()
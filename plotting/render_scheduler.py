@@ -0,0 +1,89 @@
+import time
+from collections import deque
+from typing import Callable
+
+import numpy as np
+from PyQt6.QtCore import QObject, Qt, QTimer
+
+
+class RenderScheduler(QObject):
+    """
+    由 QTimer 驱动的绘图节拍器，与数据到达解耦。
+
+    - 按 target_fps 周期调用 render_callback，没有新数据时也照常走帧（由回调自行判断是否需要重画）；
+    - 记录每帧回调耗时，mean_ms / p99_ms 统计最近 STATS_FRAMES 帧；
+    - 自动降帧：每 ADJUST_EVERY 帧检查一次，平均耗时超过帧间隔的 BUSY_RATIO 时降低帧率（不低于 min_fps），
+      GUI 线程长期空闲（低于 IDLE_RATIO）时再逐步回升到 target_fps。
+    """
+
+    STATS_FRAMES = 120
+    ADJUST_EVERY = 30
+    BUSY_RATIO = 0.6
+    IDLE_RATIO = 0.25
+
+    def __init__(self, render_callback: Callable[[], None], target_fps: float = 30.0,
+                 min_fps: float = 5.0, parent=None):
+        super().__init__(parent)
+        self._render_callback = render_callback
+        self.min_fps = float(min_fps)
+        self.target_fps = max(float(target_fps), self.min_fps)
+        self.current_fps = self.target_fps
+
+        self._frame_ms: deque[float] = deque(maxlen=self.STATS_FRAMES)
+        self._frames_since_adjust = 0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_tick)
+        self._apply_interval()
+
+    def start(self):
+        self._frame_ms.clear()
+        self._frames_since_adjust = 0
+        self.current_fps = self.target_fps
+        self._apply_interval()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def is_active(self) -> bool:
+        return self._timer.isActive()
+
+    def set_target_fps(self, fps: float):
+        self.target_fps = max(float(fps), self.min_fps)
+        self.current_fps = self.target_fps
+        self._frames_since_adjust = 0
+        self._apply_interval()
+
+    def mean_ms(self) -> float:
+        return float(np.mean(self._frame_ms)) if self._frame_ms else 0.0
+
+    def p99_ms(self) -> float:
+        return float(np.percentile(self._frame_ms, 99)) if self._frame_ms else 0.0
+
+    def _apply_interval(self):
+        self._timer.setInterval(max(int(round(1000.0 / self.current_fps)), 1))
+
+    def _on_tick(self):
+        t0 = time.perf_counter()
+        self._render_callback()
+        self._frame_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        self._frames_since_adjust += 1
+        if self._frames_since_adjust >= self.ADJUST_EVERY:
+            self._frames_since_adjust = 0
+            self._adjust_fps()
+
+    def _adjust_fps(self):
+        budget_ms = 1000.0 / self.current_fps
+        recent = list(self._frame_ms)[-self.ADJUST_EVERY:]
+        load = float(np.mean(recent)) / budget_ms
+
+        if load > self.BUSY_RATIO and self.current_fps > self.min_fps:
+            self.current_fps = max(self.current_fps * 0.75, self.min_fps)
+        elif load < self.IDLE_RATIO and self.current_fps < self.target_fps:
+            self.current_fps = min(self.current_fps * 1.25, self.target_fps)
+        else:
+            return
+        self._apply_interval()
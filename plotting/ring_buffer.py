@@ -0,0 +1,70 @@
+from typing import Optional
+
+import numpy as np
+
+
+class MirroredRingBuffer:
+    """
+    定长环形缓冲（镜像存储），用于绘图历史。
+
+    - 底层数组长度为 2 * capacity，每个元素同时写在 i 和 i + capacity 两处，
+      因此任意时刻最近 len(self) 个元素在底层数组中都是连续的一段；
+    - append() 为整块切片拷贝，代价只与本次写入长度有关，与缓冲容量无关；
+    - view() 直接返回底层数组的只读切片，不拷贝，可直接交给 PlotDataItem.setData。
+      注意：view 在下一次 append 之后内容会变化，需要保留时请自行 copy()。
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity 必须为正整数")
+        self.capacity = int(capacity)
+        self._buf = np.zeros(2 * self.capacity, dtype=dtype)
+        self._head = 0  # 下一个写入位置，取值 [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buf.dtype
+
+    def append(self, values: np.ndarray):
+        """批量追加；超过容量时只保留最新的 capacity 个点"""
+        values = np.asarray(values, dtype=self._buf.dtype).ravel()
+        n = values.size
+        if n == 0:
+            return
+        cap = self.capacity
+        if n >= cap:
+            values = values[-cap:]
+            n = cap
+
+        head = self._head
+        first = min(n, cap - head)
+        rest = n - first
+        buf = self._buf
+        buf[head:head + first] = values[:first]
+        buf[head + cap:head + cap + first] = values[:first]
+        if rest:
+            buf[:rest] = values[first:]
+            buf[cap:cap + rest] = values[first:]
+
+        self._head = (head + n) % cap
+        self._size = min(self._size + n, cap)
+
+    def view(self) -> np.ndarray:
+        """按时间顺序返回全部有效数据的零拷贝只读视图"""
+        start = (self._head - self._size) % self.capacity
+        out = self._buf[start:start + self._size]
+        out.flags.writeable = False
+        return out
+
+    def last(self) -> Optional[float]:
+        if self._size == 0:
+            return None
+        return self._buf[(self._head - 1) % self.capacity].item()
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
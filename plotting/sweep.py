@@ -0,0 +1,116 @@
+import numpy as np
+
+from .ring_buffer import MirroredRingBuffer
+
+
+class SweepFramebuffer:
+    """
+    扫屏（示波器）模式的定长帧缓冲。
+
+    - 屏幕横向分为 n_columns 列，每列保存该列时间段内采样的 (min, max) 两个点，
+      x 坐标固定，y 存成交错数组 [min0, max0, min1, max1, ...]，可直接交给 setData；
+    - 新采样按 (t % window_sec) 映射到列，在写指针处覆盖旧数据，不再每帧对整个窗口做掩码 / 取模 / 插 NaN；
+    - 写指针前方固定 gap_columns 列置为 NaN 作为擦除间隙，配合 connect="finite" 断开新旧两段曲线；
+    - update() 只处理上次调用后新到的采样，每帧代价与新数据量成正比，与窗口长度无关。
+    """
+
+    def __init__(self, window_sec: float, n_columns: int, gap_columns: int = 0):
+        self.window_sec = float(window_sec)
+        self.n_columns = max(int(n_columns), 1)
+        self.gap_columns = min(max(int(gap_columns), 0), self.n_columns - 1)
+
+        col_width = self.window_sec / self.n_columns
+        centers = (np.arange(self.n_columns) + 0.5) * col_width
+        self._x = np.repeat(centers, 2)
+        self._x.flags.writeable = False
+        self._y = np.full(2 * self.n_columns, np.nan, dtype=np.float32)
+        self._y_min = self._y[0::2]
+        self._y_max = self._y[1::2]
+
+        self._consumed = 0
+        self._cursor_col = -1  # 最近一次写入的列
+        self._cursor_pass = -1  # 最近一次写入时的扫屏轮次 floor(t / window_sec)
+
+    def reset(self):
+        self._y.fill(np.nan)
+        self._consumed = 0
+        self._cursor_col = -1
+        self._cursor_pass = -1
+
+    def update(self, x_hist: MirroredRingBuffer, y_hist: MirroredRingBuffer, total_count: int):
+        """从原始历史缓冲中取出新到的采样写入帧缓冲（total_count 为该通道累计采样数）"""
+        new_count = min(total_count - self._consumed, len(x_hist))
+        self._consumed = total_count
+        if new_count <= 0:
+            return
+        self.write(x_hist.view()[-new_count:], y_hist.view()[-new_count:])
+
+    def write(self, times: np.ndarray, values: np.ndarray):
+        """写入一段按时间升序排列的采样"""
+        if times.size == 0:
+            return
+        n = self.n_columns
+        window = self.window_sec
+
+        # 只有最后一个窗口内的采样会留在屏幕上
+        keep = times > times[-1] - window
+        if not keep[0]:
+            times = times[keep]
+            values = values[keep]
+
+        passes = np.floor(times / window).astype(np.int64)
+        cols = ((times - passes * window) * (n / window)).astype(np.int64)
+        np.clip(cols, 0, n - 1, out=cols)
+
+        self._clear_ahead(int(passes[0]), int(cols[0]), int(passes[-1]), int(cols[-1]))
+
+        # 按列分段求 min/max（同一列的采样在时间上是连续的一段）
+        starts = np.flatnonzero(np.r_[True, (cols[1:] != cols[:-1]) | (passes[1:] != passes[:-1])])
+        seg_cols = cols[starts]
+        seg_min = np.minimum.reduceat(values, starts)
+        seg_max = np.maximum.reduceat(values, starts)
+
+        # 第一段若与上次写入的是同一列同一轮，则与已有值合并而不是覆盖
+        if int(passes[0]) == self._cursor_pass and int(seg_cols[0]) == self._cursor_col:
+            c = self._cursor_col
+            if not np.isnan(self._y_min[c]):
+                seg_min[0] = min(seg_min[0], self._y_min[c])
+                seg_max[0] = max(seg_max[0], self._y_max[c])
+
+        self._y_min[seg_cols] = seg_min
+        self._y_max[seg_cols] = seg_max
+
+        self._cursor_col = int(cols[-1])
+        self._cursor_pass = int(passes[-1])
+        self._blank(self._cursor_col + 1, self.gap_columns)
+
+    def _clear_ahead(self, first_pass: int, first_col: int, last_pass: int, last_col: int):
+        """清掉从上次写指针到本次最后一列之间的旧数据，防止丢包 / 跳变时残留上一轮的曲线"""
+        n = self.n_columns
+        if self._cursor_pass < 0:
+            start_abs = first_pass * n + first_col
+        else:
+            start_abs = self._cursor_pass * n + self._cursor_col + 1
+        end_abs = last_pass * n + last_col
+        if end_abs < start_abs:
+            return
+        self._blank(start_abs % n, min(end_abs - start_abs + 1, n))
+
+    def _blank(self, start_col: int, count: int):
+        n = self.n_columns
+        if count <= 0:
+            return
+        start_col %= n
+        first = min(count, n - start_col)
+        self._y_min[start_col:start_col + first] = np.nan
+        self._y_max[start_col:start_col + first] = np.nan
+        rest = count - first
+        if rest:
+            self._y_min[:rest] = np.nan
+            self._y_max[:rest] = np.nan
+
+    def x_view(self) -> np.ndarray:
+        return self._x
+
+    def y_view(self) -> np.ndarray:
+        return self._y
@@ -0,0 +1,35 @@
+from .session_file import (
+    SESSION_FILENAME,
+    SessionWriter,
+    SessionData,
+    SessionEvent,
+    ChannelRecord,
+    read_session,
+    session_path,
+)
+from .events import (
+    EVENTS_FILENAME,
+    DENSE_TRIGGERS_FILENAME,
+    read_trigger_events,
+    trigger_placement_stats,
+    write_dense_triggers,
+)
+from .writer_thread import RecordingWriter
+from .convert import session_to_csv
+
+__all__ = [
+    "SESSION_FILENAME",
+    "SessionWriter",
+    "SessionData",
+    "SessionEvent",
+    "ChannelRecord",
+    "read_session",
+    "session_path",
+    "EVENTS_FILENAME",
+    "DENSE_TRIGGERS_FILENAME",
+    "read_trigger_events",
+    "trigger_placement_stats",
+    "write_dense_triggers",
+    "RecordingWriter",
+    "session_to_csv",
+]
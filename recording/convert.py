@@ -0,0 +1,54 @@
+"""
+把会话二进制文件转换回原先的 CSV 布局（每通道一个 EEG_<serial>_<ch>.csv，表头 Time,Response）。
+
+用法（在项目根目录下）：
+    python -m recording.convert data/xxx/session.eegrec [--out-dir 输出目录] [--dense-triggers]
+
+--dense-triggers 会同时按需生成旧格式的逐采样 triggers.csv。
+"""
+
+import argparse
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from .events import DENSE_TRIGGERS_FILENAME, write_dense_triggers
+from .session_file import read_session
+
+
+def session_to_csv(path: str, out_dir: Optional[str] = None) -> List[str]:
+    """转换一个会话文件，返回生成的 CSV 路径列表；out_dir 默认为会话文件所在目录"""
+    session = read_session(path)
+    if out_dir is None:
+        out_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(out_dir, exist_ok=True)
+
+    written: List[str] = []
+    for ch, record in session.channels.items():
+        filename = os.path.join(out_dir, f"EEG_{session.serial}_{ch:02d}.csv")
+        table = np.column_stack((record.times(), record.samples.astype(np.float64)))
+        np.savetxt(filename, table, fmt="%.6f", delimiter=",", header="Time,Response", comments="")
+        written.append(filename)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话二进制文件 -> EEG CSV")
+    parser.add_argument("paths", nargs="+", help="session.eegrec 文件路径")
+    parser.add_argument("--out-dir", default=None, help="输出目录（默认与会话文件同目录）")
+    parser.add_argument("--dense-triggers", action="store_true", help="同时生成逐采样的 triggers.csv")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        for filename in session_to_csv(path, args.out_dir):
+            print(filename)
+        if args.dense_triggers:
+            run_dir = os.path.dirname(os.path.abspath(path))
+            out_dir = args.out_dir or run_dir
+            os.makedirs(out_dir, exist_ok=True)
+            print(write_dense_triggers(run_dir, os.path.join(out_dir, DENSE_TRIGGERS_FILENAME)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .session_file import read_session, session_path
+
+# 稀疏事件文件：每个事件一行，sample_index 为事件所在 ch0 采样下标，Time 为校正后的 EEG 时间
+EVENTS_FILENAME = "events.csv"
+EVENTS_HEADER = "sample_index,Time,trigger"
+
+# 旧版逐采样 triggers.csv（Time,trigger，每个 ch0 采样一行），现在只按需由 write_dense_triggers 生成
+DENSE_TRIGGERS_FILENAME = "triggers.csv"
+
+
+def format_event_rows(sample_indices: np.ndarray, times: np.ndarray, codes: np.ndarray) -> str:
+    return "".join(
+        f"{idx},{t_s:.6f},{code}\n"
+        for idx, t_s, code in zip(sample_indices.tolist(), times.tolist(), codes.tolist())
+    )
+
+
+def read_trigger_events(run_dir: str, codes: Optional[Iterable[int]] = None) -> List[Tuple[float, int]]:
+    """
+    读取 run_dir 下的触发事件，返回按时间排序的 [(Time, code), ...]（只含非 0 事件）。
+
+    - 优先读取稀疏的 events.csv，代价与事件数成正比；
+    - 没有 events.csv 时（旧数据）回退到逐采样的 triggers.csv；
+    - codes 不为 None 时只返回其中的事件码。
+    文件不存在时返回空列表，读取失败时抛出异常由调用方处理。
+    """
+    wanted = None if codes is None else {int(c) for c in codes}
+
+    events_path = os.path.join(run_dir, EVENTS_FILENAME)
+    if os.path.exists(events_path):
+        time_col, code_col = 1, 2
+        path = events_path
+    else:
+        path = os.path.join(run_dir, DENSE_TRIGGERS_FILENAME)
+        if not os.path.exists(path):
+            return []
+        time_col, code_col = 0, 1
+
+    events: List[Tuple[float, int]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        next(f, None)  # 跳过表头
+        for line in f:
+            parts = line.rstrip("\r\n").split(",")
+            if len(parts) <= code_col:
+                continue
+            try:
+                t = float(parts[time_col])
+                code = int(float(parts[code_col]))
+            except ValueError:
+                continue
+            if code == 0:
+                continue
+            if wanted is not None and code not in wanted:
+                continue
+            events.append((t, code))
+
+    events.sort(key=lambda x: x[0])
+    return events
+
+
+def trigger_placement_stats(eeg_page) -> Optional[dict]:
+    """
+    各实验页面写 meta.json 用：取 Page2（eeg_page）最近一次保存的 trigger 落点统计（stop_saving 之后可用），
+    见 RecordingWriter.trigger_placement；没有 Page2、Page2 不提供统计或读取失败时返回 None。
+    """
+    getter = getattr(eeg_page, "get_trigger_placement_stats", None)
+    if getter is None:
+        return None
+    try:
+        return getter()
+    except Exception:
+        return None
+
+
+def write_dense_triggers(run_dir: str, out_path: Optional[str] = None, channel: int = 0) -> str:
+    """
+    按需生成旧格式的逐采样 triggers.csv（Time,trigger）：
+    时间轴取会话文件中 channel 通道的每个采样时间，事件码按 sample_index 填入，其余为 0。
+    """
+    session = read_session(session_path(run_dir))
+    if out_path is None:
+        out_path = os.path.join(run_dir, DENSE_TRIGGERS_FILENAME)
+
+    record = session.channels.get(channel)
+    times = record.times() if record is not None else np.empty(0, dtype=np.float64)
+    dense = np.zeros(times.size, dtype=np.int64)
+    for ev in session.events:
+        if ev.channel == channel and 0 <= ev.sample_index < dense.size:
+            dense[ev.sample_index] = ev.code
+
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        f.write("Time,trigger\n")
+        f.write("".join(f"{t_s:.6f},{code}\n" for t_s, code in zip(times.tolist(), dense.tolist())))
+    return out_path
@@ -0,0 +1,239 @@
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ------------------------------------------------------------
+# 会话二进制文件格式（小端，追加写）
+#
+#   文件头: magic(8s) version(H) sample_rate(d) serial(16s)
+#   记录头: type(B) channel(H) count(I)，后跟负载（版本 1 的 channel 为 B，只支持 0..255 通道，读取时仍兼容）：
+#     - REC_SAMPLES: count 个 float32 采样（μV），紧接该通道上一条 REC_SAMPLES 之后
+#     - REC_SEGMENT: 时间锚点 (start_index(Q), t0(d))，count 固定为 0；
+#       该通道从 start_index 起的第 k 个采样时间为 t0 + k / sample_rate，直到下一个锚点
+#     - REC_EVENT: 事件 (sample_index(Q), time(d), code(i))，count 固定为 0；
+#       sample_index 为事件所在通道（channel 字段）中的采样下标
+#
+# 只在时间轴与“上一个锚点 + 标称采样率”的预测偏差超过 max_time_error 时才写新锚点，
+# 因此正常情况下每个通道只有一条锚点记录，丢包 / 跳变处自动形成不连续表。
+# ------------------------------------------------------------
+
+SESSION_FILENAME = "session.eegrec"
+
+MAGIC = b"EEGREC\x00\x01"
+VERSION = 2
+
+FILE_HEADER = struct.Struct("<8sHd16s")
+RECORD_HEADER = struct.Struct("<BHI")
+RECORD_HEADER_V1 = struct.Struct("<BBI")
+# 记录头 channel 字段能表示的最大通道号
+MAX_CHANNEL = 0xFFFF
+SEGMENT_PAYLOAD = struct.Struct("<Qd")
+EVENT_PAYLOAD = struct.Struct("<Qdi")
+
+REC_SAMPLES = 1
+REC_SEGMENT = 2
+REC_EVENT = 3
+
+
+def check_channel(ch: int):
+    """通道号必须能放进记录头的 channel 字段（0..MAX_CHANNEL），否则抛出 ValueError"""
+    if not 0 <= ch <= MAX_CHANNEL:
+        raise ValueError(f"通道号 {ch} 超出会话文件支持的范围 0..{MAX_CHANNEL}")
+
+
+@dataclass
+class _ChannelWriteState:
+    n_written: int = 0
+    seg_start: int = 0
+    seg_t0: Optional[float] = None
+
+
+class SessionWriter:
+    """
+    单次保存会话的二进制写入器：采样存 float32，时间只存锚点（首个时间 + 采样率 + 不连续表）。
+    write_chunk() 的 times / samples 与原先写 CSV 时使用的时间轴、数值完全一致。
+    """
+
+    def __init__(self, path: str, sample_rate: float, serial: str = "",
+                 max_time_error: float = 1e-4):
+        if sample_rate <= 0:
+            raise ValueError("sample_rate 必须大于 0")
+        self.path = path
+        self.sample_rate = float(sample_rate)
+        self.serial = serial
+        self.max_time_error = float(max_time_error)
+        self._channels: Dict[int, _ChannelWriteState] = {}
+
+        self._f = open(path, "wb")
+        self._f.write(FILE_HEADER.pack(MAGIC, VERSION, self.sample_rate,
+                                       serial.encode("ascii", "replace")[:16]))
+
+    @property
+    def closed(self) -> bool:
+        return self._f.closed
+
+    def samples_written(self, ch: int) -> int:
+        state = self._channels.get(ch)
+        return state.n_written if state is not None else 0
+
+    def write_chunk(self, ch: int, times: np.ndarray, samples: np.ndarray):
+        n = len(samples)
+        if n == 0:
+            return
+        check_channel(ch)
+        state = self._channels.get(ch)
+        if state is None:
+            state = self._channels[ch] = _ChannelWriteState()
+
+        # 先拼好本块的全部记录再一次写入，打包出错时不会留下只写了一半的记录，通道状态也不变
+        times = np.asarray(times, dtype=np.float64)
+        parts = []
+        seg_start, seg_t0 = state.seg_start, state.seg_t0
+        for pos in self._segment_breaks(state, times):
+            seg_start = state.n_written + pos
+            seg_t0 = float(times[pos])
+            parts.append(RECORD_HEADER.pack(REC_SEGMENT, ch, 0))
+            parts.append(SEGMENT_PAYLOAD.pack(seg_start, seg_t0))
+        parts.append(RECORD_HEADER.pack(REC_SAMPLES, ch, n))
+        parts.append(np.asarray(samples, dtype="<f4").tobytes())
+
+        self._f.write(b"".join(parts))
+        state.seg_start, state.seg_t0 = seg_start, seg_t0
+        state.n_written += n
+
+    def _segment_breaks(self, state: _ChannelWriteState, times: np.ndarray) -> List[int]:
+        """返回本块中需要新起锚点的位置（相对本块下标）"""
+        breaks: List[int] = []
+        n = times.size
+        pos = 0
+        seg_start, seg_t0 = state.seg_start, state.seg_t0
+        while pos < n:
+            if seg_t0 is None:
+                breaks.append(pos)
+                seg_start, seg_t0 = state.n_written + pos, float(times[pos])
+            offset = state.n_written + pos - seg_start
+            err = np.arange(offset, offset + n - pos, dtype=np.float64)
+            err /= self.sample_rate
+            err += seg_t0
+            err -= times[pos:]
+            np.abs(err, out=err)
+            if err.max() <= self.max_time_error:
+                break
+            pos += int(np.argmax(err > self.max_time_error))
+            seg_t0 = None
+        return breaks
+
+    def write_event(self, ch: int, sample_index: int, t: float, code: int):
+        check_channel(ch)
+        self._f.write(RECORD_HEADER.pack(REC_EVENT, ch, 0)
+                      + EVENT_PAYLOAD.pack(int(sample_index), float(t), int(code)))
+
+    def flush(self, fsync: bool = False):
+        self._f.flush()
+        if fsync:
+            os.fsync(self._f.fileno())
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+
+@dataclass
+class ChannelRecord:
+    channel: int
+    samples: np.ndarray
+    segment_starts: np.ndarray
+    segment_t0: np.ndarray
+    sample_rate: float
+
+    def times(self) -> np.ndarray:
+        """按锚点表展开每个采样的时间（秒），与写入时的时间轴误差不超过 max_time_error"""
+        n = self.samples.size
+        if n == 0 or self.segment_starts.size == 0:
+            return np.empty(0, dtype=np.float64)
+        idx = np.arange(n, dtype=np.int64)
+        seg = np.searchsorted(self.segment_starts, idx, side="right") - 1
+        np.clip(seg, 0, None, out=seg)
+        return self.segment_t0[seg] + (idx - self.segment_starts[seg]) / self.sample_rate
+
+
+@dataclass
+class SessionEvent:
+    channel: int
+    sample_index: int
+    time: float
+    code: int
+
+
+@dataclass
+class SessionData:
+    sample_rate: float
+    serial: str
+    channels: Dict[int, ChannelRecord] = field(default_factory=dict)
+    events: List[SessionEvent] = field(default_factory=list)
+
+
+def read_session(path: str) -> SessionData:
+    """读取整个会话文件；末尾不完整的记录（例如异常退出）会被忽略"""
+    with open(path, "rb") as f:
+        buf = f.read()
+    if len(buf) < FILE_HEADER.size:
+        raise ValueError(f"{path} 不是有效的会话文件")
+    magic, version, sample_rate, serial = FILE_HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} 不是有效的会话文件")
+    record_header = RECORD_HEADER_V1 if version == 1 else RECORD_HEADER
+
+    chunks: Dict[int, List[np.ndarray]] = {}
+    segments: Dict[int, List[tuple]] = {}
+    events: List[SessionEvent] = []
+
+    pos = FILE_HEADER.size
+    end = len(buf)
+    while pos + record_header.size <= end:
+        rec_type, ch, count = record_header.unpack_from(buf, pos)
+        body = pos + record_header.size
+        if rec_type == REC_SAMPLES:
+            size = count * 4
+            if body + size > end:
+                break
+            chunks.setdefault(ch, []).append(np.frombuffer(buf, dtype="<f4", count=count, offset=body))
+        elif rec_type == REC_SEGMENT:
+            size = SEGMENT_PAYLOAD.size
+            if body + size > end:
+                break
+            segments.setdefault(ch, []).append(SEGMENT_PAYLOAD.unpack_from(buf, body))
+        elif rec_type == REC_EVENT:
+            size = EVENT_PAYLOAD.size
+            if body + size > end:
+                break
+            sample_index, t, code = EVENT_PAYLOAD.unpack_from(buf, body)
+            events.append(SessionEvent(channel=ch, sample_index=sample_index, time=t, code=code))
+        else:
+            raise ValueError(f"{path} 中存在未知记录类型 {rec_type}（偏移 {pos}）")
+        pos = body + size
+
+    session = SessionData(
+        sample_rate=sample_rate,
+        serial=serial.rstrip(b"\x00").decode("ascii", "replace"),
+        events=events,
+    )
+    for ch in sorted(set(chunks) | set(segments)):
+        ch_chunks = chunks.get(ch, [])
+        samples = np.concatenate(ch_chunks).astype(np.float32) if ch_chunks else np.empty(0, dtype=np.float32)
+        segs = segments.get(ch, [])
+        session.channels[ch] = ChannelRecord(
+            channel=ch,
+            samples=samples,
+            segment_starts=np.array([s[0] for s in segs], dtype=np.int64),
+            segment_t0=np.array([s[1] for s in segs], dtype=np.float64),
+            sample_rate=sample_rate,
+        )
+    return session
+
+
+def session_path(data_dir: str) -> str:
+    return os.path.join(data_dir, SESSION_FILENAME)
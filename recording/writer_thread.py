@@ -0,0 +1,318 @@
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .events import EVENTS_HEADER, format_event_rows
+from .session_file import SessionWriter, check_channel
+
+_STOP = object()
+
+_KIND_SAMPLES = 0
+_KIND_EVENTS = 1
+_KIND_TIMED_EVENT = 2
+
+
+class RecordingWriter:
+    """
+    录制写盘线程：GUI 线程只负责把数据块与事件放进队列，格式化 / 写文件 / fsync 全部在独立线程中完成。
+
+    - 组提交：写线程每次醒来把队列里积压的所有任务一次写完，再按 flush_interval 统一 flush，
+      按 fsync_interval 统一 fsync（0 表示只在关闭时 fsync）；
+    - 采样块有上限：submit 从不阻塞调用线程（GUI 线程），队列中已积压 queue_size 个任务时立即丢弃新的采样块、
+      计入 dropped_chunks 并返回 False；被丢弃的采样块不计入 submitted_samples，后续块的采样下标与会话文件保持一致；
+    - 事件不受上限约束、从不丢弃：事件任务很小且稀疏，磁盘卡顿时也照常入队，等写线程恢复后按顺序写入；
+    - 事件同时写入会话文件（REC_EVENT）和稀疏事件文件 events.csv（每个事件一行）；
+    - 带时间的事件（submit_timed_event）先挂起，等该通道写入的采样时间覆盖到事件时间后，
+      在最近 HISTORY_SEC 秒的采样时间上二分查找，落到最近的采样点，并统计落点误差；
+    - close() 会等待队列中所有任务写完、flush + fsync 后才返回，保证 stop_saving 之后
+      上层立即读取的文件是完整的；
+    - 通道号超出会话文件支持的范围时 submit 直接抛出 ValueError，不入队也不计数；
+    - 写线程中的写入 / 落盘错误计入 write_errors 并记下 last_error，上层应定期查看 metrics() 并提示用户；
+    - metrics() 返回队列深度、写入延迟（入队到写完）、丢弃块数、写入错误数等统计，供状态栏 / meta.json 使用。
+    """
+
+    MAX_GROUP = 512
+    LATENCY_WINDOW = 1000
+    HISTORY_SEC = 30.0
+
+    def __init__(self, path: str, sample_rate: float, serial: str = "",
+                 events_path: Optional[str] = None,
+                 queue_size: int = 1024, flush_interval: float = 0.2,
+                 fsync_interval: float = 2.0):
+        self.logger = logging.getLogger("RecordingWriter")
+        self.flush_interval = max(float(flush_interval), 0.01)
+        self.fsync_interval = max(float(fsync_interval), 0.0)
+
+        # 在调用线程里打开文件，出错时直接抛给调用方
+        self._session = SessionWriter(path, sample_rate=sample_rate, serial=serial)
+        self._event_file = None
+        if events_path is not None:
+            try:
+                self._event_file = open(events_path, "w", encoding="utf-8", newline="")
+                self._event_file.write(EVENTS_HEADER + "\n")
+            except Exception:
+                self._session.close()
+                raise
+
+        # 队列本身不设上限，采样块的上限由 _put 按 queue_size 检查，事件任务总能入队
+        self._queue: "queue.Queue" = queue.Queue()
+        self.queue_size = max(int(queue_size), 1)
+        self._closed = False
+        # 已成功入队的每通道采样数，即下一块第一个采样在会话文件中的下标
+        self._submitted: Dict[int, int] = {}
+
+        # 以下仅写线程访问：每通道最近写入的 (起始下标, 采样时间) 与尚未落点的带时间事件 (时间, 码)
+        self._history: Dict[int, deque] = {}
+        self._pending_timed: Dict[int, List[Tuple[float, int]]] = {}
+        self._placement_errors_ms: List[float] = []
+        self._placement_out_of_range = 0
+        self._untimed_events = 0
+
+        # 统计
+        self._latency_ms: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self._max_queue_depth = 0
+        self._max_group = 0
+        self._chunks_written = 0
+        self._samples_written = 0
+        self._dropped_chunks = 0
+        self._flushes = 0
+        self._fsyncs = 0
+        self._write_errors = 0
+        self.last_error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._run, name="RecordingWriter", daemon=True)
+        self._thread.start()
+
+    # ---------------- GUI 线程侧 ----------------
+
+    def submitted_samples(self, ch: int) -> int:
+        return self._submitted.get(ch, 0)
+
+    def submit_samples(self, ch: int, times: np.ndarray, samples: np.ndarray) -> bool:
+        """写入一块采样；队列已满被丢弃时返回 False，此时 submitted_samples(ch) 不变"""
+        check_channel(ch)
+        if not self._put((_KIND_SAMPLES, time.perf_counter(), (ch, times, samples)), bounded=True):
+            return False
+        # 确认入队后才推进下标，下一块的 base_index 只计算真正会写进文件的采样
+        self._submitted[ch] = self._submitted.get(ch, 0) + len(samples)
+        return True
+
+    def submit_events(self, ch: int, sample_indices: np.ndarray, times: np.ndarray, codes: np.ndarray) -> bool:
+        """写入若干事件（不受队列上限约束，只在 close() 之后返回 False）；sample_indices 为 ch 通道在会话文件中的采样下标"""
+        check_channel(ch)
+        if len(codes) == 0:
+            return True
+        return self._put((_KIND_EVENTS, time.perf_counter(), (ch, sample_indices, times, codes)))
+
+    def submit_timed_event(self, ch: int, eeg_time: float, code: int) -> bool:
+        """写入一个事件，由写线程放到 ch 通道采样时间最接近 eeg_time（校正时间轴，秒）的采样点上"""
+        check_channel(ch)
+        return self._put((_KIND_TIMED_EVENT, time.perf_counter(), (ch, float(eeg_time), int(code))))
+
+    def _put(self, job, bounded: bool = False) -> bool:
+        if self._closed:
+            return False
+        if bounded and self._queue.qsize() >= self.queue_size:
+            self._dropped_chunks += 1
+            # 磁盘卡顿时会连续丢弃，只记录第 1 次及此后每 100 次
+            if self._dropped_chunks % 100 == 1:
+                self.logger.warning(f"录制队列已满（{self.queue_size}），已丢弃 {self._dropped_chunks} 个数据块")
+            return False
+        self._queue.put_nowait(job)
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+        return True
+
+    def close(self):
+        """等待队列写完并落盘后关闭文件；可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def metrics(self) -> dict:
+        latency = np.asarray(self._latency_ms, dtype=np.float64)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._max_queue_depth,
+            "max_group": self._max_group,
+            "chunks_written": self._chunks_written,
+            "samples_written": self._samples_written,
+            "dropped_chunks": self._dropped_chunks,
+            "write_latency_mean_ms": float(latency.mean()) if latency.size else 0.0,
+            "write_latency_p99_ms": float(np.percentile(latency, 99)) if latency.size else 0.0,
+            "flushes": self._flushes,
+            "fsyncs": self._fsyncs,
+            "write_errors": self._write_errors,
+            "last_error": self.last_error,
+            "trigger_placement": self.trigger_placement(),
+        }
+
+    def trigger_placement(self) -> dict:
+        """
+        事件落点统计（close() 之后读取才完整）：
+        - timed: 按时间落点的事件数；error_mean_ms / error_max_ms 为落点采样时间与事件时间之差的绝对值；
+        - out_of_range: 事件时间不在已写入采样的时间范围内（过早 / 过晚或落在丢包缺口外）的事件数；
+        - untimed: 调用方直接指定采样下标写入的事件数（没有时间映射时的回退路径）。
+        """
+        errors = np.asarray(self._placement_errors_ms, dtype=np.float64)
+        return {
+            "timed": int(errors.size),
+            "error_mean_ms": float(errors.mean()) if errors.size else None,
+            "error_max_ms": float(errors.max()) if errors.size else None,
+            "out_of_range": self._placement_out_of_range,
+            "untimed": self._untimed_events,
+        }
+
+    # ---------------- 写线程 ----------------
+
+    def _run(self):
+        last_flush = last_fsync = time.monotonic()
+        unflushed = unsynced = False
+        stopping = False
+        while not stopping:
+            try:
+                group = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                group = []
+            while len(group) < self.MAX_GROUP:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if len(group) > self._max_group:
+                self._max_group = len(group)
+
+            for job in group:
+                if job is _STOP:
+                    stopping = True
+                    continue
+                self._write_job(job)
+                unflushed = unsynced = True
+
+            now = time.monotonic()
+            if unflushed and now - last_flush >= self.flush_interval:
+                do_fsync = unsynced and self.fsync_interval > 0 and now - last_fsync >= self.fsync_interval
+                self._flush(fsync=do_fsync)
+                last_flush = now
+                unflushed = False
+                if do_fsync:
+                    last_fsync = now
+                    unsynced = False
+
+        # 关闭前把仍未被采样覆盖的事件落到已有的最近采样点上
+        for ch in list(self._pending_timed):
+            self._place_timed_events(ch, final=True)
+
+        self._flush(fsync=True)
+        self._session.close()
+        if self._event_file is not None:
+            self._event_file.close()
+
+    def _write_job(self, job):
+        kind, t_submit, payload = job
+        try:
+            if kind == _KIND_SAMPLES:
+                ch, times, samples = payload
+                self._session.write_chunk(ch, times, samples)
+                self._chunks_written += 1
+                self._samples_written += len(samples)
+                self._remember_times(ch, times)
+                if self._pending_timed.get(ch):
+                    self._place_timed_events(ch, final=False)
+            elif kind == _KIND_EVENTS:
+                ch, sample_indices, times, codes = payload
+                self._write_events(ch, sample_indices, times, codes)
+                self._untimed_events += len(codes)
+            elif kind == _KIND_TIMED_EVENT:
+                ch, eeg_time, code = payload
+                self._pending_timed.setdefault(ch, []).append((eeg_time, code))
+                self._place_timed_events(ch, final=False)
+        except Exception as e:
+            self._write_errors += 1
+            self.last_error = str(e)
+            self.logger.error(f"写入录制数据失败: {e}")
+        self._latency_ms.append((time.perf_counter() - t_submit) * 1000.0)
+
+    def _write_events(self, ch: int, sample_indices: np.ndarray, times: np.ndarray, codes: np.ndarray):
+        for idx, t_s, code in zip(sample_indices.tolist(), times.tolist(), codes.tolist()):
+            self._session.write_event(ch, idx, t_s, code)
+        if self._event_file is not None:
+            self._event_file.write(format_event_rows(sample_indices, times, codes))
+
+    def _remember_times(self, ch: int, times: np.ndarray):
+        if len(times) == 0:
+            return
+        history = self._history.get(ch)
+        if history is None:
+            history = self._history[ch] = deque()
+        base_index = self._session.samples_written(ch) - len(times)
+        history.append((base_index, np.asarray(times, dtype=np.float64)))
+        # 至少保留一块，其余只保留最近 HISTORY_SEC 秒
+        deadline = float(times[-1]) - self.HISTORY_SEC
+        while len(history) > 1 and float(history[0][1][-1]) < deadline:
+            history.popleft()
+
+    def _place_timed_events(self, ch: int, final: bool):
+        pending = self._pending_timed.get(ch)
+        history = self._history.get(ch)
+        if not pending or not history:
+            return
+
+        last_time = float(history[-1][1][-1])
+        if final:
+            ready, rest = pending, []
+        else:
+            # 只有写入的采样时间已经越过事件时间，最近的采样点才确定
+            ready = [ev for ev in pending if ev[0] <= last_time]
+            rest = [ev for ev in pending if ev[0] > last_time]
+        if not ready:
+            return
+        self._pending_timed[ch] = rest
+
+        ready.sort()
+        event_times = np.array([ev[0] for ev in ready], dtype=np.float64)
+        codes = np.array([ev[1] for ev in ready], dtype=np.int64)
+
+        hist_times = np.concatenate([times for _, times in history])
+        hist_index = np.concatenate([
+            base + np.arange(len(times), dtype=np.int64) for base, times in history
+        ])
+        # 二分查找插入位置，在左右两个相邻采样中取时间更近的一个
+        last = len(hist_times) - 1
+        insert = np.searchsorted(hist_times, event_times)
+        left = np.clip(insert - 1, 0, last)
+        right = np.clip(insert, 0, last)
+        use_left = np.abs(event_times - hist_times[left]) <= np.abs(hist_times[right] - event_times)
+        pos = np.where(use_left, left, right)
+
+        sample_times = hist_times[pos]
+        self._write_events(ch, hist_index[pos], sample_times, codes)
+
+        self._placement_errors_ms.extend((np.abs(sample_times - event_times) * 1000.0).tolist())
+        half_dt = 0.5 / self._session.sample_rate
+        out_of_range = (event_times < hist_times[0] - half_dt) | (event_times > hist_times[-1] + half_dt)
+        self._placement_out_of_range += int(out_of_range.sum())
+
+    def _flush(self, fsync: bool):
+        try:
+            self._session.flush(fsync=fsync)
+            if self._event_file is not None:
+                self._event_file.flush()
+                if fsync:
+                    os.fsync(self._event_file.fileno())
+        except Exception as e:
+            self._write_errors += 1
+            self.last_error = str(e)
+            self.logger.error(f"录制数据落盘失败: {e}")
+        self._flushes += 1
+        if fsync:
+            self._fsyncs += 1